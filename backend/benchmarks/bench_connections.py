@@ -0,0 +1,96 @@
+"""ConnectionManager 인덱스 성능 측정 (가짜 웹소켓 100k개)
+
+룸마다 두 명씩 연결한 뒤 연결, 접속 확인, 룸 브로드캐스트, 사용자별 전송, 연결 해제에
+걸리는 시간을 측정합니다. 각 작업은 룸 크기에만 비례해야 하므로 연결 수를 늘려도
+호출당 시간이 거의 같아야 합니다. 네트워크와 DB는 사용하지 않습니다.
+
+    python benchmarks/bench_connections.py --connections 100000 --ops 10000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.room_pubsub import InProcessPubSub
+from services.websocket_manager import ConnectionManager
+
+class FakeWebSocket:
+    """전송만 흉내 내는 웹소켓"""
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        pass
+
+    async def close(self, code: int = None, reason: str = ""):
+        pass
+
+class Timer:
+    def __init__(self, name: str, ops: int):
+        self.name = name
+        self.ops = ops
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        print(f"  {elapsed * 1000:10.1f} ms {elapsed / self.ops * 1_000_000:9.2f} us/op  {self.name}")
+        return False
+
+async def drain(manager: ConnectionManager, expected: int):
+    """writer 작업이 대기열의 메시지를 모두 보낼 때까지 대기"""
+    while manager.sent < expected:
+        await asyncio.sleep(0)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=10_000)
+    args = parser.parse_args()
+
+    manager = ConnectionManager(pubsub=InProcessPubSub(), heartbeat_interval=0)
+    rooms = args.connections // 2
+    # 룸 r에는 사용자 2r, 2r + 1이 연결
+    sockets = [(FakeWebSocket(), user_id // 2, user_id) for user_id in range(rooms * 2)]
+    picks = [random.randrange(rooms) for _ in range(args.ops)]
+    print(f"연결 {len(sockets)}개, 룸 {rooms}개")
+
+    with Timer("connect", len(sockets)):
+        for websocket, room_id, user_id in sockets:
+            await manager.connect(websocket, room_id, user_id)
+
+    with Timer("is_both_players_connected", args.ops):
+        for room_id in picks:
+            manager.is_both_players_connected(room_id, 2 * room_id, 2 * room_id + 1)
+
+    sent = manager.sent
+    with Timer("broadcast_to_room (enqueue)", args.ops):
+        for room_id in picks:
+            await manager.broadcast_to_room(room_id, {"type": "ping"}, exclude_user_id=2 * room_id)
+    with Timer("broadcast_to_room (writer 전송 완료)", args.ops):
+        await drain(manager, sent + args.ops)
+
+    sent = manager.sent
+    with Timer("send_to_user (enqueue)", args.ops):
+        for room_id in picks:
+            await manager.send_to_user(2 * room_id, {"type": "ping"})
+    await drain(manager, sent + args.ops)
+
+    with Timer("disconnect", len(sockets)):
+        for websocket, room_id, user_id in sockets:
+            manager.disconnect(websocket, room_id, user_id)
+
+    stats = manager.stats()
+    assert stats["connections"] == stats["rooms"] == stats["users"] == 0, stats
+    # 취소된 writer 작업 정리
+    await asyncio.sleep(0)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""GET /api/rounds/match/{match_id}/current 처리량(requests/second) 비교: 동기 threadpool vs 비동기 경로
+
+- sync: 예전처럼 `def` 핸들러 + get_db(동기 Session)로 threadpool에서 조회 (이 스크립트가 붙이는 벤치마크 전용 경로)
+- async: 실제 라우터 (`async def` + AsyncSession, 이벤트 루프에서 조회)
+- async 304: 실제 라우터에 If-None-Match를 보내 상태 버전만 비교
+
+두 경로는 같은 조회문(load_round_response와 같은 옵션)과 같은 직렬화(round_payload, round_view)를 쓰므로
+차이는 요청을 처리하는 방식에서만 납니다. 같은 서버 프로세스에서 번갈아 측정합니다.
+
+    python benchmarks/bench_current_round.py --serve --port 8000 --workers 4   # 다른 터미널에서 서버 실행
+    python benchmarks/bench_current_round.py --base-url http://127.0.0.1:8000 --concurrency 64 --duration 10
+
+httpx가 필요합니다 (pip install httpx). 라운드 엔진이 켜져 있으면 비동기 경로가 DB를 거치지 않으므로
+ROUND_ENGINE_ENABLED=false로 서버를 실행합니다.
+"""
+import os
+import sys
+import argparse
+import asyncio
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SYNC_PATH = "/bench/sync/rounds/match/{match_id}/current"
+ASYNC_PATH = "/api/rounds/match/{match_id}/current"
+
+def create_app():
+    """main.app에 동기 threadpool 경로를 추가한 앱 (uvicorn factory)"""
+    from fastapi import Depends, HTTPException
+    from sqlalchemy.orm import Session
+    from database import get_db
+    from models.round import Round
+    from services.round_broadcast import round_view
+    from utils.responses import _ROUND_WITH_CHILDREN, json_response, round_payload
+    from main import app
+
+    @app.get(SYNC_PATH, include_in_schema=False)
+    def sync_current_round(match_id: int, db: Session = Depends(get_db)):
+        """비동기 전환 이전 방식: threadpool에서 동기 Session으로 현재 라운드 조회"""
+        stmt = _ROUND_WITH_CHILDREN.where(Round.match_id == match_id).order_by(Round.round_no.desc()).limit(1)
+        round = db.execute(stmt).unique().scalars().first()
+        if not round:
+            raise HTTPException(status_code=404, detail="라운드를 찾을 수 없습니다")
+        return json_response(round_view(round_payload(round), None))
+
+    return app
+
+async def setup_match(client) -> int:
+    """사용자 2명, 룸, 매치, 첫 라운드를 만들고 match_id 반환"""
+    suffix = uuid.uuid4().hex[:8]
+    player1 = (await client.post("/api/users", json={"username": f"bench1_{suffix}"})).json()
+    player2 = (await client.post("/api/users/guest", json={"username": f"bench2_{suffix}"})).json()
+    room = (await client.post("/api/rooms", json={"player1_id": player1["id"]})).json()
+    await client.post(f"/api/rooms/{room['id']}/join", json={"player2_id": player2["id"]})
+    match = (await client.get(f"/api/matches/room/{room['id']}")).json()
+    return match["id"]
+
+async def run(client, path: str, concurrency: int, duration: float, etag: str = None) -> dict:
+    latencies = []
+    errors = 0
+    headers = {"If-None-Match": etag} if etag else {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in (200, 304):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "errors": errors,
+    }
+
+async def bench(args):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        match_id = args.match_id or await setup_match(client)
+        sync_path = SYNC_PATH.format(match_id=match_id)
+        async_path = ASYNC_PATH.format(match_id=match_id)
+        if (await client.get(sync_path)).status_code == 404 and (await client.get(async_path)).status_code == 200:
+            sys.exit("서버에 동기 경로가 없습니다. --serve로 서버를 실행하세요")
+        etag = (await client.get(async_path)).headers.get("etag")
+
+        for name, path, tag in (("sync", sync_path, None), ("async", async_path, None), ("async 304", async_path, etag)):
+            result = await run(client, path, args.concurrency, args.duration, tag)
+            print(
+                f"{name:>9}: {result['rps']:.0f} req/s  p50 {result['p50_ms']:.1f}ms  "
+                f"p99 {result['p99_ms']:.1f}ms  ({result['requests']} requests, {result['errors']} errors)"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--serve", action="store_true", help="동기 경로를 추가한 서버 실행")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--match-id", type=int, help="기존 매치 사용 (지정하지 않으면 새로 생성)")
+    args = parser.parse_args()
+
+    if args.serve:
+        import uvicorn
+
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        uvicorn.run(
+            "benchmarks.bench_current_round:create_app", factory=True,
+            host=args.host, port=args.port, workers=args.workers, log_level="warning"
+        )
+    else:
+        asyncio.run(bench(args))
+
+if __name__ == "__main__":
+    main()
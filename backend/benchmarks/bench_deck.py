@@ -0,0 +1,97 @@
+"""카드 한 장 딜링 시간 비교: 카드마다 행을 두던 방식 vs 시드 순열 + LRU (DeckProvider)
+
+예전 방식은 매치마다 섞은 순서를 deck_instances 행으로 저장하고, 딜링할 때마다
+(match_id, order_no)로 행을 찾은 뒤 card_templates를 조회했습니다 (카드당 쿼리 2회).
+그 테이블은 더 이상 없으므로 같은 구조의 임시 테이블을 만들어 측정합니다 (세션 종료 시 삭제).
+
+    python benchmarks/bench_deck.py --deals 2000
+
+DATABASE_URL의 PostgreSQL이 필요합니다 (card_templates가 없으면 생성).
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from models.match import Match
+from services.deck_service import DeckService, DeckProvider, deck_provider
+
+_CREATE_ROWS = text("""
+    CREATE TEMP TABLE bench_deck_instances (
+        id BIGSERIAL PRIMARY KEY,
+        match_id BIGINT NOT NULL,
+        card_template_id BIGINT NOT NULL,
+        order_no INTEGER NOT NULL,
+        UNIQUE (match_id, order_no)
+    ) ON COMMIT DROP
+""")
+_INSERT_ROW = text("INSERT INTO bench_deck_instances (match_id, card_template_id, order_no) VALUES (:match_id, :template_id, :order_no)")
+_SELECT_ROW = text("SELECT id, card_template_id FROM bench_deck_instances WHERE match_id = :match_id AND order_no = :order_no")
+_SELECT_TEMPLATE = text("SELECT front_value, back_value FROM card_templates WHERE id = :id")
+
+def per_card(elapsed: float, deals: int) -> float:
+    return elapsed / deals * 1_000_000
+
+def bench_row_per_card(db, seed: int, deals: int) -> float:
+    """예전 DeckService.shuffle_deck/deal_card와 같은 쿼리로 딜링"""
+    templates = deck_provider.templates
+    deck = [template_id for template_id, copies in enumerate(templates.copies) for _ in range(copies)]
+    random.Random(seed).shuffle(deck)
+    db.execute(_CREATE_ROWS)
+    for order_no, template_id in enumerate(deck, start=1):
+        db.execute(_INSERT_ROW, {"match_id": 0, "template_id": template_id, "order_no": order_no})
+
+    started = time.perf_counter()
+    for i in range(deals):
+        row = db.execute(_SELECT_ROW, {"match_id": 0, "order_no": i % len(deck) + 1}).first()
+        db.execute(_SELECT_TEMPLATE, {"id": row.card_template_id}).first()
+    return per_card(time.perf_counter() - started, deals)
+
+def bench_cached(db, seed: int, deals: int) -> float:
+    """DeckService.deal_card (같은 시드, 순열은 LRU에 있음)"""
+    match = Match(id=0, deck_seed=seed, deck_cursor=0)
+    started = time.perf_counter()
+    for _ in range(deals):
+        if match.deck_cursor >= deck_provider.size():
+            match.deck_cursor = 0
+        DeckService.deal_card(db, match)
+    return per_card(time.perf_counter() - started, deals)
+
+def bench_miss(deals: int) -> float:
+    """매번 새 시드로 순열 계산 (재섞기 또는 캐시에서 밀려난 매치)"""
+    provider = DeckProvider()
+    provider.templates = deck_provider.templates
+    started = time.perf_counter()
+    for i in range(deals):
+        provider.card_at(1_000_000 + i, 0)
+    return per_card(time.perf_counter() - started, deals)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=12345)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        deck_provider.load(db)
+        results = [
+            ("row-per-card (쿼리 2회)", bench_row_per_card(db, args.seed, args.deals)),
+            ("시드 순열, LRU hit", bench_cached(db, args.seed, args.deals)),
+            ("시드 순열, LRU miss", bench_miss(args.deals)),
+        ]
+    finally:
+        db.rollback()
+        db.close()
+
+    print(f"덱 {deck_provider.size()}장, 딜링 {args.deals}회")
+    for name, micros in results:
+        print(f"  {micros:10.2f} us/card  {name}")
+
+if __name__ == "__main__":
+    main()
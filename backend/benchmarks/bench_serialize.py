@@ -0,0 +1,79 @@
+"""라운드 응답 직렬화 시간 비교 (액션 10/100/1000개)
+
+- response_model: 같은 payload를 RoundResponse로 검증/직렬화한 뒤 JSONResponse (FastAPI 기본 경로)
+- direct+json: round_payload() + FastJSONResponse, orjson 없이 json 모듈 사용
+- direct+orjson: round_payload() + FastJSONResponse (orjson이 설치된 경우만)
+
+라운드 엔진의 LiveRound로 라운드를 만들어 측정하므로 DB가 필요 없습니다.
+
+    python benchmarks/bench_serialize.py
+"""
+import os
+import sys
+import json
+import timeit
+import argparse
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.responses as responses
+from schemas.round import RoundResponse
+from services.round_engine import LiveRound, LiveCard, LiveAction
+from utils.responses import FastJSONResponse, round_payload
+
+def make_round(actions: int) -> LiveRound:
+    started = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    return LiveRound(
+        id=1, match_id=1, round_no=1, state="betting", pot=10, carry_over_pot=0,
+        current_turn_user_id=1, min_bet=1, current_bet=actions, action_seq=actions,
+        result=None, winner_id=None, is_double_side_bet=False, double_side_bonus=0,
+        created_at=started, ended_at=None,
+        cards=[LiveCard(1, 3, 4, "front", 0), LiveCard(2, 5, 2, "back", 0)],
+        actions=[
+            LiveAction(i, 1 + i % 2, "raise", i, {}, started + timedelta(seconds=i), 1)
+            for i in range(1, actions + 1)
+        ],
+    )
+
+def response_model(round: LiveRound) -> bytes:
+    model = RoundResponse.model_validate(round_payload(round, 1))
+    return JSONResponse(model.model_dump(mode="json")).body
+
+def direct(round: LiveRound) -> bytes:
+    return FastJSONResponse(round_payload(round, 1)).body
+
+def direct_json(round: LiveRound) -> bytes:
+    orjson, responses.orjson = responses.orjson, None
+    try:
+        return direct(round)
+    finally:
+        responses.orjson = orjson
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--actions", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    paths = [("response_model", response_model), ("direct+json", direct_json)]
+    if responses.orjson is not None:
+        paths.append(("direct+orjson", direct))
+    else:
+        print("orjson이 설치되어 있지 않아 direct+orjson은 생략합니다")
+
+    print(f"{'actions':>8}" + "".join(f"{name:>18}" for name, _ in paths))
+    for actions in args.actions:
+        round = make_round(actions)
+        # 세 경로의 응답 내용이 같은지 확인
+        bodies = [json.loads(fn(round)) for _, fn in paths]
+        assert all(body == bodies[0] for body in bodies), "직렬화 결과가 다릅니다"
+        number = max(20, 20000 // (actions + 10))
+        timings = [
+            min(timeit.repeat(lambda: fn(round), number=number, repeat=5)) / number * 1_000_000
+            for _, fn in paths
+        ]
+        print(f"{actions:>8}" + "".join(f"{micros:>15.1f} us" for micros in timings))
+
+if __name__ == "__main__":
+    main()
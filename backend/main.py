@@ -2,7 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
-from routers import users, rooms, matches, rounds, websocket
+from routers import users, rooms, matches, rounds, websocket, metrics, stats
+from services.round_engine import round_engine
+from services.action_log import action_log
+from services.websocket_manager import manager
 
 load_dotenv()
 
@@ -23,40 +26,60 @@ app.include_router(rooms.router)
 app.include_router(matches.router)
 app.include_router(rounds.router)
 app.include_router(websocket.router)
+app.include_router(metrics.router)
+app.include_router(stats.router)
 
 def create_db_and_table():
     """데이터베이스 및 테이블 생성"""
     import os
     from sqlalchemy import create_engine, text
-    from database import init_db, engine
+    from sqlalchemy.exc import ProgrammingError
+    from database import init_db, is_schema_current, SessionLocal
+    from services.deck_service import DeckService
+    from utils.auth import auth_cache
     
     try:
-        # 데이터베이스가 없으면 생성
-        db_url = os.getenv(
-            "DATABASE_URL",
-            "postgresql://sw@localhost:5432/db_term_project"
-        )
-        
-        # postgres 기본 DB에 연결하여 db_term_project 생성
-        if "db_term_project" in db_url:
-            postgres_url = db_url.replace("/db_term_project", "/postgres")
-            temp_engine = create_engine(postgres_url)
+        # 워커마다 실행되므로 이미 최신이면 쿼리 1회로 끝냄
+        if is_schema_current():
+            print("✓ 스키마와 기본 데이터가 최신입니다 (초기화 생략)")
+        else:
+            # 데이터베이스가 없으면 생성
+            db_url = os.getenv(
+                "DATABASE_URL",
+                "postgresql://sw@localhost:5432/db_term_project"
+            )
+            
+            # postgres 기본 DB에 연결하여 db_term_project 생성
+            if "db_term_project" in db_url:
+                postgres_url = db_url.replace("/db_term_project", "/postgres")
+                temp_engine = create_engine(postgres_url)
+                
+                with temp_engine.connect() as conn:
+                    conn.execute(text("COMMIT"))
+                    result = conn.execute(text(
+                        "SELECT 1 FROM pg_database WHERE datname = 'db_term_project'"
+                    ))
+                    if not result.fetchone():
+                        try:
+                            conn.execute(text("CREATE DATABASE db_term_project"))
+                            print("✓ 데이터베이스 'db_term_project' 생성 완료")
+                        except ProgrammingError:
+                            # 다른 워커가 먼저 생성한 경우
+                            print("✓ 데이터베이스 'db_term_project' 이미 존재")
+                    else:
+                        print("✓ 데이터베이스 'db_term_project' 이미 존재")
+                temp_engine.dispose()
             
-            with temp_engine.connect() as conn:
-                conn.execute(text("COMMIT"))
-                result = conn.execute(text(
-                    "SELECT 1 FROM pg_database WHERE datname = 'db_term_project'"
-                ))
-                if not result.fetchone():
-                    conn.execute(text("CREATE DATABASE db_term_project"))
-                    print("✓ 데이터베이스 'db_term_project' 생성 완료")
-                else:
-                    print("✓ 데이터베이스 'db_term_project' 이미 존재")
-            temp_engine.dispose()
+            # 테이블 생성 및 기본 데이터 초기화 (advisory lock으로 한 워커만 실행)
+            init_db()
+            print("✓ 데이터베이스 테이블 초기화 완료")
         
-        # 테이블 생성
-        init_db()
-        print("✓ 데이터베이스 테이블 초기화 완료")
+        # 변경되지 않는 카드 템플릿과 역할-권한 매트릭스를 프로세스 메모리에 적재
+        with SessionLocal() as db:
+            table = DeckService.load_card_templates(db)
+            auth_cache.role_permissions(db)
+        print(f"✓ 카드 템플릿 {len(table.cards)}장 메모리 적재 완료")
+        print("✓ 역할-권한 매트릭스 메모리 적재 완료")
     except Exception as e:
         print(f"⚠ 데이터베이스 테이블 생성 중 오류: {e}")
         print("PostgreSQL이 실행 중인지 확인하세요.")
@@ -65,3 +88,15 @@ def create_db_and_table():
 def on_startup():
     create_db_and_table()
 
+@app.on_event("startup")
+async def start_background_writers():
+    await action_log.start()
+    await round_engine.start()
+    await manager.start()
+
+@app.on_event("shutdown")
+async def stop_background_writers():
+    await manager.stop()
+    # 라운드 엔진이 남긴 액션까지 기록되도록 엔진을 먼저 종료
+    await round_engine.stop()
+    await action_log.stop()
@@ -3,8 +3,9 @@ from .role import Role, UserRole
 from .permission import Permission, RolePermission
 from .room import Room
 from .match import Match, MatchPlayer
-from .round import Round, RoundCard, Action
-from .deck import CardTemplate, DeckInstance
+from .round import Round, RoundCard, Action, ActionDeadLetter
+from .deck import CardTemplate
+from .stats import PlayerStats
 
 __all__ = [
     "User",
@@ -18,7 +19,8 @@ __all__ = [
     "Round",
     "RoundCard",
     "Action",
+    "ActionDeadLetter",
     "CardTemplate",
-    "DeckInstance",
+    "PlayerStats",
 ]
 
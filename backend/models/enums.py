@@ -39,3 +39,6 @@ class RoundResult(str, Enum):
     PLAYER1_FOLD = "player1_fold"
     PLAYER2_FOLD = "player2_fold"
 
+class DurabilityMode(str, Enum):
+    SYNC = "sync"  # 액션마다 즉시 커밋 (실제 재화가 걸린 방)
+    BATCHED = "batched"  # 메모리에 모았다가 일괄 저장 (일반 방)
@@ -9,16 +9,17 @@ class Match(Base):
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     room_id = Column(BigInteger, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     status = Column(String(20), nullable=False)  # MatchStatus enum
-    deck_seed = Column(BigInteger, nullable=False)
+    deck_seed = Column(BigInteger, nullable=False)  # 덱 순열은 이 시드에서 계산
+    deck_cursor = Column(Integer, nullable=False, server_default="0")  # 다음에 딜링할 위치 (0부터)
+    state_version = Column(BigInteger, nullable=False, default=0, server_default="0")  # 매치/라운드 상태가 바뀔 때마다 증가 (ETag)
     settings = Column(JSON, nullable=False, server_default="{}")
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     ended_at = Column(DateTime, nullable=True)
     
     # Relationships
     room = relationship("Room", back_populates="matches")
-    match_players = relationship("MatchPlayer", back_populates="match", cascade="all, delete-orphan")
+    match_players = relationship("MatchPlayer", back_populates="match", cascade="all, delete-orphan", order_by="MatchPlayer.seat")
     rounds = relationship("Round", back_populates="match", cascade="all, delete-orphan")
-    deck_instances = relationship("DeckInstance", back_populates="match", cascade="all, delete-orphan")
     
     __table_args__ = (
         Index("idx_matches_room_status", "room_id", "status"),
@@ -39,5 +40,6 @@ class MatchPlayer(Base):
     
     __table_args__ = (
         UniqueConstraint("match_id", "seat", name="uq_match_seat"),
+        Index("idx_match_players_user_match", "user_id", "match_id"),  # 사용자별 매치 기록
     )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Integer, String, DateTime, ForeignKey, JSON, func, Index, UniqueConstraint, Boolean
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, ForeignKey, JSON, func, Index, UniqueConstraint, Boolean
 from sqlalchemy.orm import relationship
 from database import Base
 from .enums import RoundState, ActionType, CardSide, RoundResult
@@ -14,6 +14,8 @@ class Round(Base):
     carry_over_pot = Column(Integer, nullable=False, server_default="0")
     current_turn_user_id = Column(BigInteger, ForeignKey("users.id"), nullable=True)
     min_bet = Column(Integer, nullable=False, server_default="1")
+    current_bet = Column(Integer, nullable=False, server_default="0")  # 이번 라운드 최고 bet/raise 금액
+    action_seq = Column(Integer, nullable=False, server_default="0")  # 이번 라운드에 기록된 액션 수
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     ended_at = Column(DateTime, nullable=True)
     
@@ -27,8 +29,8 @@ class Round(Base):
     match = relationship("Match", back_populates="rounds")
     current_turn_user = relationship("User", foreign_keys=[current_turn_user_id])
     winner = relationship("User", foreign_keys=[winner_id])
-    round_cards = relationship("RoundCard", back_populates="round", cascade="all, delete-orphan")
-    actions = relationship("Action", back_populates="round", cascade="all, delete-orphan")
+    round_cards = relationship("RoundCard", back_populates="round", cascade="all, delete-orphan", order_by="RoundCard.player_id")
+    actions = relationship("Action", back_populates="round", cascade="all, delete-orphan", order_by="(Action.created_at, Action.id)")
     
     __table_args__ = (
         UniqueConstraint("match_id", "round_no", name="uq_match_round"),
@@ -43,6 +45,7 @@ class RoundCard(Base):
     front_value = Column(Integer, nullable=False)
     back_value = Column(Integer, nullable=False)
     chosen_side = Column(String(20), nullable=True)  # CardSide enum
+    bet_total = Column(Integer, nullable=False, server_default="0")  # 이번 라운드 누적 베팅액 (bet/raise/call 합계)
     
     # Relationships
     round = relationship("Round", back_populates="round_cards")
@@ -71,3 +74,18 @@ class Action(Base):
         Index("idx_actions_round_created", "round_id", "created_at"),
     )
 
+class ActionDeadLetter(Base):
+    """batched 액션 로그에서 행 오류로 끝내 저장하지 못한 Action 행 (버리지 않고 보관, FK 없음)"""
+    __tablename__ = "action_dead_letters"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    action_id = Column(BigInteger, nullable=False)  # 할당되었던 actions.id
+    round_id = Column(BigInteger, nullable=True)
+    row = Column(JSON, nullable=False)  # 저장하려던 Action 행 전체
+    error = Column(Text, nullable=False)  # 마지막 실패 원인
+    attempts = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index("idx_action_dead_letters_round", "round_id"),
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, BigInteger, Integer, DateTime, ForeignKey, func, Index
+from sqlalchemy.orm import relationship
+from database import Base
+
+class PlayerStats(Base):
+    """사용자별 누적 통계 (라운드/매치가 끝날 때 증가분만 반영, 조회는 PK 1회)"""
+    __tablename__ = "player_stats"
+    
+    user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    matches_played = Column(Integer, nullable=False, server_default="0")  # 종료된 매치 수
+    matches_won = Column(Integer, nullable=False, server_default="0")
+    rounds_played = Column(Integer, nullable=False, server_default="0")  # 종료된 라운드 수
+    rounds_won = Column(Integer, nullable=False, server_default="0")
+    folds = Column(Integer, nullable=False, server_default="0")
+    double_side_attempts = Column(Integer, nullable=False, server_default="0")  # 양면베팅을 선택한 라운드 수
+    double_side_wins = Column(Integer, nullable=False, server_default="0")  # 그중 이긴 라운드 수
+    net_chips = Column(BigInteger, nullable=False, server_default="0")  # 종료된 매치의 (최종 칩 - 시작 칩) 합계
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+    
+    # Relationships
+    user = relationship("User")
+    
+    __table_args__ = (
+        # 리더보드 (역순 인덱스 스캔 + LIMIT)
+        Index("idx_player_stats_net_chips", "net_chips", "user_id"),
+        Index("idx_player_stats_matches_won", "matches_won", "user_id"),
+    )
@@ -1,107 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
-from models.match import Match, MatchPlayer
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models.match import Match
 from models.enums import MatchStatus
 from schemas.match import MatchStart, MatchResponse
-from services.game_service import GameService
+from services.game_service import AsyncGameService
+from services.round_engine import round_engine
+from services.match_cache import match_cache
+from utils.responses import json_response, load_match_response, load_state_version, not_modified, state_etag
 
 router = APIRouter(prefix="/api/matches", tags=["matches"])
 
 @router.post("", response_model=MatchResponse)
-def start_match(match_data: MatchStart, db: Session = Depends(get_db)):
+async def start_match(match_data: MatchStart, db: AsyncSession = Depends(get_async_db)):
     """매치 시작"""
     try:
-        match = GameService.start_match(db, match_data.room_id)
-        
-        players = db.query(MatchPlayer).filter(
-            MatchPlayer.match_id == match.id
-        ).all()
-        
-        return MatchResponse(
-            id=match.id,
-            room_id=match.room_id,
-            status=match.status,
-            deck_seed=match.deck_seed,
-            created_at=match.created_at,
-            ended_at=match.ended_at,
-            players=[
-                {
-                    "user_id": p.user_id,
-                    "username": p.user.username,
-                    "seat": p.seat,
-                    "chips": p.chips,
-                    "is_bot": p.is_bot
-                }
-                for p in players
-            ]
-        )
+        match = await AsyncGameService.start_match(db, match_data.room_id, match_data.durability)
+        return json_response(await load_match_response(db, Match.id == match.id))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"매치 시작 실패: {str(e)}")
 
 @router.get("/room/{room_id}", response_model=MatchResponse)
-def get_match_by_room(room_id: int, db: Session = Depends(get_db)):
-    """룸 ID로 매치 정보 조회"""
-    match = db.query(Match).filter(
-        Match.room_id == room_id,
-        Match.status == MatchStatus.ACTIVE
-    ).order_by(Match.created_at.desc()).first()
+async def get_match_by_room(
+    room_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """룸 ID로 매치 정보 조회 (If-None-Match가 현재 상태 버전과 같으면 304)"""
+    if "if-none-match" in request.headers:
+        # 라운드 엔진이 관리 중인 매치는 DB 조회 없이 비교
+        live = round_engine.match_for_room(room_id)
+        if live:
+            version = (live.id, live.state_version)
+        else:
+            # 룸의 활성 매치 id는 캐시에서 찾고 상태 버전만 PK로 조회
+            match_id = await match_cache.active_match_id_async(db, room_id)
+            version = None
+            if match_id is not None:
+                version = await load_state_version(db, Match.id == match_id, Match.status == MatchStatus.ACTIVE)
+        if version:
+            cached = not_modified(request, state_etag(*version))
+            if cached:
+                return cached
     
-    if not match:
+    # 라운드 엔진에 남아 있는 칩/상태 변경을 먼저 기록
+    await round_engine.flush_room(room_id)
+    result = None
+    match_id = await match_cache.active_match_id_async(db, room_id)
+    if match_id is not None:
+        result = await load_match_response(db, Match.id == match_id, Match.status == MatchStatus.ACTIVE)
+        if not result:
+            # 다른 워커에서 종료된 매치가 캐시에 남아 있던 경우: 항목을 비우고 룸 조건으로 다시 조회
+            match_cache.invalidate_room(room_id)
+            result = await load_match_response(
+                db,
+                Match.room_id == room_id,
+                Match.status == MatchStatus.ACTIVE,
+                latest=True
+            )
+    if not result:
         raise HTTPException(status_code=404, detail="활성 매치를 찾을 수 없습니다")
     
-    players = db.query(MatchPlayer).filter(
-        MatchPlayer.match_id == match.id
-    ).all()
-    
-    return MatchResponse(
-        id=match.id,
-        room_id=match.room_id,
-        status=match.status,
-        deck_seed=match.deck_seed,
-        created_at=match.created_at,
-        ended_at=match.ended_at,
-        players=[
-            {
-                "user_id": p.user_id,
-                "username": p.user.username,
-                "seat": p.seat,
-                "chips": p.chips,
-                "is_bot": p.is_bot
-            }
-            for p in players
-        ]
-    )
+    return json_response(result, state_etag(result["id"], result["state_version"]))
 
 @router.get("/{match_id}", response_model=MatchResponse)
-def get_match(match_id: int, db: Session = Depends(get_db)):
-    """매치 정보 조회"""
-    match = db.query(Match).filter(Match.id == match_id).first()
-    if not match:
-        raise HTTPException(status_code=404, detail="매치를 찾을 수 없습니다")
+async def get_match(
+    match_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """매치 정보 조회 (If-None-Match가 현재 상태 버전과 같으면 304)"""
+    if "if-none-match" in request.headers:
+        # 라운드 엔진이 관리 중인 매치는 DB 조회 없이 비교
+        live_version = round_engine.state_version(match_id)
+        if live_version is not None:
+            version = (match_id, live_version)
+        else:
+            version = await load_state_version(db, Match.id == match_id)
+        if version:
+            cached = not_modified(request, state_etag(*version))
+            if cached:
+                return cached
     
-    players = db.query(MatchPlayer).filter(
-        MatchPlayer.match_id == match_id
-    ).all()
+    # 라운드 엔진에 남아 있는 칩/상태 변경을 먼저 기록
+    await round_engine.flush(match_id)
+    result = await load_match_response(db, Match.id == match_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="매치를 찾을 수 없습니다")
     
-    return MatchResponse(
-        id=match.id,
-        room_id=match.room_id,
-        status=match.status,
-        deck_seed=match.deck_seed,
-        created_at=match.created_at,
-        ended_at=match.ended_at,
-        players=[
-            {
-                "user_id": p.user_id,
-                "username": p.user.username,
-                "seat": p.seat,
-                "chips": p.chips,
-                "is_bot": p.is_bot
-            }
-            for p in players
-        ]
-    )
-
+    return json_response(result, state_etag(result["id"], result["state_version"]))
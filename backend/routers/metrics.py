@@ -0,0 +1,56 @@
+from fastapi import APIRouter
+from database import engine, async_engine
+from utils.pool_metrics import sync_pool_metrics, async_pool_metrics
+from services.action_log import action_log
+from services.deck_service import deck_provider
+from utils.auth import auth_cache
+from services.match_watcher import match_watcher
+from services.round_broadcast import round_stream
+from services.match_cache import match_cache
+from services.websocket_manager import manager
+from services.ws_commands import game_commands
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+@router.get("/db-pool")
+async def get_db_pool_metrics():
+    """커넥션 풀 상태 및 체크아웃 대기 시간/고갈 이벤트 조회"""
+    return {
+        "sync": sync_pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+    }
+
+@router.get("/action-log")
+async def get_action_log_metrics():
+    """액션 로그 일괄 저장 현황 (대기 중인 행, flush 횟수 등) 조회"""
+    return action_log.stats()
+
+@router.get("/deck-cache")
+async def get_deck_cache_metrics():
+    """시드별 덱 순열 LRU 캐시 현황 조회"""
+    return deck_provider.stats()
+
+@router.get("/auth-cache")
+async def get_auth_cache_metrics():
+    """사용자 역할 캐시 현황 조회"""
+    return auth_cache.stats()
+
+@router.get("/long-poll")
+async def get_long_poll_metrics():
+    """long-poll 대기 요청 수 및 깨움/시간 초과 횟수 조회"""
+    return match_watcher.stats()
+
+@router.get("/round-events")
+async def get_round_event_metrics():
+    """룸별 라운드 이벤트 스트림 현황 (변경분/스냅샷 전송 횟수) 조회"""
+    return round_stream.stats()
+
+@router.get("/match-cache")
+async def get_match_cache_metrics():
+    """룸→활성 매치, 매치→좌석 캐시 현황 조회"""
+    return match_cache.stats()
+
+@router.get("/websocket")
+async def get_websocket_metrics():
+    """웹소켓 연결별 송신 대기열 현황 (대기 메시지 수, 버림/합침/느린 연결 종료 횟수)과 게임 명령 처리 현황 조회"""
+    return {**manager.stats(), "commands": game_commands.stats()}
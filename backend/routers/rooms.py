@@ -1,26 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models.room import Room
 from models.user import User
-from models.enums import RoomStatus
-from schemas.room import RoomCreate, RoomJoin, RoomResponse
-from services.game_service import GameService
+from models.match import Match
+from models.enums import RoomStatus, MatchStatus
+from schemas.room import RoomCreate, RoomJoin, RoomResponse, RoomSnapshotResponse
+from services.game_service import AsyncGameService
+from services.round_engine import round_engine
+from services.match_cache import match_cache
+from services.round_broadcast import round_view
 from utils.auth import check_permission
+from utils.responses import json_response, load_game_snapshot, load_state_version, not_modified, state_etag
 import secrets
 
 router = APIRouter(prefix="/api/rooms", tags=["rooms"])
 
 @router.post("", response_model=RoomResponse)
-def create_room(room_data: RoomCreate, db: Session = Depends(get_db)):
+async def create_room(room_data: RoomCreate, db: AsyncSession = Depends(get_async_db)):
     """룸 생성"""
     # 플레이어 확인
-    player = db.query(User).filter(User.id == room_data.player1_id).first()
+    player = await db.get(User, room_data.player1_id)
     if not player:
         raise HTTPException(status_code=404, detail="플레이어를 찾을 수 없습니다")
     
     # 권한 체크: create_room 권한 필요
-    check_permission(db, room_data.player1_id, "create_room")
+    await db.run_sync(check_permission, room_data.player1_id, "create_room")
     
     # 초대 코드 생성
     invite_code = secrets.token_urlsafe(8)[:16]
@@ -33,15 +39,15 @@ def create_room(room_data: RoomCreate, db: Session = Depends(get_db)):
         player2_id=None
     )
     db.add(room)
-    db.commit()
-    db.refresh(room)
+    await db.commit()
+    await db.refresh(room)
     
     return room
 
 @router.post("/{room_id}/join", response_model=RoomResponse)
-def join_room(room_id: int, join_data: RoomJoin, db: Session = Depends(get_db)):
+async def join_room(room_id: int, join_data: RoomJoin, db: AsyncSession = Depends(get_async_db)):
     """룸 참가"""
-    room = db.query(Room).filter(Room.id == room_id).first()
+    room = await db.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="룸을 찾을 수 없습니다")
     
@@ -55,7 +61,7 @@ def join_room(room_id: int, join_data: RoomJoin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="룸이 이미 가득 찼습니다")
     
     # 플레이어 확인
-    player = db.query(User).filter(User.id == join_data.player2_id).first()
+    player = await db.get(User, join_data.player2_id)
     if not player:
         raise HTTPException(status_code=404, detail="플레이어를 찾을 수 없습니다")
     
@@ -65,26 +71,64 @@ def join_room(room_id: int, join_data: RoomJoin, db: Session = Depends(get_db)):
     if room.player1_id and room.player2_id:
         try:
             # 매치 시작
-            match = GameService.start_match(db, room.id)
+            match = await AsyncGameService.start_match(db, room.id)
             # 첫 라운드 시작
-            GameService.start_round(db, match.id, round_no=1)
+            await AsyncGameService.start_round(db, match.id, round_no=1)
             # 룸 상태를 PLAYING으로 변경
             room.status = RoomStatus.PLAYING
         except Exception as e:
             # 매치 시작 실패 시 에러 반환
             raise HTTPException(status_code=500, detail=f"게임 시작 실패: {str(e)}")
     
-    db.commit()
-    db.refresh(room)
+    await db.commit()
+    await db.refresh(room)
     
     return room
 
 @router.get("/{room_id}", response_model=RoomResponse)
-def get_room(room_id: int, db: Session = Depends(get_db)):
+async def get_room(room_id: int, db: AsyncSession = Depends(get_async_db)):
     """룸 정보 조회"""
-    room = db.query(Room).filter(Room.id == room_id).first()
+    room = await db.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="룸을 찾을 수 없습니다")
     
     return room
 
+@router.get("/{room_id}/snapshot", response_model=RoomSnapshotResponse)
+async def get_room_snapshot(
+    room_id: int,
+    request: Request,
+    viewer_id: Optional[int] = Query(None, description="조회하는 플레이어 ID (공개 전에는 이 플레이어의 카드 값만 포함)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """룸, 활성 매치(플레이어/칩), 현재 라운드, 직전 라운드 결과를 한 번에 조회
+    
+    활성 매치가 있으면 ETag가 매치 상태 버전과 같아 If-None-Match로 304를 받을 수 있습니다.
+    """
+    if "if-none-match" in request.headers:
+        # 라운드 엔진이 관리 중인 매치는 DB 조회 없이 비교
+        live = round_engine.match_for_room(room_id)
+        if live:
+            version = (live.id, live.state_version)
+        else:
+            # 룸의 활성 매치 id는 캐시에서 찾고 상태 버전만 PK로 조회
+            match_id = await match_cache.active_match_id_async(db, room_id)
+            version = None
+            if match_id is not None:
+                version = await load_state_version(db, Match.id == match_id, Match.status == MatchStatus.ACTIVE)
+        if version:
+            cached = not_modified(request, state_etag(*version))
+            if cached:
+                return cached
+    
+    # 라운드 엔진에 남아 있는 칩/상태 변경을 먼저 기록
+    await round_engine.flush_room(room_id)
+    snapshot = await load_game_snapshot(db, room_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="룸을 찾을 수 없습니다")
+    
+    if snapshot["current_round"]:
+        snapshot["current_round"] = round_view(snapshot["current_round"], viewer_id)
+    match = snapshot["match"]
+    etag = state_etag(match["id"], match["state_version"]) if match else None
+    return json_response(snapshot, etag)
@@ -1,55 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
-from models.round import Round, RoundCard, Action
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, AsyncSessionLocal
+from models.round import Round
 from models.match import Match
 from schemas.round import RoundResponse, SideSelectionRequest, ActionRequest, ActionResponse
-from services.game_service import GameService
-from services.betting_service import BettingService
+from services.game_service import AsyncGameService
+from services.betting_service import AsyncBettingService
+from services.round_engine import round_engine, LiveRound
+from services.match_watcher import match_watcher, LONG_POLL_TIMEOUT, LONG_POLL_MAX_TIMEOUT
+from services.round_broadcast import publish_round, room_id_for_match, round_view
+from utils.responses import (
+    json_response, load_round_response, load_state_version, not_modified, round_payload, set_etag, state_etag
+)
 
 router = APIRouter(prefix="/api/rounds", tags=["rounds"])
 
 @router.post("/{match_id}/start", response_model=RoundResponse)
-def start_round(match_id: int, db: Session = Depends(get_db)):
+async def start_round(
+    match_id: int,
+    viewer_id: Optional[int] = Query(None, description="조회하는 플레이어 ID (공개 전에는 이 플레이어의 카드 값만 포함)"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """라운드 시작 (딜링, 기본 베팅)"""
     try:
-        round = GameService.start_round(db, match_id)
-        return _build_round_response(db, round)
+        round = await AsyncGameService.start_round(db, match_id)
+        return json_response(await publish_round(db, round, viewer_id))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"라운드 시작 실패: {str(e)}")
 
 @router.post("/{round_id}/select-side", response_model=RoundResponse)
-def select_side(round_id: int, request: SideSelectionRequest, db: Session = Depends(get_db)):
+async def select_side(round_id: int, request: SideSelectionRequest, db: AsyncSession = Depends(get_async_db)):
     """베팅 면 선택"""
     try:
-        round = GameService.select_side(db, round_id, request.player_id, request.side)
-        return _build_round_response(db, round)
+        round = await AsyncGameService.select_side(db, round_id, request.player_id, request.side)
+        return json_response(await publish_round(db, round, request.player_id))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"면 선택 실패: {str(e)}")
 
 @router.post("/{round_id}/action", response_model=ActionResponse)
-def perform_action(round_id: int, request: ActionRequest, db: Session = Depends(get_db)):
+async def perform_action(round_id: int, request: ActionRequest, db: AsyncSession = Depends(get_async_db)):
     """베팅 액션 수행 (트랜잭션 처리)"""
     try:
-        round = BettingService.process_action(
+        round = await AsyncBettingService.process_action(
             db, 
             round_id, 
             request.player_id, 
             request.action_type, 
             request.amount
         )
-        return ActionResponse(
-            success=True,
-            message="액션이 성공적으로 처리되었습니다",
-            round=_build_round_response(db, round)
-        )
+        return json_response({
+            "success": True,
+            "message": "액션이 성공적으로 처리되었습니다",
+            "round": await publish_round(db, round, request.player_id)
+        })
     except ValueError as e:
         # 예외 발생 시 롤백
-        db.rollback()
+        await db.rollback()
         return ActionResponse(
             success=False,
             message=str(e),
@@ -57,7 +69,7 @@ def perform_action(round_id: int, request: ActionRequest, db: Session = Depends(
         )
     except Exception as e:
         # 예외 발생 시 롤백
-        db.rollback()
+        await db.rollback()
         return ActionResponse(
             success=False,
             message=f"액션 처리 실패: {str(e)}",
@@ -65,64 +77,106 @@ def perform_action(round_id: int, request: ActionRequest, db: Session = Depends(
         )
 
 @router.get("/match/{match_id}/current", response_model=RoundResponse)
-def get_current_round(match_id: int, db: Session = Depends(get_db)):
-    """매치의 현재 라운드 정보 조회"""
-    round = db.query(Round).filter(
-        Round.match_id == match_id
-    ).order_by(Round.round_no.desc()).first()
+async def get_current_round(
+    match_id: int,
+    request: Request,
+    viewer_id: Optional[int] = Query(None, description="조회하는 플레이어 ID (공개 전에는 이 플레이어의 카드 값만 포함)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """매치의 현재 라운드 정보 조회 (If-None-Match가 현재 상태 버전과 같으면 304)"""
+    live_round = round_engine.current_round(match_id)
+    if live_round:
+        return _live_response(live_round, request, viewer_id)
+    
+    # 본문을 만들기 전에 상태 버전만 먼저 비교
+    if "if-none-match" in request.headers:
+        version = await load_state_version(db, Match.id == match_id)
+        if version:
+            cached = not_modified(request, state_etag(*version))
+            if cached:
+                return cached
     
-    if not round:
+    result = await load_round_response(db, Round.match_id == match_id, latest=True)
+    if not result:
         raise HTTPException(status_code=404, detail="라운드를 찾을 수 없습니다")
     
-    return _build_round_response(db, round)
+    return json_response(round_view(result, viewer_id), state_etag(result["match_id"], result["state_version"]))
 
-@router.get("/{round_id}", response_model=RoundResponse)
-def get_round(round_id: int, db: Session = Depends(get_db)):
-    """라운드 정보 조회"""
-    round = db.query(Round).filter(Round.id == round_id).first()
-    if not round:
-        raise HTTPException(status_code=404, detail="라운드를 찾을 수 없습니다")
+@router.get("/match/{match_id}/wait", response_model=RoundResponse)
+async def wait_for_round(
+    match_id: int,
+    since: int = Query(..., ge=0, description="클라이언트가 가진 state_version"),
+    timeout: float = Query(LONG_POLL_TIMEOUT, gt=0, le=LONG_POLL_MAX_TIMEOUT, description="최대 대기 시간 (초)"),
+    viewer_id: Optional[int] = Query(None, description="조회하는 플레이어 ID (공개 전에는 이 플레이어의 카드 값만 포함)")
+):
+    """현재 라운드가 since 버전에서 바뀔 때까지 대기 (long-poll, 시간 초과 시 304)
     
-    return _build_round_response(db, round)
+    대기하는 동안 DB 세션을 잡지 않도록 확인할 때마다 짧은 세션을 엽니다.
+    다른 워커에서 커밋된 변경도 룸 pub/sub 채널의 match_changed 이벤트로 깨어납니다.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    async with AsyncSessionLocal() as db:
+        room_id = await room_id_for_match(db, match_id)
+    if room_id is None:
+        raise HTTPException(status_code=404, detail="매치를 찾을 수 없습니다")
+    async with match_watcher.watch(match_id, room_id):
+        while True:
+            # 상태를 확인하기 전에 세대를 읽어야 확인 직후의 변경도 놓치지 않음
+            generation = match_watcher.generation(match_id)
+            live_round = round_engine.current_round(match_id)
+            if live_round:
+                version = round_engine.state_version(match_id)
+                if version != since:
+                    result = round_view(round_payload(live_round, version), viewer_id)
+                    return json_response(result, state_etag(match_id, version))
+            else:
+                async with AsyncSessionLocal() as db:
+                    current = await load_state_version(db, Match.id == match_id)
+                    if not current:
+                        raise HTTPException(status_code=404, detail="매치를 찾을 수 없습니다")
+                    if current[1] != since:
+                        result = await load_round_response(db, Round.match_id == match_id, latest=True)
+                        if not result:
+                            raise HTTPException(status_code=404, detail="라운드를 찾을 수 없습니다")
+                        return json_response(round_view(result, viewer_id), state_etag(match_id, result["state_version"]))
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await match_watcher.wait(match_id, generation, remaining):
+                cached = Response(status_code=304)
+                set_etag(cached, state_etag(match_id, since))
+                return cached
 
-def _build_round_response(db: Session, round: Round) -> RoundResponse:
-    """Round 객체를 RoundResponse로 변환"""
-    cards = db.query(RoundCard).filter(RoundCard.round_id == round.id).all()
-    actions = db.query(Action).filter(Action.round_id == round.id).order_by(Action.created_at).all()
+@router.get("/{round_id}", response_model=RoundResponse)
+async def get_round(
+    round_id: int,
+    request: Request,
+    viewer_id: Optional[int] = Query(None, description="조회하는 플레이어 ID (공개 전에는 이 플레이어의 카드 값만 포함)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """라운드 정보 조회 (If-None-Match가 현재 상태 버전과 같으면 304)"""
+    live_round = round_engine.cached_round(round_id)
+    if live_round:
+        return _live_response(live_round, request, viewer_id)
+    
+    if "if-none-match" in request.headers:
+        version = await load_state_version(db, round_id=round_id)
+        if version:
+            cached = not_modified(request, state_etag(*version))
+            if cached:
+                return cached
+    
+    result = await load_round_response(db, Round.id == round_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="라운드를 찾을 수 없습니다")
     
-    return RoundResponse(
-        id=round.id,
-        match_id=round.match_id,
-        round_no=round.round_no,
-        state=round.state,
-        pot=round.pot,
-        carry_over_pot=round.carry_over_pot,
-        current_turn_user_id=round.current_turn_user_id,
-        min_bet=round.min_bet,
-        result=round.result,
-        winner_id=round.winner_id,
-        is_double_side_bet=round.is_double_side_bet,
-        double_side_bonus=round.double_side_bonus,
-        created_at=round.created_at,
-        ended_at=round.ended_at,
-        cards=[
-            {
-                "player_id": c.player_id,
-                "front_value": c.front_value,
-                "back_value": c.back_value,
-                "chosen_side": c.chosen_side
-            }
-            for c in cards
-        ],
-        actions=[
-            {
-                "id": a.id,
-                "player_id": a.player_id,
-                "action_type": a.action_type,
-                "amount": a.amount,
-                "created_at": a.created_at
-            }
-            for a in actions
-        ]
-    )
+    return json_response(round_view(result, viewer_id), state_etag(result["match_id"], result["state_version"]))
 
+def _live_response(live_round: LiveRound, request: Request, viewer_id: Optional[int]):
+    """라운드 엔진의 메모리 상태로 viewer_id 시점의 응답 (버전 비교와 본문 모두 DB 조회 없음)"""
+    version = round_engine.state_version(live_round.match_id)
+    etag = state_etag(live_round.match_id, version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return json_response(round_view(round_payload(live_round, version), viewer_id), etag)
@@ -0,0 +1,68 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models.user import User
+from models.stats import PlayerStats
+from schemas.stats import PlayerStatsResponse, LeaderboardResponse
+from services.round_engine import round_engine
+from utils.auth import check_permission
+from utils.responses import json_response, player_stats_payload
+
+router = APIRouter(prefix="/api/stats", tags=["stats"])
+
+# 리더보드 정렬 기준 (각각 player_stats 인덱스로 정렬)
+_LEADERBOARD_ORDER = {
+    "net_chips": PlayerStats.net_chips,
+    "matches_won": PlayerStats.matches_won,
+}
+
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    viewer_id: int = Query(..., description="조회하는 사용자 ID"),
+    sort: Literal["net_chips", "matches_won"] = Query("net_chips", description="정렬 기준"),
+    limit: int = Query(10, ge=1, le=100, description="상위 N명"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """상위 N명 리더보드 (종료된 매치가 있는 플레이어만, player_stats 인덱스 역순 스캔)"""
+    await db.run_sync(check_permission, viewer_id, "view_game_data")
+    # 조회자의 매치에 남아 있는 통계 증가분만 먼저 기록 (다른 매치는 write-behind 주기에 반영)
+    await round_engine.flush_user(viewer_id)
+    
+    column = _LEADERBOARD_ORDER[sort]
+    rows = (await db.execute(
+        select(PlayerStats, User.username)
+        .join(User, User.id == PlayerStats.user_id)
+        .where(PlayerStats.matches_played > 0)
+        .order_by(column.desc(), PlayerStats.user_id.desc())
+        .limit(limit)
+    )).all()
+    return json_response({
+        "sort": sort,
+        "entries": [
+            {"rank": rank, **player_stats_payload(stats, username, stats.user_id)}
+            for rank, (stats, username) in enumerate(rows, start=1)
+        ]
+    })
+
+@router.get("/users/{user_id}", response_model=PlayerStatsResponse)
+async def get_player_stats(
+    user_id: int,
+    viewer_id: int = Query(..., description="조회하는 사용자 ID"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """사용자 누적 통계 조회 (기록 양과 관계없이 PK 조회 1회)"""
+    await db.run_sync(check_permission, viewer_id, "view_game_data")
+    await round_engine.flush_user(user_id)
+    
+    row = (await db.execute(
+        select(User.username, PlayerStats)
+        .outerjoin(PlayerStats, PlayerStats.user_id == User.id)
+        .where(User.id == user_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
+    
+    username, stats = row
+    return json_response(player_stats_payload(stats, username, user_id))
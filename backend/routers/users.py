@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
 from pydantic import BaseModel
-from database import get_db
+from typing import Optional
+from database import get_async_db
 from models.user import User
 from models.role import Role, UserRole
 from schemas.user import UserCreate, UserResponse
-from utils.auth import check_permission
+from schemas.match import MatchHistoryResponse
+from services.round_engine import round_engine
+from utils.auth import check_permission, auth_cache
+from utils.responses import json_response, load_match_history
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -39,62 +44,74 @@ def grant_postgres_role(db: Session, username: str, role_name: str):
         db.rollback()
 
 @router.post("", response_model=UserResponse)
-def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """사용자 생성"""
     # 중복 확인
-    existing = db.query(User).filter(User.username == user_data.username).first()
+    existing = (await db.execute(
+        select(User).where(User.username == user_data.username)
+    )).scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="이미 존재하는 사용자명입니다")
     
     user = User(username=user_data.username)
     db.add(user)
-    db.flush()  # ID를 얻기 위해 flush
+    await db.flush()  # ID를 얻기 위해 flush
     
     # 기본 역할 부여 (member) - 애플리케이션 레벨
-    member_role = db.query(Role).filter(Role.name == "member").first()
+    member_role = (await db.execute(
+        select(Role).where(Role.name == "member")
+    )).scalars().first()
     if member_role:
         user_role = UserRole(user_id=user.id, role_id=member_role.id)
         db.add(user_role)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    auth_cache.invalidate_user(user.id)
+    await db.refresh(user)
     
     return user
 
 @router.post("/guest", response_model=UserResponse)
-def create_guest_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def create_guest_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """게스트 사용자 생성 (게스트 역할 자동 부여)"""
     # 중복 확인
-    existing = db.query(User).filter(User.username == user_data.username).first()
+    existing = (await db.execute(
+        select(User).where(User.username == user_data.username)
+    )).scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="이미 존재하는 사용자명입니다")
     
     user = User(username=user_data.username)
     db.add(user)
-    db.flush()  # ID를 얻기 위해 flush
+    await db.flush()  # ID를 얻기 위해 flush
     
     # 게스트 역할 부여 - 애플리케이션 레벨
-    guest_role = db.query(Role).filter(Role.name == "guest").first()
+    guest_role = (await db.execute(
+        select(Role).where(Role.name == "guest")
+    )).scalars().first()
     if guest_role:
         user_role = UserRole(user_id=user.id, role_id=guest_role.id)
         db.add(user_role)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    auth_cache.invalidate_user(user.id)
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=UserResponse)
-def login(user_data: UserCreate, db: Session = Depends(get_db)):
+async def login(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """username으로 로그인"""
     from utils.auth import get_user_roles
     
-    user = db.query(User).filter(User.username == user_data.username).first()
+    user = (await db.execute(
+        select(User).where(User.username == user_data.username)
+    )).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
     
     # 사용자 역할 가져오기
-    roles = get_user_roles(db, user.id)
+    roles = await db.run_sync(get_user_roles, user.id)
     
     # UserResponse에 역할 정보 포함
     user_dict = {
@@ -106,51 +123,71 @@ def login(user_data: UserCreate, db: Session = Depends(get_db)):
     return UserResponse(**user_dict)
 
 @router.post("/{user_id}/assign-role", response_model=UserResponse)
-def assign_role(
+async def assign_role(
     user_id: int, 
     request: AssignRoleRequest, 
     admin_user_id: int = Query(..., description="역할을 부여하는 관리자 ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """사용자에게 역할 부여 (시스템 관리자만 가능)"""
     # 권한 체크: manage_roles 권한 필요
-    check_permission(db, admin_user_id, "manage_roles")
+    await db.run_sync(check_permission, admin_user_id, "manage_roles")
     
     # 사용자 확인
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
     
     # 역할 확인
-    role = db.query(Role).filter(Role.name == request.role_name).first()
+    role = (await db.execute(
+        select(Role).where(Role.name == request.role_name)
+    )).scalars().first()
     if not role:
         raise HTTPException(status_code=404, detail="역할을 찾을 수 없습니다")
     
     # 이미 역할이 있는지 확인
-    existing = db.query(UserRole).filter(
-        UserRole.user_id == user_id,
-        UserRole.role_id == role.id
-    ).first()
+    existing = await db.get(UserRole, (user_id, role.id))
     
     if not existing:
         # 애플리케이션 레벨 역할 부여
         user_role = UserRole(user_id=user.id, role_id=role.id, granted_by=admin_user_id)
         db.add(user_role)
-        db.commit()
+        await db.commit()
+        auth_cache.invalidate_user(user.id)
     
     # AI 관리자 또는 시스템 관리자 역할이면 PostgreSQL 역할도 부여
     if request.role_name in ["ai_manager", "system_admin"]:
-        grant_postgres_role(db, user.username, request.role_name)
+        await db.run_sync(grant_postgres_role, user.username, request.role_name)
     
-    db.refresh(user)
+    await db.refresh(user)
     return user
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """사용자 정보 조회"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
     
     return user
 
+@router.get("/{user_id}/matches", response_model=MatchHistoryResponse)
+async def get_user_matches(
+    user_id: int,
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (생략 시 첫 페이지)"),
+    limit: int = Query(20, ge=1, le=100, description="페이지 크기"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """사용자의 매치 기록 조회 (최신순, (created_at, id) 키셋 페이지네이션)"""
+    # 라운드 엔진에 남아 있는 칩/상태 변경을 먼저 기록
+    await round_engine.flush_user(user_id)
+    try:
+        result = await load_match_history(db, user_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # 기록이 없을 때만 사용자 존재 여부 확인
+    if not result["items"] and not await db.get(User, user_id):
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
+    
+    return json_response(result)
@@ -1,43 +1,47 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
 from models.room import Room
-from services.websocket_manager import manager
+from services.websocket_manager import manager, BOTH_PLAYERS_READY
+from services.round_broadcast import round_stream, load_room_snapshot
+from services.ws_commands import game_commands, GAME_COMMANDS
 
 router = APIRouter()
 
 @router.websocket("/ws/room/{room_id}/user/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: int):
     """룸 웹소켓 연결"""
-    from database import SessionLocal
+    from database import AsyncSessionLocal
+    
+    # 룸 확인 (연결이 열려 있는 동안 DB 커넥션을 잡지 않도록 조회 직후 세션 반환)
+    async with AsyncSessionLocal() as db:
+        room = await db.get(Room, room_id)
+    if not room:
+        await websocket.close(code=1008, reason="룸을 찾을 수 없습니다")
+        return
+    
+    # 룸에 참가한 플레이어인지 확인
+    if room.player1_id != user_id and room.player2_id != user_id:
+        await websocket.close(code=1008, reason="이 룸에 참가한 플레이어가 아닙니다")
+        return
     
-    # 룸 확인
-    db = SessionLocal()
     try:
-        room = db.query(Room).filter(Room.id == room_id).first()
-        if not room:
-            await websocket.close(code=1008, reason="룸을 찾을 수 없습니다")
-            return
-        
-        # 룸에 참가한 플레이어인지 확인
-        if room.player1_id != user_id and room.player2_id != user_id:
-            await websocket.close(code=1008, reason="이 룸에 참가한 플레이어가 아닙니다")
-            return
-        
-        # 연결
+        # 연결 (같은 사용자의 다른 탭이 이 워커나 다른 워커에 이미 연결되어 있을 수 있음)
+        first_connection = not manager.is_user_online(room_id, user_id)
         await manager.connect(websocket, room_id, user_id)
         
         # 연결 성공 메시지
         await manager.send_personal_message({
             "type": "connected",
             "room_id": room_id,
-            "user_id": user_id
+            "user_id": user_id,
+            "seq": round_stream.seq(room_id)
         }, websocket)
         
-        # 룸의 다른 플레이어에게 연결 알림
-        await manager.broadcast_to_room(room_id, {
-            "type": "player_connected",
-            "user_id": user_id
-        }, exclude_user_id=user_id)
+        # 룸의 다른 플레이어에게 연결 알림 (첫 연결일 때만)
+        if first_connection:
+            await manager.broadcast_to_room(room_id, {
+                "type": "player_connected",
+                "user_id": user_id
+            }, exclude_user_id=user_id)
         
         # 두 플레이어가 모두 연결되었는지 확인
         if room.player1_id and room.player2_id:
@@ -46,23 +50,46 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: int):
             )
             
             if both_connected:
-                # 두 플레이어 모두 연결됨
-                await manager.broadcast_to_room(room_id, {
-                    "type": "both_players_ready",
-                    "message": "두 플레이어가 모두 준비되었습니다"
-                })
+                # 두 플레이어 모두 연결됨 (다른 워커는 이 연결의 접속 알림을 받아 자기 연결에 보냄)
+                await manager.send_to_room(room_id, BOTH_PLAYERS_READY)
         
         # 메시지 수신 루프
         while True:
             data = await websocket.receive_json()
+            manager.touch(websocket)
             message_type = data.get("type")
             
-            if message_type == "ping":
+            if message_type == "pong":
+                # 서버 하트비트 응답
+                continue
+            
+            elif message_type == "ping":
                 # 핑 응답
                 await manager.send_personal_message({
                     "type": "pong"
                 }, websocket)
             
+            elif message_type == "sync":
+                # 클라이언트의 순번이 현재와 다르면 전체 스냅샷 전송
+                seq = round_stream.seq(room_id)
+                if data.get("seq") == seq:
+                    await manager.send_personal_message({
+                        "type": "synced",
+                        "seq": seq
+                    }, websocket)
+                    continue
+                
+                async with AsyncSessionLocal() as sync_db:
+                    snapshot = await load_room_snapshot(sync_db, room_id, user_id)
+                await manager.send_personal_message(snapshot or {
+                    "type": "error",
+                    "message": "진행 중인 라운드가 없습니다"
+                }, websocket)
+            
+            elif message_type in GAME_COMMANDS:
+                # 게임 명령: 처리 결과를 request_id와 함께 ack로 응답 (룸에는 round 이벤트 전송)
+                ack = await game_commands.handle(room_id, user_id, data)
+                await manager.send_personal_message(ack, websocket)
             
             else:
                 await manager.send_personal_message({
@@ -71,20 +98,17 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: int):
                 }, websocket)
     
     except WebSocketDisconnect:
-        db.rollback()
-        manager.disconnect(websocket, room_id, user_id)
-        # 다른 플레이어에게 연결 해제 알림
-        try:
-            await manager.broadcast_to_room(room_id, {
-                "type": "player_disconnected",
-                "user_id": user_id
-            }, exclude_user_id=user_id)
-        except:
-            pass
+        last_connection = manager.disconnect(websocket, room_id, user_id)
+        # 다른 플레이어에게 연결 해제 알림 (남은 탭이 없을 때만)
+        if last_connection:
+            try:
+                await manager.broadcast_to_room(room_id, {
+                    "type": "player_disconnected",
+                    "user_id": user_id
+                }, exclude_user_id=user_id)
+            except:
+                pass
     except Exception as e:
-        db.rollback()
         print(f"웹소켓 오류: {e}")
         manager.disconnect(websocket, room_id, user_id)
-    finally:
-        db.close()
 
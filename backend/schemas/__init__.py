@@ -2,6 +2,7 @@ from .room import RoomCreate, RoomJoin, RoomResponse
 from .match import MatchStart, MatchResponse
 from .round import RoundResponse, SideSelectionRequest, ActionRequest, ActionResponse
 from .user import UserCreate, UserResponse
+from .stats import PlayerStatsResponse, LeaderboardResponse
 
 __all__ = [
     "RoomCreate",
@@ -15,5 +16,7 @@ __all__ = [
     "ActionResponse",
     "UserCreate",
     "UserResponse",
+    "PlayerStatsResponse",
+    "LeaderboardResponse",
 ]
 
@@ -4,6 +4,7 @@ from typing import Optional, List
 
 class MatchStart(BaseModel):
     room_id: int
+    durability: Optional[str] = None  # "sync" or "batched" (생략 시 서버 기본값)
 
 class MatchPlayerInfo(BaseModel):
     user_id: int
@@ -19,11 +20,30 @@ class MatchResponse(BaseModel):
     id: int
     room_id: int
     status: str
-    deck_seed: int
     created_at: datetime
     ended_at: Optional[datetime]
+    state_version: int  # 매치/라운드 상태 버전 (ETag와 동일)
     players: List[MatchPlayerInfo]
     
     class Config:
         from_attributes = True
 
+
+class MatchHistoryItem(BaseModel):
+    id: int
+    room_id: int
+    status: str
+    created_at: datetime
+    ended_at: Optional[datetime]
+    rounds_played: int
+    seat: int  # 조회한 사용자의 seat
+    final_chips: int  # 조회한 사용자의 칩 (진행 중이면 현재 칩)
+    winner_id: Optional[int]  # 종료된 매치에서 칩이 남은 플레이어 (진행 중이거나 무승부면 None)
+    players: List[MatchPlayerInfo]
+    
+    class Config:
+        from_attributes = True
+
+class MatchHistoryResponse(BaseModel):
+    items: List[MatchHistoryItem]
+    next_cursor: Optional[str]  # 다음 페이지 요청에 전달 (마지막 페이지면 None)
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
+from schemas.match import MatchResponse
+from schemas.round import RoundResponse, RoundResultInfo
 
 class RoomCreate(BaseModel):
     player1_id: int
@@ -19,3 +21,8 @@ class RoomResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RoomSnapshotResponse(BaseModel):
+    room: RoomResponse
+    match: Optional[MatchResponse]  # 활성 매치 (없으면 null)
+    current_round: Optional[RoundResponse]
+    previous_round: Optional[RoundResultInfo]  # 직전 라운드 결과
@@ -36,12 +36,28 @@ class RoundResponse(BaseModel):
     double_side_bonus: int
     created_at: datetime
     ended_at: Optional[datetime]
+    state_version: int  # 매치/라운드 상태 버전 (ETag와 동일)
     cards: List[RoundCardInfo]
     actions: List[ActionInfo]
     
     class Config:
         from_attributes = True
 
+class RoundResultInfo(BaseModel):
+    id: int
+    round_no: int
+    state: str
+    result: Optional[str]
+    winner_id: Optional[int]
+    pot: int
+    carry_over_pot: int
+    double_side_bonus: int
+    ended_at: Optional[datetime]
+    cards: List[RoundCardInfo]
+    
+    class Config:
+        from_attributes = True
+
 class SideSelectionRequest(BaseModel):
     player_id: int
     side: str  # "front", "back", or "double_side"
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+
+class PlayerStatsResponse(BaseModel):
+    user_id: int
+    username: str
+    matches_played: int
+    matches_won: int
+    rounds_played: int
+    rounds_won: int
+    folds: int
+    double_side_attempts: int
+    double_side_wins: int
+    double_side_success_rate: Optional[float]  # 양면베팅을 한 적이 없으면 None
+    net_chips: int
+    updated_at: Optional[datetime]  # 통계가 아직 없으면 None
+    
+    class Config:
+        from_attributes = True
+
+class LeaderboardEntry(PlayerStatsResponse):
+    rank: int
+
+class LeaderboardResponse(BaseModel):
+    sort: str
+    entries: List[LeaderboardEntry]
@@ -1,6 +1,12 @@
-from .deck_service import DeckService
-from .game_service import GameService
-from .betting_service import BettingService
-
-__all__ = ["DeckService", "GameService", "BettingService"]
+from .deck_service import DeckService, AsyncDeckService
+from .game_service import GameService, AsyncGameService
+from .betting_service import BettingService, AsyncBettingService
 
+__all__ = [
+    "DeckService",
+    "GameService",
+    "BettingService",
+    "AsyncDeckService",
+    "AsyncGameService",
+    "AsyncBettingService",
+]
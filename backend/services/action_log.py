@@ -0,0 +1,292 @@
+import os
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import event, insert, text
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.round import Action, ActionDeadLetter
+from models.enums import DurabilityMode
+
+# 매치 생성 시 기본 durability (매치별로 Match.settings["durability"]에 고정)
+ACTION_LOG_DURABILITY = os.getenv("ACTION_LOG_DURABILITY", DurabilityMode.SYNC.value)
+ACTION_LOG_BATCH_SIZE = int(os.getenv("ACTION_LOG_BATCH_SIZE", "500"))
+ACTION_LOG_FLUSH_INTERVAL_MS = int(os.getenv("ACTION_LOG_FLUSH_INTERVAL_MS", "50"))
+# 행 자체의 오류(FK 위반 등)로 저장에 실패한 행을 dead letter로 옮기기 전까지 시도할 횟수
+ACTION_LOG_MAX_ATTEMPTS = int(os.getenv("ACTION_LOG_MAX_ATTEMPTS", "3"))
+
+# 한 번에 미리 받아 두는 actions.id 개수
+ACTION_ID_BLOCK_SIZE = 64
+_NEXT_IDS_SQL = text("SELECT nextval('actions_id_seq') FROM generate_series(1, :n)")
+
+# 커밋 전까지 세션에 보관하는 batched 액션 (Session.info 키)
+_STAGED_KEY = "staged_action_rows"
+
+class ActionLogWriter:
+    """Action 기록을 메모리에 모았다가 multi-row INSERT로 일괄 저장 (write-behind)
+
+    sync 매치는 지금처럼 상태 변경과 같은 트랜잭션에서 Action을 기록하고,
+    batched 매치는 id만 미리 받아 버퍼에 쌓은 뒤 크기/시간 기준으로 한 번에 커밋합니다.
+    아직 저장되지 않은 액션은 pending_for_round()로 조회에 합쳐집니다.
+    행 오류(IntegrityError/DataError)로 실패한 배치는 반씩 나눠 다시 저장해 문제 행만 골라내고,
+    그 행이 max_attempts번 실패하면 action_dead_letters 테이블로 옮겨 나머지 기록이 멈추지 않게 합니다.
+    상태 변경은 이미 커밋되었으므로 이 행은 actions 기록에서 빠지며, 복구는 dead letter에서 수동으로 합니다.
+    """
+
+    def __init__(
+        self,
+        default_mode: str = ACTION_LOG_DURABILITY,
+        batch_size: int = ACTION_LOG_BATCH_SIZE,
+        flush_interval_ms: int = ACTION_LOG_FLUSH_INTERVAL_MS,
+        max_attempts: int = ACTION_LOG_MAX_ATTEMPTS,
+    ):
+        self.default_mode = default_mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_attempts = max_attempts
+        self._buffer: List[dict] = []
+        self._by_round: Dict[int, List[dict]] = {}
+        self._ids: List[int] = []
+        # action id -> 행 오류로 실패한 횟수
+        self._attempts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+        # 통계
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+
+    # ---- durability ----
+
+    def resolve_mode(self, mode: Optional[str] = None) -> str:
+        """요청된 모드(없으면 기본값)를 검증하여 반환"""
+        mode = mode or self.default_mode
+        if mode not in (DurabilityMode.SYNC.value, DurabilityMode.BATCHED.value):
+            raise ValueError(f"지원하지 않는 durability 모드: {mode}")
+        return mode
+
+    @staticmethod
+    def is_batched(settings: Optional[dict]) -> bool:
+        """매치 설정이 batched 모드인지 확인 (설정이 없으면 sync)"""
+        return (settings or {}).get("durability") == DurabilityMode.BATCHED.value
+
+    # ---- 기록 ----
+
+    def write(self, db: Session, settings: Optional[dict], round_id: int, action: dict):
+        """매치의 durability에 따라 Action을 세션에 추가하거나 버퍼에 적재"""
+        if not self.is_batched(settings):
+            db.add(Action(round_id=round_id, **action))
+            return
+        # 상태 변경이 커밋된 경우에만 버퍼로 이동 (롤백 시 폐기)
+        db.info.setdefault(_STAGED_KEY, []).append({
+            "id": self._next_id(db),
+            "round_id": round_id,
+            "created_at": datetime.now(),
+            **action,
+        })
+
+    def append(self, row: dict):
+        """id가 지정된 Action 행을 버퍼에 추가"""
+        with self._lock:
+            self._buffer.append(row)
+            self._by_round.setdefault(row["round_id"], []).append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full and self._wakeup:
+            self._wakeup.set()
+
+    def pending_for_round(self, round_id: int) -> List[dict]:
+        """아직 저장되지 않은 라운드의 액션"""
+        with self._lock:
+            return list(self._by_round.get(round_id, ()))
+
+    def pending_count(self) -> int:
+        return len(self._buffer)
+
+    # ---- id 할당 ----
+
+    def _next_id(self, db: Session) -> int:
+        with self._lock:
+            if self._ids:
+                return self._ids.pop()
+        ids = db.execute(_NEXT_IDS_SQL, {"n": ACTION_ID_BLOCK_SIZE}).scalars().all()
+        return self._store_ids(ids)
+
+    async def next_id(self, db: AsyncSession) -> int:
+        """actions 시퀀스에서 블록 단위로 확보해 둔 id 하나 반환"""
+        with self._lock:
+            if self._ids:
+                return self._ids.pop()
+        ids = (await db.execute(_NEXT_IDS_SQL, {"n": ACTION_ID_BLOCK_SIZE})).scalars().all()
+        return self._store_ids(ids)
+
+    def _store_ids(self, ids: List[int]) -> int:
+        with self._lock:
+            # pop()으로 작은 id부터 사용
+            self._ids.extend(sorted(ids, reverse=True))
+            return self._ids.pop()
+
+    # ---- 저장 ----
+
+    async def start(self):
+        """주기적 일괄 저장 작업 시작"""
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """저장 작업 종료 (남은 버퍼 모두 기록)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None and not self._flushing.done():
+            # 취소된 루프가 시작한 저장이 끝날 때까지 대기 (버퍼에서 꺼낸 행이 유실되지 않도록)
+            try:
+                await self._flushing
+            except Exception:
+                pass
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # stop()으로 루프가 취소되어도 진행 중인 저장은 끝까지 실행
+            self._flushing = asyncio.ensure_future(self.flush())
+            try:
+                await asyncio.shield(self._flushing)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠ 액션 로그 저장 실패 (재시도 예정): {e}")
+                await asyncio.sleep(1)
+
+    async def flush(self):
+        """버퍼의 액션을 batch_size 단위 multi-row INSERT로 저장"""
+        retry: List[dict] = []
+        try:
+            while True:
+                with self._lock:
+                    rows = self._buffer[:self.batch_size]
+                    del self._buffer[:self.batch_size]
+                if not rows:
+                    return
+                await self._flush_batch(rows, retry)
+        finally:
+            # 행 오류로 실패한 행은 다음 저장 때 다시 시도
+            if retry:
+                with self._lock:
+                    self._buffer[:0] = retry
+
+    async def _flush_batch(self, rows: List[dict], retry: List[dict]):
+        """배치 하나를 저장 (행 오류가 나면 반씩 나눠 문제 행을 격리)"""
+        parts = [rows]
+        while parts:
+            part = parts.pop()
+            try:
+                await self._insert(part)
+            except (IntegrityError, DataError) as e:
+                self.failed_flushes += 1
+                if len(part) > 1:
+                    mid = len(part) // 2
+                    parts += [part[mid:], part[:mid]]
+                else:
+                    await self._reject(part[0], e, retry)
+                continue
+            except Exception:
+                # 연결 오류 등은 행과 무관하므로 남은 행 전체를 되돌려 놓고 다음 주기에 재시도
+                self.failed_flushes += 1
+                remaining = [row for pending in [part] + parts[::-1] for row in pending]
+                with self._lock:
+                    self._buffer[:0] = remaining
+                raise
+            self._saved(part)
+
+    @staticmethod
+    async def _insert(rows: List[dict]):
+        from database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Action).values(rows))
+            await db.commit()
+
+    def _saved(self, rows: List[dict]):
+        with self._lock:
+            for row in rows:
+                self._attempts.pop(row["id"], None)
+                self._forget(row)
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+
+    async def _reject(self, row: dict, error: Exception, retry: List[dict]):
+        """단독으로 저장에 실패한 행 처리 (max_attempts번 실패하면 dead letter로 이동)"""
+        attempts = self._attempts.get(row["id"], 0) + 1
+        self._attempts[row["id"]] = attempts
+        if attempts < self.max_attempts:
+            retry.append(row)
+            return
+        reason = str(getattr(error, "orig", error))
+        try:
+            await self._dead_letter(row, reason, attempts)
+        except Exception as e:
+            # dead letter도 저장하지 못하면 버리지 않고 다음 저장 때 다시 시도
+            print(f"⚠ 액션 로그 dead letter 저장 실패 (재시도 예정): {e}")
+            retry.append(row)
+            return
+        with self._lock:
+            self._attempts.pop(row["id"], None)
+            self._forget(row)
+        self.dropped_rows += 1
+        print(f"⚠ 액션 로그 행을 dead letter로 이동 ({attempts}회 실패): action {row['id']} - {reason}")
+
+    @staticmethod
+    async def _dead_letter(row: dict, reason: str, attempts: int):
+        from database import AsyncSessionLocal
+
+        stored = {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(ActionDeadLetter).values(
+                action_id=row["id"], round_id=row.get("round_id"), row=stored, error=reason, attempts=attempts
+            ))
+            await db.commit()
+
+    def _forget(self, row: dict):
+        pending = self._by_round.get(row["round_id"])
+        if pending:
+            pending.remove(row)
+            if not pending:
+                del self._by_round[row["round_id"]]
+
+    def stats(self) -> dict:
+        return {
+            "default_mode": self.default_mode,
+            "pending": self.pending_count(),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+        }
+
+# 전역 액션 로그 기록기
+action_log = ActionLogWriter()
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_staged_actions(session: Session):
+    for row in session.info.pop(_STAGED_KEY, ()):
+        action_log.append(row)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged_actions(session: Session):
+    session.info.pop(_STAGED_KEY, None)
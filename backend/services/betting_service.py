@@ -1,43 +1,41 @@
+from sqlalchemy import and_, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from models.round import Round, Action, RoundCard
 from models.match import MatchPlayer, Match
+from models.stats import PlayerStats
 from models.enums import RoundState, ActionType, RoundResult, MatchStatus
 from datetime import datetime
-from services.game_service import GameService
+from services.action_log import action_log
+from services.match_watcher import match_watcher
+from services.match_cache import match_cache, MatchSeats
+from services.game_service import STARTING_CHIPS
+
+# player_stats에서 증가분으로 누적하는 컬럼
+STAT_COLUMNS = (
+    "matches_played", "matches_won", "rounds_played", "rounds_won",
+    "folds", "double_side_attempts", "double_side_wins", "net_chips",
+)
 
 class BettingService:
     """베팅 로직 서비스"""
     
     @staticmethod
     def get_current_bet_amount(db: Session, round_id: int) -> int:
-        """현재 라운드의 최대 베팅 금액 반환"""
-        actions = db.query(Action).filter(
-            Action.round_id == round_id,
-            Action.action_type.in_(["bet", "raise"])
-        ).order_by(Action.created_at.desc()).all()
-        
-        if not actions:
-            return 0
-        
-        max_amount = 0
-        for action in actions:
-            if action.amount and action.amount > max_amount:
-                max_amount = action.amount
-        
-        return max_amount
+        """현재 라운드의 최대 베팅 금액 반환 (rounds.current_bet)"""
+        current_bet = db.query(Round.current_bet).filter(Round.id == round_id).scalar()
+        return current_bet or 0
     
     @staticmethod
     def get_player_bet_total(db: Session, round_id: int, player_id: int) -> int:
-        """플레이어가 이번 라운드에 베팅한 총 금액"""
-        actions = db.query(Action).filter(
-            Action.round_id == round_id,
-            Action.player_id == player_id,
-            Action.action_type.in_(["bet", "raise", "call"])
-        ).all()
-        
-        total = sum(action.amount for action in actions if action.amount)
-        return total
+        """플레이어가 이번 라운드에 베팅한 총 금액 (round_cards.bet_total)"""
+        bet_total = db.query(RoundCard.bet_total).filter(
+            RoundCard.round_id == round_id,
+            RoundCard.player_id == player_id
+        ).scalar()
+        return bet_total or 0
     
     @staticmethod
     def is_double_side_bet(db: Session, round_id: int, player_id: int) -> bool:
@@ -54,6 +52,11 @@ class BettingService:
         """양면베팅 시 실제 소모 칩 계산 (×2)"""
         return amount * 2 if is_double_side else amount
     
+    @staticmethod
+    def chose_double_side(cards: list, player_id: int) -> bool:
+        """이미 로드된 카드 목록에서 플레이어의 양면베팅 여부 확인"""
+        return any(c.player_id == player_id and c.chosen_side == "double_side" for c in cards)
+    
     @staticmethod
     def process_action(
         db: Session, 
@@ -63,53 +66,92 @@ class BettingService:
         amount: Optional[int] = None
     ) -> Round:
         """베팅 액션 처리"""
-        round = db.query(Round).filter(Round.id == round_id).first()
+        # 라운드 행을 잠가 같은 라운드의 동시 요청이 누적 베팅액/칩을 덮어쓰지 않도록 직렬화
+        round = db.query(Round).filter(Round.id == round_id).with_for_update().first()
         if not round:
             raise ValueError("라운드를 찾을 수 없습니다")
         
-        if round.state != RoundState.BETTING:
-            raise ValueError("베팅 단계가 아닙니다")
-        
-        if round.current_turn_user_id != player_id:
-            raise ValueError("현재 턴이 아닙니다")
-        
         # 플레이어 정보
         match = db.query(Match).filter(Match.id == round.match_id).first()
         if not match:
             raise ValueError("매치를 찾을 수 없습니다")
         
-        match_player = db.query(MatchPlayer).filter(
-            MatchPlayer.match_id == match.id,
-            MatchPlayer.user_id == player_id
-        ).first()
+        seats = match_cache.seats(db, match.id)
+        players, cards = BettingService._load_seats(db, round.id, seats)
+        
+        action = BettingService.apply_action(
+            round, match, players, cards, player_id, action_type, amount
+        )
+        action_log.write(db, match.settings, round_id, action)
+        if round.state == RoundState.ENDED:
+            # 폴드/콜로 라운드가 끝나면 통계 증가분을 같은 트랜잭션에서 반영
+            db.execute(BettingService.stats_upsert(
+                BettingService.stats_deltas(round, match, players, cards)
+            ))
+        ended = match.status == MatchStatus.ENDED
+        # 상태 버전 증가 (동시 요청에도 값이 겹치지 않도록 SQL에서 증가)
+        match.state_version = Match.state_version + 1
+        
+        # 모든 변경사항을 atomic하게 커밋
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise ValueError(f"베팅 처리 중 오류 발생: {str(e)}")
+        
+        if ended:
+            match_cache.match_ended(match.id)
+        return round
+    
+    @staticmethod
+    def apply_action(
+        round,
+        match,
+        players: list,
+        cards: list,
+        player_id: int,
+        action_type: str,
+        amount: Optional[int] = None
+    ) -> dict:
+        """베팅 규칙 적용 (DB 접근 없음)
+        
+        round/match/players/cards는 ORM 객체 또는 같은 속성을 가진 메모리 객체,
+        players와 cards는 seat 순서로 정렬되어 있어야 합니다.
+        변경은 전달된 객체에 직접 반영되고, 기록할 Action 필드를 반환합니다.
+        """
+        if round.state != RoundState.BETTING:
+            raise ValueError("베팅 단계가 아닙니다")
+        
+        if round.current_turn_user_id != player_id:
+            raise ValueError("현재 턴이 아닙니다")
         
+        match_player = next((p for p in players if p.user_id == player_id), None)
         if not match_player:
             raise ValueError("플레이어를 찾을 수 없습니다")
         
         # 양면베팅 여부 확인
-        is_double_side = BettingService.is_double_side_bet(db, round_id, player_id)
+        is_double_side = BettingService.chose_double_side(cards, player_id)
         
-        # 현재 베팅 상태 확인
-        players = db.query(MatchPlayer).filter(MatchPlayer.match_id == match.id).all()
+        # 현재 베팅 상태 확인 (round_cards.bet_total에 누적된 값)
         other_player = next(p for p in players if p.user_id != player_id)
+        card = next((c for c in cards if c.player_id == player_id), None)
+        other_card = next((c for c in cards if c.player_id == other_player.user_id), None)
         
-        player_bet_total = BettingService.get_player_bet_total(db, round_id, player_id)
-        other_bet_total = BettingService.get_player_bet_total(db, round_id, other_player.user_id)
+        player_bet_total = card.bet_total if card else 0
+        other_bet_total = other_card.bet_total if other_card else 0
         
         # 액션 처리
         if action_type == "fold":
             # 폴드 처리
-            action = Action(
-                round_id=round_id,
-                player_id=player_id,
-                action_type=ActionType.FOLD,
-                amount=None,
-                payload={}
-            )
-            db.add(action)
+            action = {
+                "player_id": player_id,
+                "action_type": ActionType.FOLD,
+                "amount": None,
+                "payload": {}
+            }
             
             # 양면베팅 특수 규칙: 상대방이 양면베팅했고 내가 폴드하면 상대방에게 10칩 지급
-            other_is_double = BettingService.is_double_side_bet(db, round_id, other_player.user_id)
+            other_is_double = BettingService.chose_double_side(cards, other_player.user_id)
             if other_is_double:
                 match_player.chips -= 10
                 other_player.chips += 10
@@ -153,14 +195,12 @@ class BettingService:
             match_player.chips -= actual_cost
             round.pot += actual_cost
             
-            action = Action(
-                round_id=round_id,
-                player_id=player_id,
-                action_type=ActionType.RAISE if other_bet_total > 0 else ActionType.BET,
-                amount=amount,
-                payload={}
-            )
-            db.add(action)
+            action = {
+                "player_id": player_id,
+                "action_type": ActionType.RAISE if other_bet_total > 0 else ActionType.BET,
+                "amount": amount,
+                "payload": {}
+            }
             
             # 다음 턴으로
             round.current_turn_user_id = other_player.user_id
@@ -183,43 +223,132 @@ class BettingService:
             match_player.chips -= actual_cost
             round.pot += actual_cost
             
-            action = Action(
-                round_id=round_id,
-                player_id=player_id,
-                action_type=ActionType.CALL,
-                amount=call_amount,
-                payload={}
-            )
-            db.add(action)
+            action = {
+                "player_id": player_id,
+                "action_type": ActionType.CALL,
+                "amount": call_amount,
+                "payload": {}
+            }
             
             # 베팅 종료, 카드 공개
             round.state = RoundState.REVEAL
             round.current_turn_user_id = None
             
             # 결과 판정
-            BettingService.determine_winner(db, round)
+            BettingService.settle_round(round, match, players, cards)
         
         else:
             raise ValueError(f"지원하지 않는 액션: {action_type}")
         
-        # 모든 변경사항을 atomic하게 커밋
-        try:
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            raise ValueError(f"베팅 처리 중 오류 발생: {str(e)}")
-        
-        return round
+        BettingService.track_action(round, card, action)
+        return action
+    
+    @staticmethod
+    def track_action(round, card, action: dict):
+        """액션 순번과 누적 베팅액(round.current_bet, card.bet_total) 갱신"""
+        round.action_seq += 1
+        if card is None or not action["amount"]:
+            return
+        if action["action_type"] in (ActionType.BET, ActionType.RAISE, ActionType.CALL):
+            card.bet_total += action["amount"]
+        if action["action_type"] in (ActionType.BET, ActionType.RAISE):
+            round.current_bet = max(round.current_bet, action["amount"])
     
     @staticmethod
     def determine_winner(db: Session, round: Round):
         """라운드 결과 판정"""
-        cards = db.query(RoundCard).filter(RoundCard.round_id == round.id).all()
+        match = db.query(Match).filter(Match.id == round.match_id).first()
+        players = db.query(MatchPlayer).filter(
+            MatchPlayer.match_id == round.match_id
+        ).order_by(MatchPlayer.seat).all()
+        cards = BettingService._load_cards(db, round.id, players)
+        BettingService.settle_round(round, match, players, cards)
+        db.execute(BettingService.stats_upsert(
+            BettingService.stats_deltas(round, match, players, cards)
+        ))
+    
+    @staticmethod
+    def stats_deltas(round, match, players: list, cards: list) -> list:
+        """방금 종료된 라운드(와 매치)의 플레이어별 통계 증가분 (DB 접근 없음)
+        
+        players와 cards는 seat 순서, 라운드당 한 번만 호출해야 합니다.
+        매치 항목(매치 수, 승리, 순 칩)은 이 라운드로 매치가 끝난 경우에만 증가합니다.
+        """
+        folded_id = None
+        if round.result == RoundResult.PLAYER1_FOLD:
+            folded_id = players[0].user_id
+        elif round.result == RoundResult.PLAYER2_FOLD:
+            folded_id = players[1].user_id
+        
+        match_ended = match is not None and match.status == MatchStatus.ENDED
+        # 칩이 남은 플레이어가 한 명이면 매치 승자 (둘 다 0 이하면 승자 없음)
+        remaining = [p.user_id for p in players if p.chips > 0]
+        match_winner_id = remaining[0] if match_ended and len(remaining) == 1 else None
+        
+        rows = []
+        for player in players:
+            card = next((c for c in cards if c.player_id == player.user_id), None)
+            double_side = card is not None and card.chosen_side == "double_side"
+            won = round.winner_id == player.user_id
+            rows.append({
+                "user_id": player.user_id,
+                "matches_played": int(match_ended),
+                "matches_won": int(match_winner_id == player.user_id),
+                "rounds_played": 1,
+                "rounds_won": int(won),
+                "folds": int(folded_id == player.user_id),
+                "double_side_attempts": int(double_side),
+                "double_side_wins": int(double_side and won),
+                "net_chips": player.chips - STARTING_CHIPS if match_ended else 0,
+            })
+        return rows
+    
+    @staticmethod
+    def stats_upsert(rows: list):
+        """통계 증가분을 player_stats에 더하는 INSERT ... ON CONFLICT DO UPDATE 문 (행이 없으면 생성)
+        
+        한 문장에서 같은 행을 두 번 갱신할 수 없으므로 사용자별로 합친 뒤 한 행씩 넣습니다.
+        """
+        merged = {}
+        for row in rows:
+            total = merged.setdefault(row["user_id"], dict.fromkeys(STAT_COLUMNS, 0))
+            for column in STAT_COLUMNS:
+                total[column] += row[column]
+        stmt = insert(PlayerStats).values([{"user_id": user_id, **total} for user_id, total in merged.items()])
+        return stmt.on_conflict_do_update(
+            index_elements=[PlayerStats.user_id],
+            set_={
+                **{column: getattr(PlayerStats, column) + getattr(stmt.excluded, column) for column in STAT_COLUMNS},
+                "updated_at": func.now(),
+            }
+        )
+    
+    @staticmethod
+    def _load_cards(db: Session, round_id: int, players: list) -> list:
+        """라운드 카드를 플레이어 seat 순서로 조회"""
+        cards = db.query(RoundCard).filter(RoundCard.round_id == round_id).all()
+        seats = {p.user_id: p.seat for p in players}
+        return sorted(cards, key=lambda c: seats.get(c.player_id, 0))
+    
+    @staticmethod
+    def _load_seats(db: Session, round_id: int, seats: MatchSeats) -> tuple:
+        """플레이어(칩)와 라운드 카드를 한 번의 JOIN으로 조회하여 캐시된 seat 순서로 반환"""
+        rows = db.query(MatchPlayer, RoundCard).outerjoin(
+            RoundCard,
+            and_(RoundCard.round_id == round_id, RoundCard.player_id == MatchPlayer.user_id)
+        ).filter(MatchPlayer.match_id == seats.match_id).all()
+        rows.sort(key=lambda row: seats.seat_of(row[0].user_id))
+        players = [player for player, _ in rows]
+        cards = [card for _, card in rows if card is not None]
+        return players, cards
+    
+    @staticmethod
+    def settle_round(round, match, players: list, cards: list):
+        """라운드 결과 판정 및 칩 정산 (DB 접근 없음)"""
         if len(cards) != 2:
             raise ValueError("카드가 2장이 아닙니다")
         
         card1, card2 = cards
-        players = db.query(MatchPlayer).filter(MatchPlayer.match_id == round.match_id).all()
         player1 = next(p for p in players if p.user_id == card1.player_id)
         player2 = next(p for p in players if p.user_id == card2.player_id)
         
@@ -325,7 +454,6 @@ class BettingService:
         round.ended_at = datetime.now()
         
         # 게임 종료 확인 (한 플레이어의 칩이 0이 되면)
-        match = db.query(Match).filter(Match.id == round.match_id).first()
         if match:
             if player1.chips <= 0:
                 match.status = MatchStatus.ENDED
@@ -333,3 +461,36 @@ class BettingService:
             elif player2.chips <= 0:
                 match.status = MatchStatus.ENDED
                 match.ended_at = datetime.now()
+
+class AsyncBettingService:
+    """BettingService의 비동기 버전 (AsyncSession 위에서 동일한 로직 실행)"""
+    
+    @staticmethod
+    async def get_current_bet_amount(db: AsyncSession, round_id: int) -> int:
+        return await db.run_sync(BettingService.get_current_bet_amount, round_id)
+    
+    @staticmethod
+    async def get_player_bet_total(db: AsyncSession, round_id: int, player_id: int) -> int:
+        return await db.run_sync(BettingService.get_player_bet_total, round_id, player_id)
+    
+    @staticmethod
+    async def process_action(
+        db: AsyncSession, 
+        round_id: int, 
+        player_id: int, 
+        action_type: str, 
+        amount: Optional[int] = None
+    ):
+        """베팅 액션 처리 (라운드 엔진 사용 시 메모리의 LiveRound 반환)"""
+        from services.round_engine import round_engine
+        from services.round_broadcast import room_id_for_match
+        
+        round = None
+        if round_engine.enabled:
+            round = await round_engine.process_action(db, round_id, player_id, action_type, amount)
+        if not round:
+            round = await db.run_sync(
+                BettingService.process_action, round_id, player_id, action_type, amount
+            )
+        await match_watcher.notify(round.match_id, await room_id_for_match(db, round.match_id))
+        return round
@@ -1,7 +1,16 @@
+import os
 import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.match import Match
-from models.deck import CardTemplate, DeckInstance
+from models.deck import CardTemplate
+
+# 메모리에 보관할 최근 덱 순열 수 (시드 단위)
+DECK_CACHE_SIZE = int(os.getenv("DECK_CACHE_SIZE", "256"))
 
 class DeckService:
     """덱 생성 및 섞기 서비스"""
@@ -39,73 +48,162 @@ class DeckService:
         
         db.commit()
     
+    @staticmethod
+    def pack_card(front: int, back: int) -> int:
+        """카드 한 장을 1바이트로 압축 (상위 4비트 앞면, 하위 4비트 뒷면)"""
+        return (front << 4) | back
+    
+    @staticmethod
+    def unpack_card(packed: int) -> tuple[int, int]:
+        """1바이트로 압축된 카드를 (front_value, back_value)로 복원"""
+        return (packed >> 4, packed & 0x0F)
+    
+    @staticmethod
+    def load_card_templates(db: Session) -> "CardTemplateTable":
+        """카드 템플릿을 프로세스 메모리에 적재 (서버 시작 시 1회)"""
+        return deck_provider.load(db)
+    
     @staticmethod
     def shuffle_deck(db: Session, match: Match):
-        """덱을 섞어서 DeckInstance 생성"""
-        # 기존 덱 인스턴스가 있으면 삭제 (재섞기)
-        db.query(DeckInstance).filter(DeckInstance.match_id == match.id).delete()
+        """match.deck_seed로 덱을 섞고 딜 커서 초기화 (순열은 시드에서 계산)"""
+        deck_provider.load(db)
+        match.deck_cursor = 0
+        deck_provider.permutation(match.deck_seed)
+    
+    @staticmethod
+    def deal_card(db: Session, match: Match) -> tuple[int, int]:
+        """덱에서 카드 한 장을 딜링 (front_value, back_value 반환)"""
+        deck_provider.load(db)
+        if match.deck_cursor >= deck_provider.size():
+            # 덱이 소진되었으면 새로운 시드로 재섞기 (독립적인 Random 인스턴스 사용)
+            rng = random.Random()
+            match.deck_seed = rng.randint(1, 1000000)
+            match.deck_cursor = 0
         
-        # 카드 템플릿 가져오기
+        card = deck_provider.card_at(match.deck_seed, match.deck_cursor)
+        match.deck_cursor += 1
+        return card
+    
+    @staticmethod
+    def get_remaining_cards(db: Session, match: Match) -> int:
+        """남은 카드 수 반환"""
+        deck_provider.load(db)
+        return deck_provider.size() - match.deck_cursor
+
+@dataclass(frozen=True)
+class CardTemplateTable:
+    """card_templates 전체의 불변 스냅샷 (템플릿 id로 인덱싱, 없는 id는 0)"""
+    front_values: Tuple[int, ...]
+    back_values: Tuple[int, ...]
+    copies: Tuple[int, ...]
+    cards: Tuple[int, ...]  # 템플릿 id 순서의 압축 카드 (copies만큼 반복)
+    
+    @classmethod
+    def from_rows(cls, templates) -> "CardTemplateTable":
+        size = max(t.id for t in templates) + 1
+        front_values, back_values, copies = [0] * size, [0] * size, [0] * size
+        cards = []
+        for t in sorted(templates, key=lambda t: t.id):
+            front_values[t.id] = t.front_value
+            back_values[t.id] = t.back_value
+            copies[t.id] = t.copies
+            cards.extend([DeckService.pack_card(t.front_value, t.back_value)] * t.copies)
+        return cls(tuple(front_values), tuple(back_values), tuple(copies), tuple(cards))
+    
+    def card(self, template_id: int) -> tuple[int, int]:
+        """템플릿 id의 (front_value, back_value)"""
+        return (self.front_values[template_id], self.back_values[template_id])
+
+class DeckProvider:
+    """시드에서 섞인 덱을 계산하고 최근 사용한 순열을 LRU로 보관
+    
+    덱은 (카드 구성, deck_seed)의 결정적 함수이므로 섞인 순서를 저장하지 않고
+    필요할 때 random.Random(seed)로 다시 계산합니다. card_templates는 변경되지 않으므로
+    서버 시작 시 한 번 읽어 CardTemplateTable로 보관하고, 이후 덱 관련 코드는 DB에 접근하지 않습니다.
+    """
+    
+    def __init__(self, maxsize: int = DECK_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.templates: Optional[CardTemplateTable] = None
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def load(self, db: Session) -> CardTemplateTable:
+        """카드 템플릿을 아직 읽지 않았으면 card_templates에서 읽기 (없으면 생성)"""
+        if self.templates is not None:
+            return self.templates
         templates = db.query(CardTemplate).all()
         if not templates:
             DeckService.create_card_templates(db)
             templates = db.query(CardTemplate).all()
         
-        # 모든 카드 템플릿을 리스트로 만들기
-        deck = []
-        for template in templates:
-            for _ in range(template.copies):
-                deck.append(template.id)
+        table = CardTemplateTable.from_rows(templates)
+        with self._lock:
+            self.templates = table
+            self._cache.clear()
+        return table
+    
+    def size(self) -> int:
+        """덱의 카드 수"""
+        return len(self.templates.cards)
+    
+    def permutation(self, seed: int) -> bytes:
+        """시드로 섞은 덱 (카드당 1바이트)"""
+        with self._lock:
+            deck = self._cache.get(seed)
+            if deck is not None:
+                self._cache.move_to_end(seed)
+                self.hits += 1
+                return deck
+            self.misses += 1
         
         # 덱 섞기 - 독립적인 Random 인스턴스 사용 (전역 상태 변경 방지)
-        rng = random.Random(match.deck_seed)
-        rng.shuffle(deck)
-        
-        # DeckInstance 생성
-        for order_no, template_id in enumerate(deck, start=1):
-            instance = DeckInstance(
-                match_id=match.id,
-                card_template_id=template_id,
-                order_no=order_no
-            )
-            db.add(instance)
+        cards = list(self.templates.cards)
+        random.Random(seed).shuffle(cards)
+        deck = bytes(cards)
         
-        db.commit()
+        with self._lock:
+            self._cache[seed] = deck
+            self._cache.move_to_end(seed)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return deck
+    
+    def card_at(self, seed: int, position: int) -> tuple[int, int]:
+        """시드로 섞은 덱의 position번째 카드 (0부터)"""
+        return DeckService.unpack_card(self.permutation(seed)[position])
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.templates is not None,
+                "deck_size": len(self.templates.cards) if self.templates is not None else 0,
+                "cached": len(self._cache),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+# 전역 덱 제공자
+deck_provider = DeckProvider()
+
+class AsyncDeckService:
+    """DeckService의 비동기 버전 (AsyncSession 위에서 동일한 로직 실행)"""
     
     @staticmethod
-    def deal_card(db: Session, match: Match, deck_position: int) -> tuple[int, int]:
-        """덱에서 카드 한 장을 딜링 (front_value, back_value 반환)"""
-        # deck_position은 1부터 시작
-        instance = db.query(DeckInstance).filter(
-            DeckInstance.match_id == match.id,
-            DeckInstance.order_no == deck_position
-        ).first()
-        
-        if not instance:
-            # 덱이 소진되었으면 다시 섞기
-            max_order = db.query(DeckInstance).filter(
-                DeckInstance.match_id == match.id
-            ).with_entities(DeckInstance.order_no).order_by(DeckInstance.order_no.desc()).first()
-            
-            if max_order:
-                # 이미 사용한 카드들 제거하고 재섞기
-                db.query(DeckInstance).filter(DeckInstance.match_id == match.id).delete()
-                # 새로운 시드로 재섞기 (독립적인 Random 인스턴스 사용)
-                rng = random.Random()
-                match.deck_seed = rng.randint(1, 1000000)
-                DeckService.shuffle_deck(db, match)
-                instance = db.query(DeckInstance).filter(
-                    DeckInstance.match_id == match.id,
-                    DeckInstance.order_no == 1
-                ).first()
-            else:
-                raise ValueError("덱을 찾을 수 없습니다")
-        
-        template = instance.card_template
-        return (template.front_value, template.back_value)
+    async def create_card_templates(db: AsyncSession):
+        await db.run_sync(DeckService.create_card_templates)
     
     @staticmethod
-    def get_remaining_cards(db: Session, match: Match) -> int:
-        """남은 카드 수 반환"""
-        total = db.query(DeckInstance).filter(DeckInstance.match_id == match.id).count()
-        return total
+    async def shuffle_deck(db: AsyncSession, match: Match):
+        await db.run_sync(DeckService.shuffle_deck, match)
+    
+    @staticmethod
+    async def deal_card(db: AsyncSession, match: Match) -> tuple[int, int]:
+        return await db.run_sync(DeckService.deal_card, match)
+    
+    @staticmethod
+    async def get_remaining_cards(db: AsyncSession, match: Match) -> int:
+        return await db.run_sync(DeckService.get_remaining_cards, match)
@@ -1,16 +1,24 @@
 import random
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
 from models.match import Match, MatchPlayer
 from models.room import Room
 from models.round import Round, RoundCard, Action
 from models.enums import MatchStatus, RoundState, ActionType
 from services.deck_service import DeckService
+from services.action_log import action_log
+from services.match_watcher import match_watcher
+from services.match_cache import match_cache
+
+# 매치 시작 시 각 플레이어의 칩
+STARTING_CHIPS = 30
 
 class GameService:
     """게임 핵심 로직 서비스"""
     
     @staticmethod
-    def start_match(db: Session, room_id: int) -> Match:
+    def start_match(db: Session, room_id: int, durability: str = None) -> Match:
         """매치 시작: 덱 생성, 플레이어 등록, 첫 라운드 시작"""
         # 방 확인
         room = db.query(Room).filter(Room.id == room_id).first()
@@ -20,12 +28,13 @@ class GameService:
         if not room.player1_id or not room.player2_id:
             raise ValueError("방에 두 명의 플레이어가 필요합니다")
         
-        # 매치 생성
+        # 매치 생성 (액션 로그 durability는 매치 단위로 고정)
         match = Match(
             room_id=room_id,
             status=MatchStatus.INIT,
             deck_seed=random.randint(1, 1000000),
-            settings={}
+            state_version=1,
+            settings={"durability": action_log.resolve_mode(durability)}
         )
         db.add(match)
         db.flush()
@@ -35,27 +44,28 @@ class GameService:
             match_id=match.id,
             user_id=room.player1_id,
             seat=0,
-            chips=30,
+            chips=STARTING_CHIPS,
             is_bot=False
         )
         player2 = MatchPlayer(
             match_id=match.id,
             user_id=room.player2_id,
             seat=1,
-            chips=30,
+            chips=STARTING_CHIPS,
             is_bot=False
         )
         db.add(player1)
         db.add(player2)
         
-        # 덱 생성 및 섞기
-        DeckService.create_card_templates(db)
+        # 덱 섞기 (카드 템플릿은 서버 시작 시 메모리에 적재됨)
         DeckService.shuffle_deck(db, match)
         
         # 매치 상태를 ACTIVE로 변경
         match.status = MatchStatus.ACTIVE
         
         db.commit()
+        # 룸의 활성 매치가 바뀌었으므로 캐시된 이전 매치 제거
+        match_cache.invalidate_room(room_id)
         return match
     
     @staticmethod
@@ -83,25 +93,21 @@ class GameService:
             return existing_round
         
         # 선 플레이어 결정 (첫 라운드는 방 만든 사람, 이후는 직전 라운드 승자)
-        players = db.query(MatchPlayer).filter(MatchPlayer.match_id == match_id).all()
-        player1 = next(p for p in players if p.seat == 0)
-        player2 = next(p for p in players if p.seat == 1)
+        # 좌석은 매치 생성 후 바뀌지 않으므로 캐시에서 읽고, 칩은 아래에서 DB에 직접 반영
+        player1_id, player2_id = match_cache.seats(db, match_id).user_ids
         
         if round_no == 1:
-            first_player = player1  # 방을 만든 사람
+            first_player_id = player1_id  # 방을 만든 사람
         else:
             # 직전 라운드 승자 찾기
             prev_round = db.query(Round).filter(
                 Round.match_id == match_id,
                 Round.round_no == round_no - 1
             ).first()
-            if prev_round and prev_round.winner_id:
-                first_player = next(
-                    (p for p in players if p.user_id == prev_round.winner_id),
-                    player1
-                )
+            if prev_round and prev_round.winner_id in (player1_id, player2_id):
+                first_player_id = prev_round.winner_id
             else:
-                first_player = player1
+                first_player_id = player1_id
         
         # 이전 라운드의 carry_over_pot 가져오기
         carry_over = 0
@@ -120,58 +126,61 @@ class GameService:
             state=RoundState.DEALING,
             pot=carry_over,
             carry_over_pot=0,
-            current_turn_user_id=first_player.user_id,
-            min_bet=1
+            current_turn_user_id=first_player_id,
+            min_bet=1,
+            current_bet=0,
+            action_seq=0
         )
         db.add(round)
         db.flush()
         
         # 카드 딜링
-        front1, back1 = DeckService.deal_card(db, match, (round_no - 1) * 2 + 1)
-        front2, back2 = DeckService.deal_card(db, match, (round_no - 1) * 2 + 2)
+        front1, back1 = DeckService.deal_card(db, match)
+        front2, back2 = DeckService.deal_card(db, match)
         
         card1 = RoundCard(
             round_id=round.id,
-            player_id=player1.user_id,
+            player_id=player1_id,
             front_value=front1,
             back_value=back1,
-            chosen_side=None
+            chosen_side=None,
+            bet_total=0
         )
         card2 = RoundCard(
             round_id=round.id,
-            player_id=player2.user_id,
+            player_id=player2_id,
             front_value=front2,
             back_value=back2,
-            chosen_side=None
+            chosen_side=None,
+            bet_total=0
         )
         db.add(card1)
         db.add(card2)
         
-        # 기본 베팅 (각 플레이어 1칩)
-        player1.chips -= 1
-        player2.chips -= 1
+        # 기본 베팅 (각 플레이어 1칩, 칩 잔액은 SQL에서 차감)
+        db.execute(
+            update(MatchPlayer)
+            .where(MatchPlayer.match_id == match_id)
+            .values(chips=MatchPlayer.chips - 1)
+        )
         round.pot += 2
         
-        # 기본 베팅 액션 기록
-        action1 = Action(
-            round_id=round.id,
-            player_id=player1.user_id,
-            action_type=ActionType.BET,
-            amount=1,
-            payload={}
-        )
-        action2 = Action(
-            round_id=round.id,
-            player_id=player2.user_id,
-            action_type=ActionType.BET,
-            amount=1,
-            payload={}
-        )
-        db.add(action1)
-        db.add(action2)
+        # 기본 베팅 액션 기록 (누적 베팅액도 함께 반영)
+        for player_id, card in ((player1_id, card1), (player2_id, card2)):
+            action_log.write(db, match.settings, round.id, {
+                "player_id": player_id,
+                "action_type": ActionType.BET,
+                "amount": 1,
+                "payload": {}
+            })
+            card.bet_total += 1
+        round.current_bet = 1
+        round.action_seq += 2
         
         # 상태를 SIDE_SELECTION으로 변경
         round.state = RoundState.SIDE_SELECTION
+        # 상태 버전 증가 (동시 요청에도 값이 겹치지 않도록 SQL에서 증가)
+        match.state_version = Match.state_version + 1
         
         db.commit()
         return round
@@ -179,18 +188,33 @@ class GameService:
     @staticmethod
     def select_side(db: Session, round_id: int, player_id: int, side: str):
         """베팅 면 선택 (두 플레이어 모두 선택)"""
-        round = db.query(Round).filter(Round.id == round_id).first()
+        # 라운드 행을 잠가 두 플레이어의 동시 선택이 서로의 선택을 못 보고 지나가지 않도록 직렬화
+        round = db.query(Round).filter(Round.id == round_id).with_for_update().first()
         if not round:
             raise ValueError("라운드를 찾을 수 없습니다")
         
+        cards = db.query(RoundCard).filter(RoundCard.round_id == round_id).all()
+        action = GameService.apply_side_selection(round, cards, player_id, side)
+        
+        # 액션 기록 (매치 설정은 캐시에서 읽고, 상태 버전은 매치를 조회하지 않고 SQL에서 증가)
+        action_log.write(db, match_cache.seats(db, round.match_id).settings, round_id, action)
+        db.execute(
+            update(Match)
+            .where(Match.id == round.match_id)
+            .values(state_version=Match.state_version + 1)
+        )
+        
+        db.commit()
+        return round
+    
+    @staticmethod
+    def apply_side_selection(round, cards: list, player_id: int, side: str) -> dict:
+        """면 선택 규칙 적용 (DB 접근 없음), 기록할 Action 필드 반환"""
         if round.state != RoundState.SIDE_SELECTION:
             raise ValueError("면 선택 단계가 아닙니다")
         
         # 플레이어의 카드 찾기
-        card = db.query(RoundCard).filter(
-            RoundCard.round_id == round_id,
-            RoundCard.player_id == player_id
-        ).first()
+        card = next((c for c in cards if c.player_id == player_id), None)
         
         if not card:
             raise ValueError("플레이어의 카드를 찾을 수 없습니다")
@@ -200,19 +224,9 @@ class GameService:
             raise ValueError("잘못된 면 선택입니다")
         
         card.chosen_side = side
-        
-        # 액션 기록
-        action = Action(
-            round_id=round_id,
-            player_id=player_id,
-            action_type=ActionType.SELECT_SIDE,
-            amount=None,
-            payload={"side": side}
-        )
-        db.add(action)
+        round.action_seq += 1
         
         # 두 플레이어 모두 선택했는지 확인
-        cards = db.query(RoundCard).filter(RoundCard.round_id == round_id).all()
         all_selected = all(c.chosen_side for c in cards)
         
         if all_selected:
@@ -223,5 +237,45 @@ class GameService:
             # 베팅 단계로 전환
             round.state = RoundState.BETTING
         
-        db.commit()
+        return {
+            "player_id": player_id,
+            "action_type": ActionType.SELECT_SIDE,
+            "amount": None,
+            "payload": {"side": side}
+        }
+
+class AsyncGameService:
+    """GameService의 비동기 버전 (AsyncSession 위에서 동일한 로직 실행)"""
+    
+    @staticmethod
+    async def start_match(db: AsyncSession, room_id: int, durability: str = None) -> Match:
+        return await db.run_sync(GameService.start_match, room_id, durability)
+    
+    @staticmethod
+    async def start_round(db: AsyncSession, match_id: int, round_no: int = None) -> Round:
+        from services.round_engine import round_engine
+        from services.round_broadcast import room_id_for_match
+        
+        if round_engine.enabled:
+            # 메모리에 있는 이전 라운드 결과와 칩을 먼저 기록
+            await round_engine.flush(match_id)
+        round = await db.run_sync(GameService.start_round, match_id, round_no)
+        if round_engine.enabled:
+            # 새 라운드는 다음 접근 시 DB에서 다시 적재
+            await round_engine.reset(match_id)
+        await match_watcher.notify(match_id, await room_id_for_match(db, match_id))
+        return round
+    
+    @staticmethod
+    async def select_side(db: AsyncSession, round_id: int, player_id: int, side: str):
+        """면 선택 (라운드 엔진 사용 시 메모리의 LiveRound 반환)"""
+        from services.round_engine import round_engine
+        from services.round_broadcast import room_id_for_match
+        
+        round = None
+        if round_engine.enabled:
+            round = await round_engine.select_side(db, round_id, player_id, side)
+        if not round:
+            round = await db.run_sync(GameService.select_side, round_id, player_id, side)
+        await match_watcher.notify(round.match_id, await room_id_for_match(db, round.match_id))
         return round
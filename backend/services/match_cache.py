@@ -0,0 +1,199 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.match import Match, MatchPlayer
+from models.enums import MatchStatus
+
+# 메모리에 보관할 매치 좌석 정보 수와 룸→활성 매치 항목 수 (각각 LRU)
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "10000"))
+# 룸→활성 매치 캐시 유지 시간 (초). 다른 워커에서 시작/종료된 매치는 최대 이 시간만큼 늦게 반영
+MATCH_CACHE_ROOM_TTL = float(os.getenv("MATCH_CACHE_ROOM_TTL", "30"))
+
+@dataclass(frozen=True)
+class MatchSeats:
+    """매치 생성 후 바뀌지 않는 정보 (칩 잔액은 포함하지 않음)"""
+    match_id: int
+    room_id: int
+    user_ids: Tuple[int, ...]  # seat 순서
+    settings: dict
+
+    def seat_of(self, user_id: int) -> Optional[int]:
+        """플레이어의 seat (매치 참가자가 아니면 None)"""
+        return self.user_ids.index(user_id) if user_id in self.user_ids else None
+
+class MatchCache:
+    """룸→활성 매치 id, 매치→좌석(user_id, seat)/설정을 프로세스 메모리에 보관 (read-through)
+
+    좌석과 설정은 매치가 만들어진 뒤 바뀌지 않으므로 매치가 끝날 때까지 보관하고,
+    룸→활성 매치는 매치 시작/종료 시 invalidate_room(), match_ended()로 제거합니다.
+    두 캐시 모두 maxsize개까지 보관하는 LRU이며, 룸 항목은 새로 넣을 때 앞쪽의 만료된 항목도 함께 정리합니다.
+    칩 잔액은 캐시하지 않으며 항상 match_players에서 읽고 씁니다.
+    """
+
+    def __init__(self, maxsize: int = MATCH_CACHE_SIZE, room_ttl: float = MATCH_CACHE_ROOM_TTL):
+        self.maxsize = maxsize
+        self.room_ttl = room_ttl
+        self._seats: "OrderedDict[int, MatchSeats]" = OrderedDict()
+        self._rooms: "OrderedDict[int, Tuple[float, int]]" = OrderedDict()
+        # match_id -> 이 매치를 가리키는 룸 항목 (match_ended가 룸 항목을 훑지 않도록)
+        self._match_rooms: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # ---- 매치 → 좌석 ----
+
+    def cached_seats(self, match_id: int) -> Optional[MatchSeats]:
+        """캐시에 있는 매치 좌석 (없으면 None, DB 조회 없음)"""
+        with self._lock:
+            seats = self._seats.get(match_id)
+            if seats is None:
+                return None
+            self._seats.move_to_end(match_id)
+            self.hits += 1
+            return seats
+
+    def seats(self, db: Session, match_id: int) -> Optional[MatchSeats]:
+        """매치 좌석 (캐시 미스 시 매치 + 플레이어 JOIN 1회, 매치가 없으면 None)"""
+        seats = self.cached_seats(match_id)
+        if seats is not None:
+            return seats
+
+        rows = db.execute(
+            select(Match.room_id, Match.settings, MatchPlayer.user_id)
+            .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+            .where(Match.id == match_id)
+            .order_by(MatchPlayer.seat)
+        ).all()
+        if not rows:
+            return None
+        seats = MatchSeats(
+            match_id=match_id,
+            room_id=rows[0].room_id,
+            user_ids=tuple(row.user_id for row in rows),
+            settings=rows[0].settings or {},
+        )
+        with self._lock:
+            self.misses += 1
+            self._seats[match_id] = seats
+            self._seats.move_to_end(match_id)
+            while len(self._seats) > self.maxsize:
+                self._seats.popitem(last=False)
+        return seats
+
+    async def seats_async(self, db: AsyncSession, match_id: int) -> Optional[MatchSeats]:
+        """seats()의 비동기 버전 (캐시 적중 시 세션을 사용하지 않음)"""
+        seats = self.cached_seats(match_id)
+        if seats is not None:
+            return seats
+        return await db.run_sync(self.seats, match_id)
+
+    # ---- 룸 → 활성 매치 ----
+
+    def _cached_room(self, room_id: int) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._rooms.get(room_id)
+            if cached and cached[0] > now:
+                self._rooms.move_to_end(room_id)
+                self.hits += 1
+                return cached[1]
+            if cached:
+                self._drop_room(room_id)
+            self.misses += 1
+            return None
+
+    def _store_room(self, room_id: int, match_id: Optional[int]):
+        # 활성 매치가 없는 룸은 보관하지 않음 (다른 워커에서 시작된 매치를 바로 볼 수 있도록)
+        if match_id is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if room_id in self._rooms:
+                self._drop_room(room_id)
+            self._rooms[room_id] = (now + self.room_ttl, match_id)
+            self._match_rooms.setdefault(match_id, set()).add(room_id)
+            self._evict_rooms(now)
+
+    def _drop_room(self, room_id: int) -> bool:
+        """룸 항목과 역색인 제거 (락 안에서 호출, 항목이 없었으면 False)"""
+        cached = self._rooms.pop(room_id, None)
+        if cached is None:
+            return False
+        rooms = self._match_rooms.get(cached[1])
+        if rooms is not None:
+            rooms.discard(room_id)
+            if not rooms:
+                del self._match_rooms[cached[1]]
+        return True
+
+    def _evict_rooms(self, now: float):
+        """앞쪽(가장 오래 쓰지 않은)부터 만료된 룸 항목과 maxsize를 넘는 룸 항목 제거 (락 안에서 호출)"""
+        rooms = self._rooms
+        while rooms and (len(rooms) > self.maxsize or next(iter(rooms.values()))[0] <= now):
+            self._drop_room(next(iter(rooms)))
+
+    @staticmethod
+    def _active_match_stmt(room_id: int):
+        return select(Match.id).where(
+            Match.room_id == room_id,
+            Match.status == MatchStatus.ACTIVE
+        ).order_by(Match.created_at.desc()).limit(1)
+
+    def active_match_id(self, db: Session, room_id: int) -> Optional[int]:
+        """룸의 활성 매치 id (캐시 미스 시 idx_matches_room_status 조회 1회, 없으면 None)"""
+        match_id = self._cached_room(room_id)
+        if match_id is not None:
+            return match_id
+        match_id = db.execute(self._active_match_stmt(room_id)).scalar()
+        self._store_room(room_id, match_id)
+        return match_id
+
+    async def active_match_id_async(self, db: AsyncSession, room_id: int) -> Optional[int]:
+        """active_match_id()의 비동기 버전"""
+        match_id = self._cached_room(room_id)
+        if match_id is not None:
+            return match_id
+        match_id = (await db.execute(self._active_match_stmt(room_id))).scalar()
+        self._store_room(room_id, match_id)
+        return match_id
+
+    # ---- 무효화 ----
+
+    def invalidate_room(self, room_id: int):
+        """룸에서 매치가 시작되었거나 캐시된 매치가 더 이상 활성 상태가 아닐 때 제거"""
+        with self._lock:
+            if self._drop_room(room_id):
+                self.invalidations += 1
+
+    def match_ended(self, match_id: int):
+        """매치 종료 시 좌석과 이 매치를 가리키는 룸 항목 제거 (커밋 이후에 호출)"""
+        with self._lock:
+            seats = self._seats.pop(match_id, None)
+            rooms = list(self._match_rooms.get(match_id, ()))
+            for room_id in rooms:
+                self._drop_room(room_id)
+            if seats is not None or rooms:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cached_matches": len(self._seats),
+                "cached_rooms": len(self._rooms),
+                "maxsize": self.maxsize,
+                "room_ttl_seconds": self.room_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+# 전역 매치 좌석 캐시
+match_cache = MatchCache()
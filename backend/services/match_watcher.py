@@ -0,0 +1,105 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+# long-poll 기본/최대 대기 시간 (초)
+LONG_POLL_TIMEOUT = float(os.getenv("LONG_POLL_TIMEOUT", "25"))
+LONG_POLL_MAX_TIMEOUT = float(os.getenv("LONG_POLL_MAX_TIMEOUT", "60"))
+
+class MatchWatcher:
+    """매치 상태 변경을 기다리는 요청을 매치별 asyncio.Condition에 대기시킴
+
+    대기 중인 요청은 스레드나 DB 커넥션을 잡지 않고 코루틴으로만 존재합니다.
+    서비스가 변경을 커밋한 뒤 notify()를 호출하면 룸 pub/sub 채널(round 이벤트와 같은 채널)로
+    match_changed 이벤트가 발행되고, 이를 받은 모든 워커에서 세대 번호가 증가해
+    같은 매치를 기다리던 요청이 모두 깨어납니다 (wake).
+    대기 중인 요청이 있는 동안 그 워커는 룸 채널을 구독합니다.
+
+    세대 번호와 Condition은 watch() 안에 있는 요청이 있는 매치만 보관합니다.
+    세대를 읽은 요청은 모두 watch() 안에 있으므로, 마지막 요청이 나갈 때 항목을 지워도
+    읽어 둔 세대와 비교할 요청이 남지 않습니다 (종료된 매치도 요청이 끝나면 제거).
+    """
+
+    def __init__(self):
+        self._conditions: Dict[int, asyncio.Condition] = {}
+        self._generations: Dict[int, int] = {}
+        self._waiters: Dict[int, int] = {}
+        # 통계
+        self.notifies = 0
+        self.wakeups = 0
+        self.timeouts = 0
+
+    @asynccontextmanager
+    async def watch(self, match_id: int, room_id: int):
+        """매치 변경을 기다리는 요청의 범위 (generation()/wait()는 이 안에서 호출)
+
+        범위 안에서는 다른 워커가 발행한 룸 이벤트도 받도록 룸 채널을 구독합니다.
+        """
+        from services.websocket_manager import manager
+
+        self._waiters[match_id] = self._waiters.get(match_id, 0) + 1
+        try:
+            await manager.hold_room(room_id)
+            try:
+                yield
+            finally:
+                manager.release_room(room_id)
+        finally:
+            self._waiters[match_id] -= 1
+            if not self._waiters[match_id]:
+                del self._waiters[match_id]
+                self._generations.pop(match_id, None)
+                self._conditions.pop(match_id, None)
+
+    def generation(self, match_id: int) -> int:
+        """매치의 현재 변경 세대 (상태를 확인하기 전에 읽어 두고 wait()에 전달)"""
+        return self._generations.get(match_id, 0)
+
+    async def wait(self, match_id: int, generation: int, timeout: float) -> bool:
+        """generation 이후 변경이 있을 때까지 대기 (timeout이 지나면 False)"""
+        condition = self._conditions.setdefault(match_id, asyncio.Condition())
+        try:
+            async with condition:
+                await asyncio.wait_for(
+                    condition.wait_for(lambda: self.generation(match_id) != generation),
+                    timeout
+                )
+            self.wakeups += 1
+            return True
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return False
+
+    async def notify(self, match_id: int, room_id: Optional[int]):
+        """매치 상태가 바뀌었음을 모든 워커에 알림 (커밋 이후에 호출, room_id를 모르면 이 워커만)"""
+        from services.websocket_manager import manager
+
+        self.notifies += 1
+        if room_id is None:
+            await self.wake(match_id)
+            return
+        await manager.publish(room_id, {"type": "match_changed", "match_id": match_id})
+
+    async def wake(self, match_id: int):
+        """이 워커에서 매치를 기다리는 요청을 깨움 (match_changed 이벤트를 받았을 때)"""
+        if match_id not in self._waiters:
+            # 세대를 읽어 둔 요청이 없으므로 기록하지 않음
+            return
+        self._generations[match_id] = self.generation(match_id) + 1
+        condition = self._conditions.get(match_id)
+        if condition:
+            async with condition:
+                condition.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "watched_matches": len(self._waiters),
+            "waiters": sum(self._waiters.values()),
+            "notifies": self.notifies,
+            "wakeups": self.wakeups,
+            "timeouts": self.timeouts,
+        }
+
+# 전역 매치 상태 대기열
+match_watcher = MatchWatcher()
@@ -0,0 +1,261 @@
+import os
+import json
+import uuid
+import asyncio
+from typing import Awaitable, Callable, Optional, Set, Tuple
+from utils.responses import dumps
+
+# 룸 이벤트를 다른 워커에 전달하는 방식: memory(워커 1개, 전달 없음), postgres(LISTEN/NOTIFY)
+WS_PUBSUB_BACKEND = os.getenv("WS_PUBSUB_BACKEND", "memory").strip().lower()
+# LISTEN/NOTIFY 전용 연결 (지정하지 않으면 DATABASE_URL 사용)
+WS_PUBSUB_DATABASE_URL = os.getenv("WS_PUBSUB_DATABASE_URL")
+
+# NOTIFY payload 한도는 8000 bytes
+PG_NOTIFY_MAX_PAYLOAD = 7900
+# 룸별 채널 이름
+ROOM_CHANNEL_PREFIX = "room_events_"
+# 구독한 룸의 LISTEN이 끝나기를 기다리는 최대 시간 (초)
+PG_LISTEN_READY_TIMEOUT = 1.0
+
+# 받은 이벤트를 이 워커의 연결에 전달하는 함수 (room_id, event)
+Deliver = Callable[[int, dict], Awaitable[None]]
+
+def room_channel(room_id: int) -> str:
+    return f"{ROOM_CHANNEL_PREFIX}{room_id}"
+
+class InProcessPubSub:
+    """기본 백엔드: 이벤트를 이 프로세스의 연결에만 전달 (워커 1개일 때)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.published = 0
+
+    async def start(self, deliver: Deliver):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, room_id: int):
+        pass
+
+    def unsubscribe(self, room_id: int):
+        pass
+
+    async def ready(self, room_id: int):
+        pass
+
+    def publish(self, room_id: int, event: dict, fallback: dict = None) -> dict:
+        """다른 워커가 받을 형태의 이벤트 반환 (이 프로세스에서도 같은 이벤트를 전달)"""
+        self.published += 1
+        return event
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "published": self.published}
+
+class PostgresPubSub:
+    """Postgres LISTEN/NOTIFY로 워커 간 룸 이벤트 전달
+
+    룸마다 채널 하나를 쓰고, 이 워커에 해당 룸의 웹소켓이나 대기 중인 요청(long-poll)이 있을 때만 LISTEN합니다.
+    발행은 전용 연결에서 순서대로 pg_notify()를 실행하므로 요청 처리를 기다리게 하지 않습니다.
+    자기가 보낸 알림은 origin으로 걸러내고, 받은 이벤트는 도착 순서대로 전달합니다.
+    연결이 끊겼다 다시 맺어지는 동안의 이벤트는 유실될 수 있으며, 클라이언트는 seq가
+    건너뛰면 sync로 다시 동기화합니다.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: str = None, max_payload: int = PG_NOTIFY_MAX_PAYLOAD):
+        self.dsn = dsn
+        self.max_payload = max_payload
+        self.origin = uuid.uuid4().hex[:12]
+        self._deliver: Optional[Deliver] = None
+        self._wanted: Set[int] = set()
+        self._listening: Set[int] = set()
+        self._listen_conn = None
+        self._publish_conn = None
+        self._changed: Optional[asyncio.Event] = None
+        self._inbox: Optional[asyncio.Queue] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks = []
+        # 통계
+        self.published = 0
+        self.received = 0
+        self.oversized = 0
+        self.failed_publishes = 0
+        self.reconnects = 0
+
+    # ---- 시작/종료 ----
+
+    def _resolve_dsn(self) -> str:
+        if self.dsn:
+            return self.dsn
+        from database import DATABASE_URL
+
+        # SQLAlchemy 드라이버 표기(postgresql+psycopg2://) 제거
+        scheme, rest = (WS_PUBSUB_DATABASE_URL or DATABASE_URL).split("://", 1)
+        return f"{scheme.split('+')[0]}://{rest}"
+
+    async def _connect(self):
+        import asyncpg
+
+        return await asyncpg.connect(self._resolve_dsn())
+
+    async def start(self, deliver: Deliver):
+        """LISTEN 연결 관리, 발행, 수신 이벤트 전달 작업 시작"""
+        self._deliver = deliver
+        self._changed = asyncio.Event()
+        self._inbox = asyncio.Queue()
+        self._outbox = asyncio.Queue()
+        self._changed.set()
+        self._tasks = [
+            asyncio.create_task(self._listen_loop()),
+            asyncio.create_task(self._publish_loop()),
+            asyncio.create_task(self._deliver_loop()),
+        ]
+        print("✓ 룸 이벤트 pub/sub: Postgres LISTEN/NOTIFY")
+
+    async def stop(self):
+        """작업 종료 (아직 발행하지 않은 이벤트는 버림)"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listen_conn = self._publish_conn = None
+        self._listening.clear()
+
+    # ---- 구독 ----
+
+    def subscribe(self, room_id: int):
+        """이 워커에 룸의 첫 연결(또는 대기 요청)이 생겼을 때 호출"""
+        self._wanted.add(room_id)
+        if self._changed:
+            self._changed.set()
+
+    def unsubscribe(self, room_id: int):
+        """이 워커에서 룸의 마지막 연결(또는 대기 요청)이 사라졌을 때 호출"""
+        self._wanted.discard(room_id)
+        if self._changed:
+            self._changed.set()
+
+    async def ready(self, room_id: int, timeout: float = PG_LISTEN_READY_TIMEOUT):
+        """구독한 룸의 채널을 실제로 LISTEN할 때까지 대기 (연결 문제로 늦어지면 timeout 뒤 반환)"""
+        if self._changed is None:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while room_id in self._wanted and room_id not in self._listening and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+
+    async def _listen_loop(self):
+        """원하는 룸 목록과 실제 LISTEN 중인 채널을 맞추고, 연결이 끊기면 다시 연결"""
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            try:
+                if self._listen_conn is None or self._listen_conn.is_closed():
+                    if self._listen_conn is not None:
+                        self.reconnects += 1
+                    self._listening.clear()
+                    self._listen_conn = await self._connect()
+                    self._listen_conn.add_termination_listener(lambda conn: self._changed.set())
+                for room_id in self._wanted - self._listening:
+                    await self._listen_conn.add_listener(room_channel(room_id), self._on_notify)
+                    self._listening.add(room_id)
+                for room_id in self._listening - self._wanted:
+                    await self._listen_conn.remove_listener(room_channel(room_id), self._on_notify)
+                    self._listening.discard(room_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠ 룸 이벤트 LISTEN 실패 (재시도 예정): {e}")
+                if self._listen_conn is not None:
+                    self._listen_conn.terminate()
+                await asyncio.sleep(1)
+                self._changed.set()
+
+    def _on_notify(self, conn, pid: int, channel: str, payload: str):
+        message = json.loads(payload)
+        if message["origin"] == self.origin:
+            return
+        room_id = int(channel[len(ROOM_CHANNEL_PREFIX):])
+        if room_id not in self._wanted:
+            return
+        self.received += 1
+        self._inbox.put_nowait((room_id, message["event"]))
+
+    async def _deliver_loop(self):
+        while True:
+            room_id, event = await self._inbox.get()
+            try:
+                await self._deliver(room_id, event)
+            except Exception as e:
+                print(f"⚠ 다른 워커의 룸 이벤트 전달 실패: {e}")
+
+    # ---- 발행 ----
+
+    def _encode(self, event: dict) -> bytes:
+        return dumps({"origin": self.origin, "event": event})
+
+    def publish(self, room_id: int, event: dict, fallback: dict = None) -> dict:
+        """이벤트를 발행 대기열에 넣고 다른 워커가 받을 형태(JSON 왕복)의 이벤트 반환
+
+        직렬화한 이벤트가 NOTIFY 한도를 넘으면 fallback(예: id만 담은 이벤트)을 대신 보냅니다.
+        """
+        payload = self._encode(event)
+        # 이 워커도 다른 워커와 같은 값(datetime은 ISO 문자열)으로 전달하도록 왕복한 값을 사용
+        local = json.loads(payload)["event"]
+        if len(payload) > self.max_payload:
+            self.oversized += 1
+            if fallback is None:
+                print(f"⚠ 룸 이벤트가 NOTIFY 한도를 넘어 다른 워커에 전달하지 않습니다 (room {room_id})")
+                return local
+            payload = self._encode(fallback)
+        if self._outbox is not None:
+            self._outbox.put_nowait((room_channel(room_id), payload.decode("utf-8")))
+        return local
+
+    async def _publish_loop(self):
+        while True:
+            channel, payload = await self._outbox.get()
+            try:
+                if self._publish_conn is None or self._publish_conn.is_closed():
+                    self._publish_conn = await self._connect()
+                await self._publish_conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+                self.published += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed_publishes += 1
+                print(f"⚠ 룸 이벤트 발행 실패: {e}")
+                if self._publish_conn is not None:
+                    self._publish_conn.terminate()
+                    self._publish_conn = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "subscribed_rooms": len(self._listening),
+            "pending_publish": self._outbox.qsize() if self._outbox else 0,
+            "published": self.published,
+            "received": self.received,
+            "oversized": self.oversized,
+            "failed_publishes": self.failed_publishes,
+            "reconnects": self.reconnects,
+        }
+
+def create_pubsub(backend: str = WS_PUBSUB_BACKEND):
+    """WS_PUBSUB_BACKEND에 해당하는 pub/sub 백엔드 생성"""
+    if backend == "postgres":
+        return PostgresPubSub()
+    if backend != "memory":
+        print(f"⚠ 알 수 없는 WS_PUBSUB_BACKEND '{backend}', memory 사용")
+    return InProcessPubSub()
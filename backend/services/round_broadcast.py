@@ -0,0 +1,244 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.match import Match
+from models.round import Round
+from models.enums import RoundState, MatchStatus
+from services.websocket_manager import manager
+from services.match_cache import match_cache
+from services.match_watcher import match_watcher
+from utils.responses import load_round_response, load_state_version, round_payload
+
+# 이 상태부터는 상대 카드 값도 공개
+REVEALED_STATES = (RoundState.REVEAL, RoundState.ENDED)
+
+def _visible_cards(round: dict, cards: list, viewer_id: Optional[int]) -> list:
+    """공개 전에는 본인 외 카드 값을 숨긴 카드 목록"""
+    if round["state"] in REVEALED_STATES:
+        return cards
+    return [
+        card if card["player_id"] == viewer_id
+        else dict(card, front_value=None, back_value=None)
+        for card in cards
+    ]
+
+def round_view(round: dict, viewer_id: Optional[int]) -> dict:
+    """viewer_id 시점의 라운드 (공개 전에는 상대 카드 값을 숨김)"""
+    return dict(round, cards=_visible_cards(round, round["cards"], viewer_id))
+
+def round_state_message(round: dict, viewer_id: Optional[int], seq: int) -> dict:
+    """viewer_id에게 보낼 전체 스냅샷 이벤트"""
+    return {"type": "round_state", "seq": seq, "round": round_view(round, viewer_id)}
+
+def round_delta_message(round: dict, delta: dict, viewer_id: Optional[int], seq: int) -> dict:
+    """viewer_id에게 보낼 변경분 이벤트 (seq - 1 상태에 적용)"""
+    return {
+        "type": "round_delta",
+        "seq": seq,
+        "round_id": round["id"],
+        "changes": delta["changes"],
+        "cards": _visible_cards(round, delta["cards"], viewer_id),
+        "actions": delta["actions"],
+    }
+
+def diff_round(prev: dict, round: dict) -> dict:
+    """같은 라운드의 이전 상태 대비 변경분 (바뀐 필드, 바뀐 카드, 새로 추가된 액션)"""
+    changes = {
+        key: value for key, value in round.items()
+        if key not in ("cards", "actions") and prev.get(key) != value
+    }
+    if round["state"] in REVEALED_STATES and prev["state"] not in REVEALED_STATES:
+        # 공개 시점에는 숨겨 두었던 카드 값을 모두 전송
+        cards = round["cards"]
+    else:
+        cards = [card for card in round["cards"] if card not in prev["cards"]]
+    seen = {action["id"] for action in prev["actions"]}
+    actions = [action for action in round["actions"] if action["id"] not in seen]
+    return {"changes": changes, "cards": cards, "actions": actions}
+
+@dataclass
+class RoomStream:
+    """룸 하나의 이벤트 순번과 마지막으로 보낸 라운드 상태"""
+    seq: int = 0
+    round: Optional[dict] = None
+
+class RoundEventStream:
+    """룸별 순번이 붙은 라운드 이벤트 스트림
+
+    변경마다 룸의 순번을 1 올리고 직전 상태와의 차이(round_delta)만 보내므로
+    이벤트 크기가 라운드 길이에 따라 커지지 않습니다. 라운드가 바뀌면 스냅샷(round_state)을 보냅니다.
+    클라이언트는 받은 seq가 자신이 가진 seq + 1이 아니면 sync 메시지로 스냅샷을 요청합니다.
+    순번은 프로세스 메모리에만 있으므로 서버 재시작 후에는 클라이언트가 다시 동기화합니다.
+
+    매치가 끝나거나 이 워커에서 룸의 마지막 연결이 끊기면 룸 항목을 제거합니다 (forget).
+    다시 만들어진 룸의 순번은 이 프로세스가 보낸 이벤트 수에서 시작하므로 이전에 보낸 seq와 겹치지 않습니다.
+    """
+
+    def __init__(self):
+        self._rooms: Dict[int, RoomStream] = {}
+        # 통계
+        self.deltas = 0
+        self.snapshots = 0
+        self.stale = 0
+        self.evicted = 0
+
+    def seq(self, room_id: int) -> int:
+        """룸의 현재 이벤트 순번 (이벤트가 없었으면 0)"""
+        stream = self._rooms.get(room_id)
+        return stream.seq if stream else 0
+
+    def current(self, room_id: int) -> Optional[dict]:
+        """룸에 마지막으로 보낸 라운드 상태 (없으면 None)"""
+        stream = self._rooms.get(room_id)
+        return stream.round if stream else None
+
+    def publish(self, room_id: int, round: dict) -> Optional[Tuple[int, Optional[dict]]]:
+        """새 라운드 상태를 기록하고 (seq, delta) 반환 (delta가 None이면 스냅샷 전송)
+
+        동시 요청으로 이미 보낸 상태보다 오래된 응답이 늦게 도착하면 None을 반환합니다.
+        """
+        stream = self._rooms.get(room_id)
+        if stream is None:
+            # 각 룸의 seq는 보낸 이벤트 총수를 넘지 않으므로 제거 전에 쓰던 seq보다 항상 큼
+            stream = self._rooms[room_id] = RoomStream(seq=self.deltas + self.snapshots)
+        prev = stream.round
+        if prev and prev["match_id"] == round["match_id"]:
+            if (round["round_no"], round["state_version"]) <= (prev["round_no"], prev["state_version"]):
+                self.stale += 1
+                return None
+
+        delta = diff_round(prev, round) if prev and prev["id"] == round["id"] else None
+        stream.seq += 1
+        stream.round = round
+        if delta is None:
+            self.snapshots += 1
+        else:
+            self.deltas += 1
+        return stream.seq, delta
+
+    def forget(self, room_id: int):
+        """룸의 순번과 마지막 라운드 상태 제거 (매치 종료 또는 룸의 마지막 연결 해제 시)"""
+        if self._rooms.pop(room_id, None) is not None:
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self._rooms),
+            "deltas": self.deltas,
+            "snapshots": self.snapshots,
+            "stale": self.stale,
+            "evicted": self.evicted,
+        }
+
+# 전역 라운드 이벤트 스트림 (이 워커에 연결이 남지 않은 룸은 제거)
+round_stream = RoundEventStream()
+manager.on_room_closed(round_stream.forget)
+
+async def room_id_for_match(db: AsyncSession, match_id: int) -> Optional[int]:
+    """매치의 room_id (라운드 엔진이나 매치 좌석 캐시에 있으면 DB 조회 없음)"""
+    from services.round_engine import round_engine
+
+    live = round_engine.matches.get(match_id)
+    if live:
+        return live.room_id
+    seats = await match_cache.seats_async(db, match_id)
+    return seats.room_id if seats else None
+
+async def match_has_ended(db: AsyncSession, match_id: int) -> bool:
+    """매치가 종료되었는지 (라운드 엔진에 있으면 DB 조회 없음)"""
+    from services.round_engine import round_engine
+
+    live = round_engine.matches.get(match_id)
+    if live:
+        return live.status == MatchStatus.ENDED
+    status = (await db.execute(select(Match.status).where(Match.id == match_id))).scalar()
+    return status == MatchStatus.ENDED
+
+@manager.renderer("match_changed")
+async def render_match_changed(room_id: int, event: dict):
+    """match_changed 이벤트로 이 워커의 long-poll 대기 요청을 깨움 (웹소켓에는 보내지 않음)"""
+    await match_watcher.wake(event["match_id"])
+    return None
+
+@manager.renderer("round")
+async def render_round_event(room_id: int, event: dict):
+    """round 이벤트를 이 워커의 이벤트 스트림에 기록하고 연결별 변경분(라운드가 바뀌면 스냅샷)으로 변환
+
+    이벤트를 발행한 워커와 받은 워커 모두 이 함수를 거치므로, seq는 각 워커가 자기 연결에
+    보낸 이벤트 기준으로 매겨집니다 (클라이언트는 연결된 워커와만 sync).
+    """
+    if room_id not in manager.active_connections:
+        # long-poll 대기 때문에 구독한 룸: 웹소켓이 없으므로 스트림 항목을 만들지 않음
+        return None
+    round = event.get("round")
+    if round is None:
+        # NOTIFY 한도를 넘어 id만 전달된 경우 DB에서 조회
+        from database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            round = await load_round_response(db, Round.id == event["round_id"])
+        if not round:
+            return None
+
+    published = round_stream.publish(room_id, round)
+    if not published:
+        return None
+    seq, delta = published
+    if event.get("match_ended"):
+        # 매치의 마지막 이벤트: 이후 sync는 DB에서 스냅샷 조회
+        round_stream.forget(room_id)
+    # 느린 연결에 대기 중인 round 이벤트는 이 시점의 스냅샷 하나로 합쳐질 수 있음 (coalesce 정책)
+    snapshot = lambda user_id: round_state_message(round, user_id, seq)
+    if delta is None:
+        return snapshot, "round", snapshot
+    return (lambda user_id: round_delta_message(round, delta, user_id, seq)), "round", snapshot
+
+async def broadcast_round_state(db: AsyncSession, round: dict):
+    """라운드 변경(round_payload) 후 룸의 각 연결(다른 워커 포함)에 해당 플레이어 시점의 round 이벤트 전송
+
+    전송 실패는 요청 처리에 영향을 주지 않습니다 (클라이언트는 sync로 다시 동기화 가능).
+    """
+    try:
+        room_id = await room_id_for_match(db, round["match_id"])
+        if room_id is None:
+            return
+
+        # 매치 종료는 끝난 라운드에서만 확인 (받은 워커가 룸의 스트림 항목을 제거)
+        ended = round["state"] == RoundState.ENDED and await match_has_ended(db, round["match_id"])
+        await manager.publish(
+            room_id,
+            {"type": "round", "round": round, "match_ended": ended},
+            fallback={"type": "round", "round_id": round["id"], "match_ended": ended}
+        )
+    except Exception as e:
+        print(f"⚠ round_state 브로드캐스트 실패: {e}")
+
+async def round_response(db: AsyncSession, round) -> dict:
+    """ORM Round 또는 라운드 엔진의 LiveRound를 RoundResponse 형식의 payload로 변환"""
+    from services.round_engine import round_engine, LiveRound
+
+    if isinstance(round, LiveRound):
+        version = round_engine.state_version(round.match_id)
+        if version is not None:
+            return round_payload(round, version)
+        # 종료되어 저장 후 메모리에서 제거된 매치는 DB에서 조회
+    return await load_round_response(db, Round.id == round.id)
+
+async def publish_round(db: AsyncSession, round, viewer_id: Optional[int]) -> dict:
+    """변경된 라운드를 룸 웹소켓에 round 이벤트로 전송하고 viewer_id 시점의 응답 payload 반환 (HTTP와 웹소켓 명령 공용)"""
+    result = await round_response(db, round)
+    await broadcast_round_state(db, result)
+    return round_view(result, viewer_id)
+
+async def load_room_snapshot(db: AsyncSession, room_id: int, viewer_id: Optional[int]) -> Optional[dict]:
+    """동기화용 전체 스냅샷 (이 프로세스에서 보낸 상태가 없으면 DB에서 현재 라운드 조회)"""
+    state = round_stream.current(room_id)
+    if state is None:
+        current = await load_state_version(db, Match.room_id == room_id, latest=True)
+        if not current:
+            return None
+        state = await load_round_response(db, Round.match_id == current[0], latest=True)
+        if not state:
+            return None
+    return round_state_message(state, viewer_id, round_stream.seq(room_id))
@@ -0,0 +1,507 @@
+import os
+import copy
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.match import Match, MatchPlayer
+from models.round import Round, RoundCard, Action
+from models.enums import MatchStatus, RoundState
+from services.game_service import GameService
+from services.betting_service import BettingService
+from services.action_log import action_log
+from services.match_cache import match_cache
+
+# 메모리 엔진은 한 매치의 모든 요청이 같은 프로세스로 들어온다는 전제가 필요합니다.
+# (uvicorn 워커 1개 또는 room 단위 sticky 라우팅) 기본값은 비활성화입니다.
+ROUND_ENGINE_ENABLED = os.getenv("ROUND_ENGINE_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+ROUND_ENGINE_FLUSH_INTERVAL_MS = int(os.getenv("ROUND_ENGINE_FLUSH_INTERVAL_MS", "20"))
+
+@dataclass
+class LivePlayer:
+    user_id: int
+    seat: int
+    chips: int
+
+@dataclass
+class LiveCard:
+    player_id: int
+    front_value: int
+    back_value: int
+    chosen_side: Optional[str]
+    bet_total: int
+
+@dataclass
+class LiveAction:
+    id: int
+    player_id: int
+    action_type: str
+    amount: Optional[int]
+    payload: dict
+    created_at: datetime
+    round_id: int  # 적용된 라운드 (저장 전에 라운드가 바뀌어도 이 값으로 기록)
+
+@dataclass
+class LiveRound:
+    id: int
+    match_id: int
+    round_no: int
+    state: str
+    pot: int
+    carry_over_pot: int
+    current_turn_user_id: Optional[int]
+    min_bet: int
+    current_bet: int
+    action_seq: int
+    result: Optional[str]
+    winner_id: Optional[int]
+    is_double_side_bet: bool
+    double_side_bonus: int
+    created_at: datetime
+    ended_at: Optional[datetime]
+    cards: List[LiveCard] = field(default_factory=list)  # seat 순서
+    actions: List[LiveAction] = field(default_factory=list)  # 시간 순서
+
+@dataclass
+class LiveMatch:
+    id: int
+    room_id: int
+    status: str
+    ended_at: Optional[datetime]
+    players: List[LivePlayer]  # seat 순서
+    state_version: int = 0  # 명령마다 증가 (ETag, 다른 요청은 DB 조회 없이 비교)
+    batched: bool = False  # 액션 로그 durability (True면 ActionLogWriter로 일괄 저장)
+    round: Optional[LiveRound] = None  # 가장 최근 라운드
+    pending_actions: List[LiveAction] = field(default_factory=list)  # 아직 저장되지 않은 액션
+    pending_stats: List[dict] = field(default_factory=list)  # 아직 저장되지 않은 통계 증가분
+    dirty: bool = False
+    persist_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    command_lock: asyncio.Lock = field(default_factory=asyncio.Lock)  # sync 매치 명령 직렬화
+
+class RoundEngine:
+    """진행 중인 매치/라운드를 메모리에서 처리하고 DB에는 비동기로 기록 (write-behind)
+
+    면 선택/베팅 검증과 적용은 GameService.apply_side_selection,
+    BettingService.apply_action 규칙을 메모리 객체에 그대로 실행하며,
+    변경된 매치는 백그라운드 작업이 모아서 기존 테이블에 저장합니다.
+    sync 매치는 응답 전에 바로 저장하고(write-through), batched 매치의
+    액션은 ActionLogWriter가 다른 매치의 액션과 함께 일괄 저장합니다.
+    """
+
+    def __init__(self, enabled: bool = ROUND_ENGINE_ENABLED, flush_interval_ms: int = ROUND_ENGINE_FLUSH_INTERVAL_MS):
+        self.enabled = enabled
+        self.flush_interval = flush_interval_ms / 1000
+        self.matches: Dict[int, LiveMatch] = {}
+        # round_id -> match_id (메모리에 올라간 최신 라운드만)
+        self.round_index: Dict[int, int] = {}
+        # room_id / user_id -> 메모리에 있는 match_id (룸/사용자 단위 조회가 전체 매치를 훑지 않도록)
+        self.room_index: Dict[int, Set[int]] = {}
+        self.user_index: Dict[int, Set[int]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+
+    # ---- 수명 주기 ----
+
+    async def start(self):
+        """재시작 시 DB에서 진행 중인 매치를 복원하고 저장 작업 시작"""
+        if not self.enabled:
+            return
+        from database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            await self.rebuild(db)
+        self._wakeup = asyncio.Event()
+        self._writer = asyncio.create_task(self._write_behind_loop())
+
+    async def stop(self):
+        """저장 작업 종료 (남은 변경사항 모두 기록)"""
+        if self._writer:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        if self._flushing is not None and not self._flushing.done():
+            # 취소된 작업이 시작한 저장이 끝날 때까지 대기 (스냅샷으로 꺼낸 변경사항이 유실되지 않도록)
+            try:
+                await self._flushing
+            except Exception:
+                pass
+        await self.flush()
+
+    async def rebuild(self, db: AsyncSession):
+        """ACTIVE 상태 매치 전체를 DB에서 다시 적재"""
+        self.matches.clear()
+        self.round_index.clear()
+        self.room_index.clear()
+        self.user_index.clear()
+        match_ids = (await db.execute(
+            select(Match.id).where(Match.status == MatchStatus.ACTIVE)
+        )).scalars().all()
+        for match_id in match_ids:
+            await self.load_match(db, match_id)
+        print(f"✓ 라운드 엔진 복원 완료: 진행 중인 매치 {len(self.matches)}개")
+
+    # ---- 적재 ----
+
+    async def load_match(self, db: AsyncSession, match_id: int) -> Optional[LiveMatch]:
+        """매치, 플레이어, 최신 라운드(카드/액션 포함)를 메모리로 적재"""
+        live = self.matches.get(match_id)
+        if live:
+            return live
+
+        match = await db.get(Match, match_id)
+        if not match:
+            return None
+        players = (await db.execute(
+            select(MatchPlayer).where(MatchPlayer.match_id == match_id).order_by(MatchPlayer.seat)
+        )).scalars().all()
+        live = LiveMatch(
+            id=match.id,
+            room_id=match.room_id,
+            status=match.status,
+            ended_at=match.ended_at,
+            players=[LivePlayer(user_id=p.user_id, seat=p.seat, chips=p.chips) for p in players],
+            state_version=match.state_version,
+            batched=action_log.is_batched(match.settings),
+        )
+
+        round = (await db.execute(
+            select(Round).where(Round.match_id == match_id).order_by(Round.round_no.desc()).limit(1)
+        )).scalars().first()
+        if round:
+            live.round = await self._load_round(db, round, live.players)
+
+        # 동시에 적재된 경우 먼저 등록된 상태를 사용
+        if match_id in self.matches:
+            return self.matches[match_id]
+        self.matches[match_id] = live
+        if live.round:
+            self.round_index[live.round.id] = match_id
+        self.room_index.setdefault(live.room_id, set()).add(match_id)
+        for player in live.players:
+            self.user_index.setdefault(player.user_id, set()).add(match_id)
+        return live
+
+    async def _load_round(self, db: AsyncSession, round: Round, players: List[LivePlayer]) -> LiveRound:
+        seats = {p.user_id: p.seat for p in players}
+        cards = (await db.execute(
+            select(RoundCard).where(RoundCard.round_id == round.id)
+        )).scalars().all()
+        actions = (await db.execute(
+            select(Action).where(Action.round_id == round.id).order_by(Action.created_at, Action.id)
+        )).scalars().all()
+
+        live_round = LiveRound(
+            id=round.id,
+            match_id=round.match_id,
+            round_no=round.round_no,
+            state=round.state,
+            pot=round.pot,
+            carry_over_pot=round.carry_over_pot,
+            current_turn_user_id=round.current_turn_user_id,
+            min_bet=round.min_bet,
+            current_bet=round.current_bet,
+            action_seq=round.action_seq,
+            result=round.result,
+            winner_id=round.winner_id,
+            is_double_side_bet=round.is_double_side_bet,
+            double_side_bonus=round.double_side_bonus,
+            created_at=round.created_at,
+            ended_at=round.ended_at,
+            cards=sorted(
+                (LiveCard(c.player_id, c.front_value, c.back_value, c.chosen_side, c.bet_total) for c in cards),
+                key=lambda c: seats.get(c.player_id, 0)
+            ),
+        )
+        loaded = [
+            LiveAction(a.id, a.player_id, a.action_type, a.amount, a.payload or {}, a.created_at, round.id)
+            for a in actions
+        ]
+        # ActionLogWriter에 남아 있는 액션은 저장된 액션 뒤에 추가
+        ids = {a.id for a in loaded}
+        loaded += [
+            LiveAction(r["id"], r["player_id"], r["action_type"], r["amount"], r["payload"], r["created_at"], round.id)
+            for r in action_log.pending_for_round(round.id) if r["id"] not in ids
+        ]
+        live_round.actions = loaded
+        return live_round
+
+    async def get_round(self, db: AsyncSession, round_id: int) -> Optional[LiveRound]:
+        """메모리의 라운드 반환 (매치의 최신 라운드가 아니면 None)"""
+        match_id = self.round_index.get(round_id)
+        if match_id is None:
+            match_id = (await db.execute(
+                select(Round.match_id).where(Round.id == round_id)
+            )).scalar()
+            if match_id is None:
+                return None
+            await self.load_match(db, match_id)
+
+        live = self.matches.get(match_id)
+        if live and live.round and live.round.id == round_id:
+            return live.round
+        return None
+
+    def current_round(self, match_id: int) -> Optional[LiveRound]:
+        """메모리에 있는 매치의 최신 라운드 (없으면 None, DB 조회 없음)"""
+        live = self.matches.get(match_id)
+        return live.round if live else None
+
+    def state_version(self, match_id: int) -> Optional[int]:
+        """메모리에 있는 매치의 상태 버전 (없으면 None, DB 조회 없음)"""
+        live = self.matches.get(match_id)
+        return live.state_version if live else None
+
+    def match_for_room(self, room_id: int) -> Optional[LiveMatch]:
+        """메모리에 있는 룸의 진행 중인 매치 (없으면 None, DB 조회 없음)"""
+        for match_id in self.room_index.get(room_id, ()):
+            live = self.matches[match_id]
+            if live.status == MatchStatus.ACTIVE:
+                return live
+        return None
+
+    def cached_round(self, round_id: int) -> Optional[LiveRound]:
+        """메모리에 있는 라운드 (없으면 None, DB 조회 없음)"""
+        match_id = self.round_index.get(round_id)
+        return self.current_round(match_id) if match_id is not None else None
+
+    # ---- 게임 명령 ----
+
+    async def select_side(self, db: AsyncSession, round_id: int, player_id: int, side: str) -> Optional[LiveRound]:
+        """면 선택을 메모리에서 처리 (라운드를 관리하지 않으면 None)"""
+        round = await self.get_round(db, round_id)
+        if not round:
+            return None
+        async with self._command(self.matches[round.match_id]):
+            action_id = await action_log.next_id(db)
+
+            # 여기서부터 await 없이 적용 (이벤트 루프 위에서 원자적)
+            action = GameService.apply_side_selection(round, round.cards, player_id, side)
+            await self._record(round, action_id, action)
+        return round
+
+    async def process_action(
+        self,
+        db: AsyncSession,
+        round_id: int,
+        player_id: int,
+        action_type: str,
+        amount: Optional[int] = None
+    ) -> Optional[LiveRound]:
+        """베팅 액션을 메모리에서 처리 (라운드를 관리하지 않으면 None)"""
+        round = await self.get_round(db, round_id)
+        if not round:
+            return None
+        live = self.matches[round.match_id]
+        async with self._command(live):
+            action_id = await action_log.next_id(db)
+
+            # 여기서부터 await 없이 적용 (이벤트 루프 위에서 원자적)
+            action = BettingService.apply_action(
+                round, live, live.players, round.cards, player_id, action_type, amount
+            )
+            if round.state == RoundState.ENDED:
+                # 라운드가 끝나면 통계 증가분을 라운드 결과와 같은 트랜잭션에서 저장
+                live.pending_stats += BettingService.stats_deltas(round, live, live.players, round.cards)
+            await self._record(round, action_id, action)
+        return round
+
+    @asynccontextmanager
+    async def _command(self, live: LiveMatch):
+        """sync 매치의 명령을 하나씩 적용하고, 저장에 실패하면 적용 전 메모리 상태로 되돌림
+
+        sync 매치는 응답 전에 저장하므로 저장이 실패한 명령은 클라이언트에 실패로 응답하며,
+        메모리에 남겨 두면 다음 저장 때 기록되어 실패로 응답한 명령이 반영됩니다.
+        batched 매치는 ActionLogWriter가 재시도하므로 되돌리지 않습니다.
+        """
+        if live.batched:
+            yield
+            return
+        async with live.command_lock:
+            checkpoint = (
+                copy.deepcopy(live.round), copy.deepcopy(live.players),
+                live.status, live.ended_at, live.state_version,
+                len(live.pending_actions), len(live.pending_stats), live.dirty,
+            )
+            try:
+                yield
+            except Exception:
+                round, players, live.status, live.ended_at, live.state_version, actions, stats, live.dirty = checkpoint
+                if live.round is not None and round is not None:
+                    vars(live.round).update(vars(round))
+                live.players[:] = players
+                # _persist가 실패하면서 다시 넣어 둔 이 명령의 액션/통계 제거
+                del live.pending_actions[actions:]
+                del live.pending_stats[stats:]
+                raise
+
+    async def _record(self, round: LiveRound, action_id: int, action: dict):
+        """적용된 액션을 라운드에 추가하고 durability에 따라 저장"""
+        live = self.matches[round.match_id]
+        live_action = LiveAction(
+            id=action_id,
+            player_id=action["player_id"],
+            action_type=action["action_type"],
+            amount=action["amount"],
+            payload=action["payload"],
+            created_at=datetime.now(),
+            round_id=round.id,
+        )
+        round.actions.append(live_action)
+        live.state_version += 1
+        if live.batched:
+            action_log.append(dict(vars(live_action)))
+            self._mark_dirty(live)
+        else:
+            live.pending_actions.append(live_action)
+            self._mark_dirty(live)
+            await self._persist(live)
+
+    # ---- write-behind ----
+
+    def _mark_dirty(self, live: LiveMatch):
+        live.dirty = True
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _write_behind_loop(self):
+        while True:
+            await self._wakeup.wait()
+            # 짧은 구간 동안 들어온 변경을 모아서 저장
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            # stop()으로 작업이 취소되어도 진행 중인 저장은 끝까지 실행
+            self._flushing = asyncio.ensure_future(self.flush())
+            try:
+                await asyncio.shield(self._flushing)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠ 라운드 엔진 저장 실패 (재시도 예정): {e}")
+                await asyncio.sleep(1)
+                self._wakeup.set()
+
+    async def flush(self, match_id: Optional[int] = None):
+        """변경된 매치를 DB에 저장 (match_id 지정 시 해당 매치만)"""
+        if match_id is not None:
+            targets = [self.matches[match_id]] if match_id in self.matches else []
+        else:
+            targets = [m for m in self.matches.values() if m.dirty]
+        for live in targets:
+            await self._persist(live)
+
+    async def flush_room(self, room_id: int):
+        """룸에 속한 매치의 변경사항 저장"""
+        for match_id in list(self.room_index.get(room_id, ())):
+            if match_id in self.matches:
+                await self._persist(self.matches[match_id])
+
+    async def flush_user(self, user_id: int):
+        """사용자가 참가 중인 매치의 변경사항 저장"""
+        for match_id in list(self.user_index.get(user_id, ())):
+            if match_id in self.matches:
+                await self._persist(self.matches[match_id])
+
+    async def _persist(self, live: LiveMatch):
+        from database import AsyncSessionLocal
+
+        async with live.persist_lock:
+            if not live.dirty:
+                return
+            # 스냅샷은 await 없이 만들어 적용 중인 명령과 섞이지 않게 함
+            live.dirty = False
+            actions, live.pending_actions = live.pending_actions, []
+            stats, live.pending_stats = live.pending_stats, []
+            round = live.round
+            match_values = {"status": live.status, "ended_at": live.ended_at, "state_version": live.state_version}
+            player_rows = [{"match_id": live.id, "user_id": p.user_id, "chips": p.chips} for p in live.players]
+            round_values = card_rows = None
+            if round:
+                round_values = {
+                    "id": round.id,
+                    "state": round.state,
+                    "pot": round.pot,
+                    "carry_over_pot": round.carry_over_pot,
+                    "current_bet": round.current_bet,
+                    "action_seq": round.action_seq,
+                    "current_turn_user_id": round.current_turn_user_id,
+                    "result": round.result,
+                    "winner_id": round.winner_id,
+                    "is_double_side_bet": round.is_double_side_bet,
+                    "double_side_bonus": round.double_side_bonus,
+                    "ended_at": round.ended_at,
+                }
+                card_rows = [
+                    {"round_id": round.id, "player_id": c.player_id, "chosen_side": c.chosen_side, "bet_total": c.bet_total}
+                    for c in round.cards
+                ]
+            action_rows = [
+                {
+                    "id": a.id,
+                    "round_id": a.round_id,
+                    "player_id": a.player_id,
+                    "action_type": a.action_type,
+                    "amount": a.amount,
+                    "payload": a.payload,
+                    "created_at": a.created_at,
+                }
+                for a in actions
+            ]
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(update(Match).where(Match.id == live.id).values(**match_values))
+                    await db.execute(update(MatchPlayer), player_rows)
+                    if round_values:
+                        await db.execute(update(Round), [round_values])
+                        await db.execute(update(RoundCard), card_rows)
+                    if action_rows:
+                        await db.execute(insert(Action), action_rows)
+                    if stats:
+                        await db.execute(BettingService.stats_upsert(stats))
+                    await db.commit()
+            except Exception:
+                # 다음 저장 때 다시 기록 (sync 명령의 저장 실패는 _command에서 되돌림)
+                live.pending_actions[:0] = actions
+                live.pending_stats[:0] = stats
+                live.dirty = True
+                raise
+
+            # 종료된 매치는 캐시와 메모리에서 제거
+            if match_values["status"] == MatchStatus.ENDED:
+                match_cache.match_ended(live.id)
+                if not live.dirty:
+                    self.forget(live.id)
+
+    async def reset(self, match_id: int):
+        """변경사항을 저장한 뒤 매치를 메모리에서 제거"""
+        await self.flush(match_id)
+        self.forget(match_id)
+
+    def forget(self, match_id: int):
+        """매치를 메모리에서 제거 (다음 접근 시 DB에서 다시 적재)"""
+        live = self.matches.pop(match_id, None)
+        if not live:
+            return
+        if live.round:
+            self.round_index.pop(live.round.id, None)
+        self._unindex(self.room_index, live.room_id, match_id)
+        for player in live.players:
+            self._unindex(self.user_index, player.user_id, match_id)
+
+    @staticmethod
+    def _unindex(index: Dict[int, Set[int]], key: int, match_id: int):
+        match_ids = index.get(key)
+        if match_ids is not None:
+            match_ids.discard(match_id)
+            if not match_ids:
+                del index[key]
+
+# 전역 라운드 엔진
+round_engine = RoundEngine()
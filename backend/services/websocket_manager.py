@@ -1,88 +1,520 @@
-from typing import Dict, Set
+import os
+import time
+import uuid
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
 from fastapi import WebSocket
-import json
+from utils.responses import dumps
+from services.room_pubsub import create_pubsub
+
+# 연결별 송신 대기열 크기 (메시지 수)
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+# 한 메시지 전송 제한 시간 (초). 넘으면 응답하지 않는 연결로 보고 끊음
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+# 대기열이 가득 찼을 때: drop_oldest(가장 오래된 메시지 버림), coalesce(같은 종류의 대기 메시지를 최신 스냅샷 하나로 합침),
+# disconnect(밀려 있는 연결 종료, 밀려 있지 않으면 coalesce처럼 처리)
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "coalesce").strip().lower()
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+# disconnect 정책에서 가장 오래된 미전송 메시지(전송 중인 메시지 포함)가 이 시간(초) 이상 기다린 연결만 종료.
+# 한 번에 몰린 브로드캐스트로 대기열이 찬 연결은 끊지 않고 메시지를 합치거나 버림
+WS_SLOW_CONSUMER_LAG = float(os.getenv("WS_SLOW_CONSUMER_LAG", "1"))
+
+# 느린 연결을 끊을 때 사용하는 close code (1013: Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# 서버 하트비트 주기 (초, 0이면 사용 안 함). 이 시간 동안 메시지가 없던 연결에 ping 전송
+WS_HEARTBEAT_INTERVAL = float(os.getenv("WS_HEARTBEAT_INTERVAL", "15"))
+# 연속으로 이 횟수만큼 ping에 응답하지 않으면 연결 정리
+WS_HEARTBEAT_MISSED_LIMIT = int(os.getenv("WS_HEARTBEAT_MISSED_LIMIT", "3"))
+# 하트비트 응답이 없는 연결을 끊을 때 사용하는 close code (1001: Going Away)
+HEARTBEAT_CLOSE_CODE = 1001
+
+# 두 플레이어가 모두 연결되었을 때 룸에 보내는 메시지
+BOTH_PLAYERS_READY = {"type": "both_players_ready", "message": "두 플레이어가 모두 준비되었습니다"}
+
+def _encode(message: dict) -> str:
+    """웹소켓 텍스트 프레임으로 보낼 JSON (REST 응답과 같은 직렬화 경로)"""
+    return dumps(message).decode("utf-8")
+
+# 대기열 항목: (coalesce key, 전송할 텍스트, 이 메시지까지의 상태를 담은 스냅샷 텍스트를 만드는 함수, 넣은 시각)
+QueueItem = Tuple[Optional[str], str, Optional[Callable[[], str]], float]
+
+# 사용자별 메시지 (user_id -> dict)
+UserMessage = Callable[[Optional[int]], dict]
+# 룸 이벤트를 연결에 보낼 (메시지, coalesce key, 스냅샷)으로 변환 (None이면 전송하지 않음)
+Renderer = Callable[[int, dict], Awaitable[Optional[Tuple[Union[dict, UserMessage], Optional[str], Optional[UserMessage]]]]]
+
+class ClientConnection:
+    """웹소켓 연결 하나의 송신 대기열과 전용 writer 작업
+    
+    브로드캐스트는 대기열에 넣기만 하고 바로 반환하며, 실제 전송은 연결마다 하나인
+    writer 작업이 순서대로 처리합니다. 느린 연결은 자기 대기열만 쌓이고 다른 연결이나
+    호출한 요청을 기다리게 하지 않습니다.
+    
+    대기열은 queue_size를 넘지 않으며, 가득 차면 느린 연결 정책을 적용합니다.
+    disconnect 정책이어도 연결이 실제로 밀려 있지 않으면(가장 오래된 미전송 메시지가 slow_lag초 미만)
+    writer가 실행될 틈 없이 연달아 발행된 메시지로 찬 것이므로 끊지 않고 합치거나 버립니다.
+    """
+    
+    def __init__(self, manager: "ConnectionManager", websocket: WebSocket, room_id: int, user_id: int):
+        self.manager = manager
+        self.websocket = websocket
+        self.room_id = room_id
+        self.user_id = user_id
+        self.queue: Deque[QueueItem] = deque()
+        self.closed = False
+        # writer가 전송 중인 메시지를 대기열에 넣은 시각 (전송 중이 아니면 None)
+        self.sending_since: Optional[float] = None
+        # 마지막으로 메시지를 받은 시각과 그 뒤 응답 없이 보낸 ping 수
+        self.last_seen = time.monotonic()
+        self.missed = 0
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._write_loop())
+    
+    def lag(self, now: float) -> float:
+        """가장 오래된 미전송 메시지(전송 중인 메시지 포함)가 기다린 시간 (초, 없으면 0)"""
+        if self.sending_since is not None:
+            return now - self.sending_since
+        return now - self.queue[0][3] if self.queue else 0.0
+    
+    def enqueue(self, text: str, key: str = None, snapshot: Callable[[], str] = None) -> bool:
+        """전송할 메시지를 대기열에 추가 (await 없음, 연결이 닫혔거나 이번에 끊기면 False)"""
+        if self.closed:
+            return False
+        now = time.monotonic()
+        if len(self.queue) >= self.manager.queue_size:
+            policy = self.manager.policy
+            if policy == "disconnect":
+                if self.lag(now) >= self.manager.slow_lag:
+                    self.manager.slow_disconnects += 1
+                    self.manager.drop(self, SLOW_CONSUMER_CLOSE_CODE, "메시지를 제때 받지 못해 연결을 종료합니다")
+                    return False
+                # 밀려 있지 않은 연결: 끊지 않고 대기 메시지를 합침
+                policy = "coalesce"
+            if policy == "coalesce" and key is not None and any(item[0] == key for item in self.queue):
+                # 같은 key의 대기 메시지를 모두 빼고, 그 변경을 모두 포함하는 최신 스냅샷 하나로 대신함
+                pending = len(self.queue)
+                self.queue = deque(item for item in self.queue if item[0] != key)
+                self.manager.coalesced += pending - len(self.queue)
+                if snapshot is not None:
+                    text = snapshot()
+            else:
+                self.queue.popleft()
+                self.manager.dropped += 1
+        self.queue.append((key, text, snapshot, now))
+        self._ready.set()
+        return True
+    
+    async def _write_loop(self):
+        try:
+            while True:
+                await self._ready.wait()
+                while self.queue:
+                    _, text, _, self.sending_since = self.queue.popleft()
+                    await asyncio.wait_for(self.websocket.send_text(text), self.manager.send_timeout)
+                    self.sending_since = None
+                    self.manager.sent += 1
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.manager.send_timeouts += 1
+            print(f"⚠ 웹소켓 전송 시간 초과 (user {self.user_id}, room {self.room_id}), 연결을 종료합니다")
+            self.manager.drop(self, SLOW_CONSUMER_CLOSE_CODE, "메시지를 제때 받지 못해 연결을 종료합니다")
+        except Exception as e:
+            print(f"웹소켓 전송 오류: {e}")
+            self.manager.drop(self)
+    
+    def close(self):
+        """writer 작업 중지 (대기 중인 메시지는 버림)"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
 
 class ConnectionManager:
     """웹소켓 연결 관리자"""
     
-    def __init__(self):
-        # room_id -> Set[WebSocket] 매핑
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
-        # user_id -> WebSocket 매핑
-        self.user_connections: Dict[int, WebSocket] = {}
+    def __init__(
+        self,
+        queue_size: int = WS_SEND_QUEUE_SIZE,
+        send_timeout: float = WS_SEND_TIMEOUT,
+        policy: str = WS_SLOW_CONSUMER_POLICY,
+        slow_lag: float = WS_SLOW_CONSUMER_LAG,
+        pubsub=None,
+        heartbeat_interval: float = WS_HEARTBEAT_INTERVAL,
+        heartbeat_missed_limit: int = WS_HEARTBEAT_MISSED_LIMIT
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            print(f"⚠ 알 수 없는 WS_SLOW_CONSUMER_POLICY '{policy}', coalesce 사용")
+            policy = "coalesce"
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.policy = policy
+        self.slow_lag = slow_lag
+        # room_id -> {user_id -> Set[WebSocket]} 매핑 (한 사용자가 여러 탭으로 연결 가능)
+        self.active_connections: Dict[int, Dict[int, Set[WebSocket]]] = {}
+        # user_id -> Set[WebSocket] 매핑 (모든 룸)
+        self.user_connections: Dict[int, Set[WebSocket]] = {}
+        # WebSocket -> 송신 대기열/writer (room_id, user_id 포함)
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        # 룸 이벤트를 다른 워커와 주고받는 백엔드, 이벤트 타입별 변환 함수
+        self.pubsub = pubsub or create_pubsub()
+        self._renderers: Dict[str, Renderer] = {}
+        # 룸의 마지막 연결이 끊겼을 때 호출할 함수 (룸별 상태 정리)
+        self._room_closed: List[Callable[[int], None]] = []
+        # 웹소켓 없이 룸 이벤트를 받아야 하는 요청 수 (room_id -> 수, 예: long-poll 대기)
+        self._held: Dict[int, int] = {}
+        # 다른 워커에 연결된 사용자 (room_id -> {user_id -> {워커 id -> 마지막으로 알린 시각}})
+        # 이 워커에 연결이 있는 룸만 보관하며, 하트비트마다 다시 알리지 않은 워커는 만료
+        self.origin = uuid.uuid4().hex[:12]
+        self._remote: Dict[int, Dict[int, Dict[str, float]]] = {}
+        self._renderers["presence"] = self._on_presence
+        self._renderers["presence_sync"] = self._on_presence_sync
+        # 모든 연결이 함께 쓰는 하트비트 타이머
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_missed_limit = heartbeat_missed_limit
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # 통계
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.slow_disconnects = 0
+        self.send_timeouts = 0
+        self.pings = 0
+        self.reaped = 0
+    
+    async def start(self):
+        """pub/sub 백엔드와 하트비트 타이머 시작 (앱 시작 시)"""
+        await self.pubsub.start(self._dispatch)
+        if self.heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+    
+    async def stop(self):
+        """하트비트 타이머와 pub/sub 백엔드 종료 (앱 종료 시)"""
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        await self.pubsub.stop()
+    
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"⚠ 웹소켓 하트비트 처리 실패: {e}")
+    
+    def heartbeat(self, now: float = None):
+        """하트비트 한 번: 유휴 연결에 ping을 보내고, ping에 연속으로 응답하지 않은 연결은 정리
+        
+        프로세스당 타이머 하나가 모든 연결을 순회하며, 주기 안에 메시지를 보낸 연결은 건너뜁니다.
+        """
+        now = time.monotonic() if now is None else now
+        # 이 워커의 접속 상태를 다시 알려 다른 워커에서 만료되지 않게 함
+        for room_id, room in self.active_connections.items():
+            for user_id in room:
+                self._announce(room_id, user_id, True)
+        ping = _encode({"type": "ping"})
+        for client in list(self.clients.values()):
+            if now - client.last_seen < self.heartbeat_interval:
+                continue
+            if client.missed >= self.heartbeat_missed_limit:
+                self.reaped += 1
+                self.drop(client, HEARTBEAT_CLOSE_CODE, "하트비트 응답이 없어 연결을 종료합니다")
+                continue
+            if client.enqueue(ping):
+                client.missed += 1
+                self.pings += 1
+    
+    def touch(self, websocket: WebSocket):
+        """연결에서 메시지(pong 포함)를 받았음을 기록"""
+        client = self.clients.get(websocket)
+        if client:
+            client.last_seen = time.monotonic()
+            client.missed = 0
+    
+    def renderer(self, event_type: str):
+        """룸 이벤트 타입의 변환 함수 등록 (데코레이터)"""
+        def register(fn: Renderer) -> Renderer:
+            self._renderers[event_type] = fn
+            return fn
+        return register
+    
+    def on_room_closed(self, fn: Callable[[int], None]) -> Callable[[int], None]:
+        """이 워커에서 룸의 마지막 연결이 끊겼을 때 fn(room_id) 호출 (데코레이터)"""
+        self._room_closed.append(fn)
+        return fn
+    
+    def _wants(self, room_id: int) -> bool:
+        """이 워커가 룸 이벤트를 받아야 하는지 (연결이나 대기 중인 요청이 있음)"""
+        return room_id in self.active_connections or room_id in self._held
+    
+    async def hold_room(self, room_id: int):
+        """웹소켓 없이 룸 이벤트를 받기 시작 (release_room과 짝으로 호출)
+        
+        다른 워커의 이벤트를 받을 수 있게 된 뒤(LISTEN 완료) 반환합니다.
+        """
+        if not self._wants(room_id):
+            self.pubsub.subscribe(room_id)
+        self._held[room_id] = self._held.get(room_id, 0) + 1
+        await self.pubsub.ready(room_id)
+    
+    def release_room(self, room_id: int):
+        """hold_room으로 시작한 수신 종료"""
+        self._held[room_id] -= 1
+        if not self._held[room_id]:
+            del self._held[room_id]
+            if not self._wants(room_id):
+                self.pubsub.unsubscribe(room_id)
     
     async def connect(self, websocket: WebSocket, room_id: int, user_id: int):
-        """웹소켓 연결"""
+        """웹소켓 연결 (룸에서 사용자의 첫 연결이면 다른 워커에 접속을 알림)"""
         await websocket.accept()
         
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = set()
+        first_in_room = room_id not in self.active_connections
+        if not self._wants(room_id):
+            # 이 워커에 룸의 첫 연결: 다른 워커에서 발행한 룸 이벤트 수신 시작
+            self.pubsub.subscribe(room_id)
+        first_for_user = not self.is_user_connected(room_id, user_id)
+        self.active_connections.setdefault(room_id, {}).setdefault(user_id, set()).add(websocket)
+        self.user_connections.setdefault(user_id, set()).add(websocket)
+        self.clients[websocket] = ClientConnection(self, websocket, room_id, user_id)
         
-        self.active_connections[room_id].add(websocket)
-        self.user_connections[user_id] = websocket
-    
-    def disconnect(self, websocket: WebSocket, room_id: int, user_id: int):
-        """웹소켓 연결 해제"""
-        if room_id in self.active_connections:
-            self.active_connections[room_id].discard(websocket)
-            if not self.active_connections[room_id]:
-                del self.active_connections[room_id]
+        if first_in_room:
+            # 다른 워커에 이미 연결된 사용자를 알 수 있도록 접속 상태를 요청
+            await self.pubsub.ready(room_id)
+            self.pubsub.publish(room_id, {"type": "presence_sync", "origin": self.origin})
+        if first_for_user:
+            self._announce(room_id, user_id, True)
+    
+    def disconnect(self, websocket: WebSocket, room_id: int, user_id: int) -> bool:
+        """웹소켓 연결 해제 (이 호출로 룸에서 사용자의 마지막 연결이 제거되었으면 True, 다른 워커의 연결 포함)"""
+        client = self.clients.pop(websocket, None)
+        if client:
+            room_id, user_id = client.room_id, client.user_id
+            client.close()
         
-        if user_id in self.user_connections:
-            del self.user_connections[user_id]
+        removed = False
+        # 룸 항목을 지우면 다른 워커의 접속 상태도 함께 지우므로 먼저 확인
+        online_elsewhere = user_id in self._remote_users(room_id)
+        room = self.active_connections.get(room_id)
+        if room is not None and websocket in room.get(user_id, ()):
+            removed = True
+            room[user_id].discard(websocket)
+            if not room[user_id]:
+                del room[user_id]
+                self._announce(room_id, user_id, False)
+                if not room:
+                    del self.active_connections[room_id]
+                    self._remote.pop(room_id, None)
+                    if not self._wants(room_id):
+                        self.pubsub.unsubscribe(room_id)
+                    for closed in self._room_closed:
+                        closed(room_id)
+        
+        sockets = self.user_connections.get(user_id)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.user_connections[user_id]
+        
+        return removed and not online_elsewhere and not self.is_user_connected(room_id, user_id)
+    
+    def drop(self, client: ClientConnection, code: int = None, reason: str = ""):
+        """전송에 실패했거나 너무 느리거나 응답이 없는 연결을 정리 (code가 있으면 close 프레임 전송 시도)
+        
+        사용자의 마지막 연결이었으면 룸에 연결 해제를 알립니다.
+        """
+        if self.disconnect(client.websocket, client.room_id, client.user_id):
+            asyncio.create_task(self.broadcast_to_room(client.room_id, {
+                "type": "player_disconnected",
+                "user_id": client.user_id
+            }, exclude_user_id=client.user_id))
+        if code is not None:
+            asyncio.create_task(self._close(client.websocket, code, reason))
+    
+    async def _close(self, websocket: WebSocket, code: int, reason: str):
+        try:
+            await asyncio.wait_for(websocket.close(code=code, reason=reason), self.send_timeout)
+        except Exception:
+            pass
+    
+    def _enqueue(self, websocket: WebSocket, text: str, key: str = None, snapshot: Callable[[], str] = None) -> bool:
+        client = self.clients.get(websocket)
+        return client.enqueue(text, key, snapshot) if client else False
     
     async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """개인 메시지 전송"""
-        await websocket.send_json(message)
+        """개인 메시지 전송 (대기열에 넣고 바로 반환)"""
+        self._enqueue(websocket, _encode(message))
     
     async def broadcast_to_room(self, room_id: int, message: dict, exclude_user_id: int = None):
-        """룸 내 모든 플레이어에게 브로드캐스트"""
-        if room_id not in self.active_connections:
+        """룸 내 모든 플레이어에게 브로드캐스트 (다른 워커에 연결된 플레이어 포함)"""
+        await self.publish(room_id, {"type": "message", "message": message, "exclude_user_id": exclude_user_id})
+    
+    async def send_to_room(self, room_id: int, message: dict):
+        """룸 내 이 워커의 연결에만 전송 (다른 워커에는 발행하지 않음)"""
+        self._deliver(room_id, message)
+    
+    async def publish(self, room_id: int, event: dict, fallback: dict = None):
+        """룸 이벤트를 이 워커의 연결에 전달하고 pub/sub 백엔드로 다른 워커에 발행
+        
+        event는 JSON으로 직렬화할 수 있어야 하며, type에 등록된 변환 함수가 있으면
+        그 결과를 전송합니다. fallback은 이벤트가 백엔드 한도를 넘을 때 대신 발행됩니다.
+        """
+        await self._dispatch(room_id, self.pubsub.publish(room_id, event, fallback))
+    
+    async def _dispatch(self, room_id: int, event: dict):
+        """이 워커에서 발행했거나 다른 워커에서 받은 룸 이벤트를 연결별 대기열에 넣음"""
+        if not self._wants(room_id):
+            # 이 워커에서 받을 곳이 없는 룸: 변환 함수가 룸별 상태를 만들지 않도록 건너뜀
+            return
+        render = self._renderers.get(event["type"])
+        if render is None:
+            self._deliver(room_id, event["message"], event.get("exclude_user_id"))
             return
+        rendered = await render(room_id, event)
+        if rendered is not None:
+            message, key, snapshot = rendered
+            self._deliver(room_id, message, event.get("exclude_user_id"), key, snapshot)
+    
+    def _deliver(
+        self,
+        room_id: int,
+        message: Union[dict, UserMessage],
+        exclude_user_id: int = None,
+        key: str = None,
+        snapshot: UserMessage = None
+    ):
+        """룸 내 이 워커의 연결에 전송 (연결별 대기열에 넣고 바로 반환)
         
-        disconnected = set()
-        for websocket in self.active_connections[room_id]:
-            try:
-                # 특정 사용자 제외
-                if exclude_user_id:
-                    user_ws = self.user_connections.get(exclude_user_id)
-                    if websocket == user_ws:
-                        continue
-                
-                await websocket.send_json(message)
-            except Exception as e:
-                print(f"웹소켓 전송 오류: {e}")
-                disconnected.add(websocket)
+        message가 함수이면 연결마다 message(user_id)를 전송합니다 (사용자별로 다른 내용).
+        key를 지정하면 coalesce 정책에서 같은 key로 대기 중인 메시지를 snapshot(user_id)
+        하나로 합칠 수 있습니다 (snapshot은 합칠 때만 만들어짐).
+        """
+        room = self.active_connections.get(room_id)
+        if not room:
+            return
         
-        # 연결이 끊어진 웹소켓 제거
-        for ws in disconnected:
-            self.active_connections[room_id].discard(ws)
+        text = None if callable(message) else _encode(message)
+        # 전송 중 느린 연결이 끊기면 매핑이 바뀌므로 복사본을 순회
+        for user_id, sockets in list(room.items()):
+            # 특정 사용자 제외 (모든 탭)
+            if user_id == exclude_user_id:
+                continue
+            # 사용자별 내용은 탭 수와 관계없이 한 번만 직렬화
+            user_text = _encode(message(user_id)) if text is None else text
+            builder = None
+            if snapshot is not None:
+                builder = (lambda user_id=user_id: _encode(snapshot(user_id)))
+            for websocket in list(sockets):
+                self._enqueue(websocket, user_text, key, builder)
     
-    def get_connected_users(self, room_id: int) -> list[int]:
-        """룸에 연결된 사용자 ID 목록 반환"""
+    # ---- 접속 상태 (다른 워커 포함) ----
+    
+    def _announce(self, room_id: int, user_id: int, online: bool):
+        """이 워커에서 사용자의 룸 접속 상태를 다른 워커에 발행 (이 워커에는 전달하지 않음)"""
+        self.pubsub.publish(room_id, {"type": "presence", "origin": self.origin, "user_id": user_id, "online": online})
+    
+    def _presence_ttl(self) -> Optional[float]:
+        # 하트비트를 쓰지 않으면 다시 알리지 않으므로 만료하지 않음
+        if self.heartbeat_interval <= 0:
+            return None
+        return self.heartbeat_interval * self.heartbeat_missed_limit
+    
+    def _remote_users(self, room_id: int) -> Set[int]:
+        """다른 워커에 연결된 룸 사용자 (만료된 워커 항목은 제거)"""
+        users = self._remote.get(room_id)
+        if not users:
+            return set()
+        ttl = self._presence_ttl()
+        if ttl is not None:
+            expired_before = time.monotonic() - ttl
+            for user_id, workers in list(users.items()):
+                for origin in [o for o, seen in workers.items() if seen < expired_before]:
+                    del workers[origin]
+                if not workers:
+                    del users[user_id]
+        return set(users)
+    
+    async def _on_presence(self, room_id: int, event: dict):
+        """다른 워커의 접속 상태 변경 반영 (이 변경으로 두 플레이어가 모두 연결되면 이 워커의 연결에 알림)"""
         if room_id not in self.active_connections:
-            return []
-        
-        connected_users = []
-        for user_id, ws in self.user_connections.items():
-            if ws in self.active_connections[room_id]:
-                connected_users.append(user_id)
-        
-        return connected_users
+            return None
+        was_online = self.is_user_online(room_id, event["user_id"])
+        users = self._remote.setdefault(room_id, {})
+        if event["online"]:
+            users.setdefault(event["user_id"], {})[event["origin"]] = time.monotonic()
+        else:
+            workers = users.get(event["user_id"], {})
+            workers.pop(event["origin"], None)
+            if not workers:
+                users.pop(event["user_id"], None)
+        if event["online"] and not was_online and len(self.get_connected_users(room_id)) >= 2:
+            return BOTH_PLAYERS_READY, None, None
+        return None
+    
+    async def _on_presence_sync(self, room_id: int, event: dict):
+        """룸에 처음 연결된 다른 워커의 요청에 이 워커의 접속 상태로 응답"""
+        for user_id in self.active_connections.get(room_id, ()):
+            self._announce(room_id, user_id, True)
+        return None
+    
+    def get_connected_users(self, room_id: int) -> list[int]:
+        """룸에 연결된 사용자 ID 목록 반환 (다른 워커에 연결된 사용자 포함)"""
+        return list(set(self.active_connections.get(room_id, ())) | self._remote_users(room_id))
+    
+    def is_user_connected(self, room_id: int, user_id: int) -> bool:
+        """사용자가 이 워커에서 룸에 하나 이상의 연결을 가지고 있는지 확인"""
+        return user_id in self.active_connections.get(room_id, ())
+    
+    def is_user_online(self, room_id: int, user_id: int) -> bool:
+        """사용자가 어느 워커에서든 룸에 연결되어 있는지 확인"""
+        return self.is_user_connected(room_id, user_id) or user_id in self._remote_users(room_id)
     
     def is_both_players_connected(self, room_id: int, player1_id: int, player2_id: int) -> bool:
-        """두 플레이어가 모두 연결되었는지 확인"""
-        connected = self.get_connected_users(room_id)
-        return player1_id in connected and player2_id in connected
+        """두 플레이어가 모두 연결되었는지 확인 (다른 워커에 연결된 플레이어 포함)"""
+        return self.is_user_online(room_id, player1_id) and self.is_user_online(room_id, player2_id)
     
     async def send_to_user(self, user_id: int, message: dict):
-        """특정 사용자에게 메시지 전송"""
-        if user_id in self.user_connections:
-            try:
-                await self.user_connections[user_id].send_json(message)
-            except Exception as e:
-                print(f"사용자 {user_id}에게 메시지 전송 실패: {e}")
+        """특정 사용자의 모든 연결에 메시지 전송 (대기열에 넣고 바로 반환)"""
+        sockets = self.user_connections.get(user_id)
+        if sockets:
+            text = _encode(message)
+            for websocket in list(sockets):
+                self._enqueue(websocket, text)
+    
+    def stats(self) -> dict:
+        depths = [len(client.queue) for client in self.clients.values()]
+        return {
+            "connections": len(self.clients),
+            "rooms": len(self.active_connections),
+            "held_rooms": len(self._held),
+            "remote_users": sum(len(users) for users in self._remote.values()),
+            "users": len(self.user_connections),
+            "policy": self.policy,
+            "queue_size": self.queue_size,
+            "slow_lag": self.slow_lag,
+            "queued": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "slow_disconnects": self.slow_disconnects,
+            "send_timeouts": self.send_timeouts,
+            "heartbeat_interval": self.heartbeat_interval,
+            "heartbeat_missed_limit": self.heartbeat_missed_limit,
+            "pings": self.pings,
+            "reaped": self.reaped,
+            "pubsub": self.pubsub.stats(),
+        }
 
 # 전역 연결 관리자
 manager = ConnectionManager()
-
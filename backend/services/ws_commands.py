@@ -0,0 +1,136 @@
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.round import Round
+from schemas.round import SideSelectionRequest, ActionRequest
+from services.game_service import AsyncGameService
+from services.betting_service import AsyncBettingService
+from services.round_broadcast import publish_round, room_id_for_match
+
+# 같은 request_id로 다시 보낸 명령에 재실행 없이 돌려줄 최근 ack 수 (프로세스 단위 LRU)
+WS_COMMAND_ACK_CACHE_SIZE = int(os.getenv("WS_COMMAND_ACK_CACHE_SIZE", "4096"))
+
+# 웹소켓으로 받는 게임 명령 (액션 명령은 BettingService.process_action이 처리하는 액션만)
+SELECT_SIDE_COMMAND = "select_side"
+ACTION_COMMANDS = ("bet", "raise", "call", "fold")
+GAME_COMMANDS = (SELECT_SIDE_COMMAND,) + ACTION_COMMANDS
+
+class GameCommandHandler:
+    """웹소켓으로 받은 게임 명령을 HTTP 라우터와 같은 서비스로 처리하고 ack 생성
+
+    명령마다 짧은 DB 세션을 열어 GameService/BettingService를 호출하고, 성공하면
+    HTTP 요청과 같은 경로(publish_round)로 룸에 round 이벤트를 보낸 뒤 ack를 반환합니다.
+    클라이언트가 붙인 request_id별로 ack를 보관하므로, 응답을 받지 못해 같은 명령을
+    다시 보내도 두 번 실행되지 않습니다 (같은 워커에 다시 연결한 경우).
+    보관하는 ack는 성공한 명령과 명령 형식 오류뿐이며, 게임 규칙/DB 오류로 실패한 명령은
+    아무것도 반영되지 않았으므로 같은 request_id로 다시 보내면 다시 실행합니다.
+    명령은 웹소켓이 연결된 룸의 라운드에만 적용되며, 다른 룸의 round_id를 보내면 거부합니다.
+    """
+
+    def __init__(self, ack_cache_size: int = WS_COMMAND_ACK_CACHE_SIZE):
+        self.ack_cache_size = ack_cache_size
+        self._acks: "OrderedDict[Tuple[int, str], dict]" = OrderedDict()
+        # 통계
+        self.commands = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.duplicates = 0
+
+    async def handle(self, room_id: int, user_id: int, data: dict) -> dict:
+        """room_id 룸의 웹소켓에서 받은 명령 하나를 처리하고 클라이언트에 보낼 ack 반환"""
+        request_id = data.get("request_id")
+        if request_id is None or request_id == "":
+            return self._ack(None, data.get("type"), False, "request_id가 필요합니다")
+
+        key = (user_id, str(request_id))
+        cached = self._acks.get(key)
+        if cached is not None:
+            self._acks.move_to_end(key)
+            self.duplicates += 1
+            return cached
+
+        self.commands += 1
+        ack, terminal = await self._execute(room_id, user_id, request_id, data)
+        if ack["success"]:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if ack["success"] or terminal:
+            self._acks[key] = ack
+            while len(self._acks) > self.ack_cache_size:
+                self._acks.popitem(last=False)
+        return ack
+
+    async def _execute(self, room_id: int, user_id: int, request_id, data: dict) -> Tuple[dict, bool]:
+        """명령 실행 후 (ack, 재시도해도 결과가 같은 실패인지) 반환"""
+        from database import AsyncSessionLocal
+
+        command = data.get("type")
+        round_id = data.get("round_id")
+        if not isinstance(round_id, int):
+            return self._ack(request_id, command, False, "round_id가 필요합니다"), True
+
+        async with AsyncSessionLocal() as db:
+            round_room_id = await self._round_room_id(db, round_id)
+            if round_room_id is not None and round_room_id != room_id:
+                return self._ack(request_id, command, False, "이 룸의 라운드가 아닙니다"), True
+            try:
+                if command == SELECT_SIDE_COMMAND:
+                    request = SideSelectionRequest(player_id=user_id, side=data.get("side"))
+                    round = await AsyncGameService.select_side(db, round_id, user_id, request.side)
+                else:
+                    request = ActionRequest(player_id=user_id, action_type=command, amount=data.get("amount"))
+                    round = await AsyncBettingService.process_action(
+                        db, round_id, user_id, request.action_type, request.amount
+                    )
+                result = await publish_round(db, round, user_id)
+            except ValidationError:
+                return self._ack(request_id, command, False, "잘못된 명령 형식입니다"), True
+            except ValueError as e:
+                await db.rollback()
+                return self._ack(request_id, command, False, str(e)), False
+            except Exception as e:
+                await db.rollback()
+                return self._ack(request_id, command, False, f"명령 처리 실패: {str(e)}"), False
+
+        return self._ack(request_id, command, True, "명령이 성공적으로 처리되었습니다", result), False
+
+    @staticmethod
+    async def _round_room_id(db: AsyncSession, round_id: int) -> Optional[int]:
+        """라운드가 속한 매치의 room_id (라운드 엔진에 있으면 DB 조회 없음, 없는 라운드는 None)"""
+        from services.round_engine import round_engine
+
+        live_round = round_engine.cached_round(round_id)
+        match_id = live_round.match_id if live_round else (
+            await db.execute(select(Round.match_id).where(Round.id == round_id))
+        ).scalar()
+        if match_id is None:
+            # 없는 라운드는 서비스가 오류로 처리
+            return None
+        return await room_id_for_match(db, match_id)
+
+    @staticmethod
+    def _ack(request_id, command: str, success: bool, message: str, round: dict = None) -> dict:
+        return {
+            "type": "ack",
+            "request_id": request_id,
+            "command": command,
+            "success": success,
+            "message": message,
+            "round": round,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "commands": self.commands,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "cached_acks": len(self._acks),
+        }
+
+# 전역 웹소켓 게임 명령 처리기
+game_commands = GameCommandHandler()
@@ -0,0 +1,111 @@
+"""조회 엔드포인트별 SQL 실행 횟수 확인 (응답 빌더가 한 번의 SELECT로 조회하는지)
+
+PostgreSQL이 필요하며 DATABASE_URL의 DB에 사용자/룸/매치를 만들어 확인합니다.
+DB에 연결할 수 없거나 httpx(TestClient)가 없으면 건너뜁니다.
+
+    cd backend && python -m pytest -q tests
+"""
+import os
+import sys
+import uuid
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from database import engine, async_engine
+
+def _database_available() -> bool:
+    try:
+        with engine.connect():
+            return True
+    except Exception:
+        return False
+
+pytestmark = pytest.mark.skipif(not _database_available(), reason="PostgreSQL에 연결할 수 없습니다")
+
+class QueryCounter:
+    """동기/비동기 엔진에서 실행된 SQL 문 수집 (before_cursor_execute)"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements.clear()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+@pytest.fixture(scope="module")
+def counter():
+    counter = QueryCounter()
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    yield counter
+    for target in engines:
+        event.remove(target, "before_cursor_execute", counter)
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+    from services.round_engine import round_engine
+
+    if round_engine.enabled:
+        pytest.skip("라운드 엔진 사용 시 메모리에서 응답하므로 DB 조회 횟수를 확인하지 않습니다")
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.fixture(scope="module")
+def game(client):
+    """사용자 2명, 룸, 매치, 첫 라운드 생성 후 두 플레이어가 면 선택 (룸→매치 캐시도 채움)"""
+    suffix = uuid.uuid4().hex[:8]
+    player1 = client.post("/api/users", json={"username": f"qc1_{suffix}"}).json()
+    player2 = client.post("/api/users/guest", json={"username": f"qc2_{suffix}"}).json()
+    room = client.post("/api/rooms", json={"player1_id": player1["id"]}).json()
+    client.post(f"/api/rooms/{room['id']}/join", json={"player2_id": player2["id"]})
+    match = client.get(f"/api/matches/room/{room['id']}").json()
+    round = client.get(f"/api/rounds/match/{match['id']}/current").json()
+    # 라운드에 액션이 있는 상태에서 확인
+    for player, side in ((player1, "front"), (player2, "back")):
+        client.post(f"/api/rounds/{round['id']}/select-side", json={"player_id": player["id"], "side": side})
+    return {"room_id": room["id"], "match_id": match["id"], "round_id": round["id"]}
+
+# (경로, 전체 응답 쿼리 수, If-None-Match가 같을 때 304 응답 쿼리 수)
+# 라운드는 라운드+매치+카드 JOIN 1번과 액션 IN 조회 1번 (액션 수가 늘어도 쿼리 수와 행 수가 곱해지지 않음)
+ENDPOINTS = [
+    ("/api/matches/{match_id}", 1, 1),
+    ("/api/matches/room/{room_id}", 1, 1),
+    ("/api/rounds/match/{match_id}/current", 2, 1),
+    ("/api/rounds/{round_id}", 2, 1),
+    # 활성 매치(룸/플레이어 포함), 최근 두 라운드(카드 포함), 두 라운드의 액션
+    ("/api/rooms/{room_id}/snapshot", 3, 1),
+]
+
+@pytest.mark.parametrize("path, full_queries, not_modified_queries", ENDPOINTS)
+def test_query_count(client, counter, game, path, full_queries, not_modified_queries):
+    url = path.format(**game)
+
+    with counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert len(counter.statements) == full_queries, counter.statements
+
+    with counter:
+        cached = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert len(counter.statements) == not_modified_queries, counter.statements
+
+@pytest.mark.parametrize("path", ["/api/rounds/{round_id}", "/api/rooms/{room_id}/snapshot"])
+def test_round_cards_and_actions_not_joined(client, counter, game, path):
+    """카드와 액션을 한 SELECT에서 JOIN하지 않음 (카드 수 × 액션 수만큼 행이 늘어나지 않도록)"""
+    with counter:
+        assert client.get(path.format(**game)).status_code == 200
+    joined = [s for s in counter.statements if "round_cards" in s and "actions" in s]
+    assert not joined, joined
@@ -0,0 +1,80 @@
+"""웹소켓 게임 명령이 연결된 룸의 라운드에만 적용되는지 확인
+
+PostgreSQL이 필요하며 DATABASE_URL의 DB에 사용자/룸/매치를 만들어 확인합니다.
+DB에 연결할 수 없거나 httpx(TestClient)가 없으면 건너뜁니다.
+
+    cd backend && python -m pytest -q tests
+"""
+import os
+import sys
+import uuid
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from database import engine, async_engine
+
+def _database_available() -> bool:
+    try:
+        with engine.connect():
+            return True
+    except Exception:
+        return False
+
+pytestmark = pytest.mark.skipif(not _database_available(), reason="PostgreSQL에 연결할 수 없습니다")
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+
+    # 다른 테스트 모듈의 TestClient(다른 이벤트 루프)에서 만든 asyncpg 연결을 재사용하지 않도록 풀을 비움
+    async_engine.sync_engine.dispose(close=False)
+    with TestClient(main.app) as client:
+        yield client
+
+def _create_room(client, player1: dict, player2: dict) -> dict:
+    """두 플레이어의 룸을 만들고 (매치와 첫 라운드 자동 시작) 룸 id와 현재 라운드 반환"""
+    room = client.post("/api/rooms", json={"player1_id": player1["id"]}).json()
+    client.post(f"/api/rooms/{room['id']}/join", json={"player2_id": player2["id"]})
+    match = client.get(f"/api/matches/room/{room['id']}").json()
+    round = client.get(f"/api/rounds/match/{match['id']}/current", params={"viewer_id": player1["id"]}).json()
+    return {"room_id": room["id"], "round": round}
+
+def _ack(websocket) -> dict:
+    while True:
+        message = websocket.receive_json()
+        if message["type"] == "ack":
+            return message
+
+def test_command_for_other_room_rejected(client):
+    """한 사용자가 두 룸에 참가해 있어도 다른 룸의 라운드에 보낸 명령은 실행하지 않음"""
+    suffix = uuid.uuid4().hex[:8]
+    player = client.post("/api/users", json={"username": f"wc1_{suffix}"}).json()
+    first = _create_room(client, player, client.post("/api/users/guest", json={"username": f"wc2_{suffix}"}).json())
+    second = _create_room(client, player, client.post("/api/users/guest", json={"username": f"wc3_{suffix}"}).json())
+    other_round = second["round"]
+
+    with client.websocket_connect(f"/ws/room/{first['room_id']}/user/{player['id']}") as websocket:
+        websocket.send_json({
+            "type": "select_side", "request_id": "other-room", "round_id": other_round["id"], "side": "front"
+        })
+        ack = _ack(websocket)
+        assert not ack["success"]
+        assert ack["message"] == "이 룸의 라운드가 아닙니다"
+
+        # 같은 request_id로 다시 보내도 실행하지 않음 (형식 오류처럼 보관한 ack 반환)
+        websocket.send_json({
+            "type": "select_side", "request_id": "other-room", "round_id": other_round["id"], "side": "front"
+        })
+        assert _ack(websocket) == ack
+
+        websocket.send_json({
+            "type": "select_side", "request_id": "own-room", "round_id": first["round"]["id"], "side": "front"
+        })
+        assert _ack(websocket)["success"]
+
+    round = client.get(f"/api/rounds/{other_round['id']}", params={"viewer_id": player["id"]}).json()
+    assert round["state_version"] == other_round["state_version"]
+    assert all(card["chosen_side"] is None for card in round["cards"])
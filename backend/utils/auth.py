@@ -1,48 +1,129 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from models.user import User
-from models.role import Role, UserRole
-from models.permission import Permission, RolePermission
 from fastapi import HTTPException
 
+# 사용자별 역할 캐시 유지 시간 (초). 다른 워커에서 변경된 역할은 최대 이 시간만큼 늦게 반영
+AUTH_ROLE_CACHE_TTL = float(os.getenv("AUTH_ROLE_CACHE_TTL", "60"))
+# 역할을 캐시할 최대 사용자 수 (LRU). 게스트마다 항목이 생기므로 상한을 둠
+AUTH_ROLE_CACHE_SIZE = int(os.getenv("AUTH_ROLE_CACHE_SIZE", "10000"))
+
+class AuthorizationCache:
+    """역할→권한 매트릭스와 사용자별 역할 집합을 프로세스 메모리에 보관
+    
+    역할→권한 매트릭스는 서버 시작 후 변경되지 않으므로 한 번만 읽어 frozenset으로 보관하고,
+    사용자별 역할은 TTL 동안 최대 maxsize명까지(LRU) 캐시하며 assign_role 등으로 바뀌면
+    invalidate_user()로 제거합니다. 만료된 항목은 조회하거나 새 항목을 넣을 때 제거합니다.
+    """
+    
+    def __init__(self, ttl: float = AUTH_ROLE_CACHE_TTL, maxsize: int = AUTH_ROLE_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._role_permissions: Optional[Dict[str, FrozenSet[str]]] = None
+        self._user_roles: "OrderedDict[int, Tuple[float, FrozenSet[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def role_permissions(self, db: Session) -> Dict[str, FrozenSet[str]]:
+        """역할 이름 -> 권한 이름 집합 (최초 1회 JOIN 조회)"""
+        if self._role_permissions is None:
+            rows = db.execute(text("""
+                SELECT r.name, p.name
+                FROM roles r
+                JOIN role_permissions rp ON rp.role_id = r.id
+                JOIN permissions p ON p.id = rp.permission_id
+            """)).fetchall()
+            matrix: Dict[str, set] = {}
+            for role_name, permission_name in rows:
+                matrix.setdefault(role_name, set()).add(permission_name)
+            self._role_permissions = {role: frozenset(perms) for role, perms in matrix.items()}
+        return self._role_permissions
+    
+    def user_roles(self, db: Session, user_id: int) -> FrozenSet[str]:
+        """사용자의 역할 이름 집합 (캐시 미스 시 JOIN 1회)"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._user_roles.get(user_id)
+            if cached and cached[0] > now:
+                self._user_roles.move_to_end(user_id)
+                self.hits += 1
+                return cached[1]
+            if cached:
+                del self._user_roles[user_id]
+            self.misses += 1
+        
+        rows = db.execute(text("""
+            SELECT r.name
+            FROM user_roles ur
+            JOIN roles r ON r.id = ur.role_id
+            WHERE ur.user_id = :user_id
+        """), {"user_id": user_id}).scalars().all()
+        roles = frozenset(rows)
+        with self._lock:
+            self._user_roles[user_id] = (now + self.ttl, roles)
+            self._user_roles.move_to_end(user_id)
+            self._evict(now)
+        return roles
+    
+    def _evict(self, now: float):
+        """앞쪽(가장 오래 쓰지 않은)부터 만료된 항목과 maxsize를 넘는 항목 제거 (락 안에서 호출)"""
+        entries = self._user_roles
+        while entries and (len(entries) > self.maxsize or next(iter(entries.values()))[0] <= now):
+            entries.popitem(last=False)
+    
+    def user_permissions(self, db: Session, user_id: int) -> FrozenSet[str]:
+        """사용자가 역할을 통해 가진 권한 이름 집합"""
+        roles = self.user_roles(db, user_id)
+        matrix = self.role_permissions(db)
+        if len(roles) == 1:
+            return matrix.get(next(iter(roles)), frozenset())
+        return frozenset().union(*(matrix.get(role, frozenset()) for role in roles))
+    
+    def invalidate_user(self, user_id: int):
+        """사용자 역할이 바뀌었을 때 캐시 제거"""
+        with self._lock:
+            self._user_roles.pop(user_id, None)
+    
+    def invalidate_all(self):
+        """역할-권한 매트릭스와 사용자 역할 캐시 전체 제거"""
+        with self._lock:
+            self._role_permissions = None
+            self._user_roles.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cached_users": len(self._user_roles),
+                "max_users": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+# 전역 권한 캐시
+auth_cache = AuthorizationCache()
+
 def get_user_roles(db: Session, user_id: int) -> list[str]:
     """사용자의 역할 목록 반환"""
-    user_roles = db.query(UserRole).filter(UserRole.user_id == user_id).all()
-    role_ids = [ur.role_id for ur in user_roles]
-    roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
-    return [role.name for role in roles]
+    return sorted(auth_cache.user_roles(db, user_id))
 
 def has_role(db: Session, user_id: int, role_name: str) -> bool:
     """사용자가 특정 역할을 가지고 있는지 확인"""
-    roles = get_user_roles(db, user_id)
-    return role_name in roles
+    return role_name in auth_cache.user_roles(db, user_id)
 
 def get_user_permissions(db: Session, user_id: int) -> list[str]:
     """사용자가 가진 모든 권한 목록 반환 (역할을 통해)"""
-    # 사용자의 역할들 가져오기
-    user_roles = db.query(UserRole).filter(UserRole.user_id == user_id).all()
-    role_ids = [ur.role_id for ur in user_roles]
-    
-    if not role_ids:
-        return []
-    
-    # 역할들의 권한들 가져오기
-    role_permissions = db.query(RolePermission).filter(
-        RolePermission.role_id.in_(role_ids)
-    ).all()
-    
-    permission_ids = [rp.permission_id for rp in role_permissions]
-    
-    if not permission_ids:
-        return []
-    
-    permissions = db.query(Permission).filter(Permission.id.in_(permission_ids)).all()
-    return [perm.name for perm in permissions]
+    return sorted(auth_cache.user_permissions(db, user_id))
 
 def has_permission(db: Session, user_id: int, permission_name: str) -> bool:
     """사용자가 특정 권한을 가지고 있는지 확인"""
-    permissions = get_user_permissions(db, user_id)
-    return permission_name in permissions
+    return permission_name in auth_cache.user_permissions(db, user_id)
 
 def check_permission(db: Session, user_id: int, permission_name: str) -> None:
     """사용자가 특정 권한을 가지고 있는지 확인, 없으면 예외 발생"""
@@ -54,7 +135,7 @@ def check_permission(db: Session, user_id: int, permission_name: str) -> None:
 
 def check_role_permission(db: Session, user_id: int, allowed_roles: list[str]) -> None:
     """사용자가 허용된 역할 중 하나를 가지고 있는지 확인, 없으면 예외 발생 (하위 호환성)"""
-    user_roles = get_user_roles(db, user_id)
+    user_roles = auth_cache.user_roles(db, user_id)
     
     # 허용된 역할이 없으면 모든 역할 허용
     if not allowed_roles:
@@ -0,0 +1,95 @@
+import time
+import threading
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# 체크아웃 대기 시간 히스토그램 구간 (밀리초, 마지막 구간은 그 이상 전부)
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+class PoolMetrics:
+    """커넥션 풀 체크아웃 대기 시간 및 고갈 이벤트 집계"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """집계 초기화"""
+        with self._lock:
+            self.checkouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.saturated = 0  # 체크아웃 시점에 풀이 가득 차 대기해야 했던 횟수
+            self.exhausted = 0  # pool_timeout 초과로 실패한 횟수
+            self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, wait_ms: float, saturated: bool):
+        """체크아웃 성공 기록"""
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            if wait_ms > self.max_wait_ms:
+                self.max_wait_ms = wait_ms
+            if saturated:
+                self.saturated += 1
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def record_exhausted(self):
+        """풀 고갈(체크아웃 타임아웃) 기록"""
+        with self._lock:
+            self.exhausted += 1
+            self.saturated += 1
+
+    def snapshot(self, pool: QueuePool) -> dict:
+        """현재 풀 상태와 누적 집계 반환"""
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "name": self.name,
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "saturated": self.saturated,
+                "exhausted": self.exhausted,
+                "wait_histogram": dict(zip(labels, self.buckets)),
+            }
+
+class _TimedCheckoutMixin:
+    """Pool.connect()에 걸리는 시간(대기 + pre-ping)을 PoolMetrics에 기록"""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        saturated = (
+            self._max_overflow > -1
+            and self.checkedout() >= self.size() + self._max_overflow
+        )
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_exhausted()
+            raise
+        self.metrics.record_checkout((time.perf_counter() - started) * 1000, saturated)
+        return connection
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """동기 엔진용 계측 풀"""
+    metrics = sync_pool_metrics
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """비동기 엔진용 계측 풀"""
+    metrics = async_pool_metrics
@@ -0,0 +1,356 @@
+import json
+import base64
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.match import Match, MatchPlayer
+from models.room import Room
+from models.user import User
+from models.round import Round
+from models.enums import MatchStatus
+from services.action_log import action_log
+from services.betting_service import STAT_COLUMNS
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 표준 json으로 직렬화
+    orjson = None
+
+# 라운드 + 매치(상태 버전) + 카드를 한 번의 SELECT로 조회하고 액션(시간 순)은 IN 조회 1번으로 따로 적재
+# (카드와 액션을 함께 JOIN하면 카드 수 × 액션 수만큼 행이 늘어남)
+_ROUND_WITH_CHILDREN = select(Round).options(
+    joinedload(Round.match, innerjoin=True),
+    joinedload(Round.round_cards),
+    selectinload(Round.actions),
+).execution_options(populate_existing=True)
+
+# 매치 + 플레이어(seat 순) + 사용자명을 한 번의 SELECT로 조회
+_MATCH_WITH_PLAYERS = select(Match).options(
+    joinedload(Match.match_players).joinedload(MatchPlayer.user),
+).execution_options(populate_existing=True)
+
+# 룸 스냅샷: 활성 매치 + 룸 + 플레이어 + 사용자명을 한 번의 SELECT로 조회
+_MATCH_WITH_ROOM = _MATCH_WITH_PLAYERS.options(joinedload(Match.room, innerjoin=True))
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"JSON으로 직렬화할 수 없는 값: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """JSON 직렬화 (orjson이 설치되어 있으면 orjson 사용, datetime은 ISO 8601 문자열)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """payload dict를 dumps()로 바로 직렬화하는 응답 (response_model 검증/변환 생략)"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def json_response(content: dict, etag: str = None) -> FastJSONResponse:
+    """payload를 FastJSONResponse로 반환 (etag가 있으면 ETag/Cache-Control 설정)"""
+    response = FastJSONResponse(content)
+    if etag:
+        set_etag(response, etag)
+    return response
+
+def state_etag(match_id: int, state_version: int) -> str:
+    """매치 상태 버전의 ETag (매치/라운드 조회 응답 공통)"""
+    return f'W/"{match_id}.{state_version}"'
+
+def set_etag(response: Response, etag: str):
+    """ETag 설정 (브라우저가 매번 If-None-Match로 재검증하도록 no-cache)"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """If-None-Match가 현재 ETag와 같으면 304 응답, 아니면 None"""
+    header = request.headers.get("if-none-match")
+    if header and (header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))):
+        response = Response(status_code=304)
+        set_etag(response, etag)
+        return response
+    return None
+
+async def load_state_version(db: AsyncSession, *criteria, round_id: int = None, latest: bool = False) -> Optional[Tuple[int, int]]:
+    """(match_id, state_version)만 조회 (응답 본문을 만들기 전 304 판단용)"""
+    stmt = select(Match.id, Match.state_version)
+    if round_id is not None:
+        stmt = stmt.join(Round, Round.match_id == Match.id).where(Round.id == round_id)
+    stmt = stmt.where(*criteria)
+    if latest:
+        stmt = stmt.order_by(Match.created_at.desc()).limit(1)
+    row = (await db.execute(stmt)).first()
+    return tuple(row) if row else None
+
+async def load_round_response(db: AsyncSession, *criteria, latest: bool = False) -> Optional[dict]:
+    """조건에 맞는 라운드를 카드/액션과 함께 조회하여 RoundResponse 형식의 payload로 변환 (없으면 None)
+    
+    latest=True이면 round_no가 가장 큰 라운드 하나를 반환합니다.
+    """
+    stmt = _ROUND_WITH_CHILDREN.where(*criteria)
+    if latest:
+        stmt = stmt.order_by(Round.round_no.desc()).limit(1)
+    round = (await db.execute(stmt)).unique().scalars().first()
+    return round_payload(round) if round else None
+
+async def load_match_response(db: AsyncSession, *criteria, latest: bool = False) -> Optional[dict]:
+    """조건에 맞는 매치를 플레이어/사용자명과 함께 조회하여 MatchResponse 형식의 payload로 변환 (없으면 None)
+    
+    latest=True이면 가장 최근에 생성된 매치 하나를 반환합니다.
+    """
+    stmt = _MATCH_WITH_PLAYERS.where(*criteria)
+    if latest:
+        stmt = stmt.order_by(Match.created_at.desc()).limit(1)
+    match = (await db.execute(stmt)).unique().scalars().first()
+    return match_payload(match) if match else None
+
+async def load_game_snapshot(db: AsyncSession, room_id: int) -> Optional[dict]:
+    """룸 + 활성 매치(플레이어/칩) + 현재 라운드 + 직전 라운드 결과를 한 세션에서 조회 (룸이 없으면 None)
+    
+    활성 매치가 있으면 쿼리 3번(매치+룸+플레이어, 최근 라운드 2개+카드, 두 라운드의 액션),
+    없으면 룸만 PK로 조회합니다.
+    """
+    stmt = _MATCH_WITH_ROOM.where(
+        Match.room_id == room_id,
+        Match.status == MatchStatus.ACTIVE
+    ).order_by(Match.created_at.desc()).limit(1)
+    match = (await db.execute(stmt)).unique().scalars().first()
+    if not match:
+        room = await db.get(Room, room_id)
+        if not room:
+            return None
+        return {"room": room_payload(room), "match": None, "current_round": None, "previous_round": None}
+    
+    # 라운드 조회가 같은 Match 객체를 다시 채우므로(populate_existing) 매치/룸을 먼저 변환
+    snapshot = {"room": room_payload(match.room), "match": match_payload(match)}
+    stmt = _ROUND_WITH_CHILDREN.where(Round.match_id == match.id).order_by(Round.round_no.desc()).limit(2)
+    rounds = (await db.execute(stmt)).unique().scalars().all()
+    snapshot["current_round"] = round_payload(rounds[0]) if rounds else None
+    snapshot["previous_round"] = round_result_payload(rounds[1]) if len(rounds) > 1 else None
+    return snapshot
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """키셋 페이지네이션 커서 ((created_at, id)를 URL에 쓸 수 있는 문자열로)"""
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """encode_cursor()의 역변환 (형식이 잘못되면 ValueError)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception:
+        raise ValueError("잘못된 커서입니다")
+
+async def load_match_history(db: AsyncSession, user_id: int, cursor: str = None, limit: int = 20) -> dict:
+    """사용자의 매치 기록을 최신순으로 한 페이지 조회 (MatchHistoryResponse 형식)
+    
+    (created_at, id) 키셋 페이지네이션이라 OFFSET 없이 커서 다음 행부터 읽으므로
+    몇 번째 페이지든 비용이 같습니다. 쿼리 2번 (매치 + 라운드 수, 페이지 매치들의 플레이어).
+    """
+    rounds_played = select(func.count()).where(Round.match_id == Match.id).correlate(Match).scalar_subquery()
+    stmt = select(
+        Match.id, Match.room_id, Match.status, Match.created_at, Match.ended_at,
+        MatchPlayer.seat, rounds_played.label("rounds_played")
+    ).join(MatchPlayer, MatchPlayer.match_id == Match.id).where(MatchPlayer.user_id == user_id)
+    if cursor:
+        stmt = stmt.where(tuple_(Match.created_at, Match.id) < tuple_(*decode_cursor(cursor)))
+    # 다음 페이지가 있는지 알기 위해 한 행 더 조회
+    stmt = stmt.order_by(Match.created_at.desc(), Match.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    players: Dict[int, List[dict]] = {row.id: [] for row in rows}
+    if players:
+        player_rows = (await db.execute(
+            select(
+                MatchPlayer.match_id, MatchPlayer.user_id, User.username,
+                MatchPlayer.seat, MatchPlayer.chips, MatchPlayer.is_bot
+            )
+            .join(User, User.id == MatchPlayer.user_id)
+            .where(MatchPlayer.match_id.in_(list(players)))
+            .order_by(MatchPlayer.match_id, MatchPlayer.seat)
+        )).all()
+        for p in player_rows:
+            players[p.match_id].append({
+                "user_id": p.user_id,
+                "username": p.username,
+                "seat": p.seat,
+                "chips": p.chips,
+                "is_bot": p.is_bot
+            })
+    
+    return {
+        "items": [match_summary_payload(row, players[row.id], user_id) for row in rows],
+        "next_cursor": next_cursor
+    }
+
+def match_summary_payload(row, players: List[dict], user_id: int) -> dict:
+    """매치 기록 한 행을 MatchHistoryItem 형식의 dict로 변환 (DB 조회 없음)"""
+    winner_id = None
+    if row.status == MatchStatus.ENDED:
+        # 칩이 0 이하가 된 플레이어가 있으면 매치 종료, 칩이 남은 플레이어가 승자
+        remaining = [p for p in players if p["chips"] > 0]
+        if len(remaining) == 1:
+            winner_id = remaining[0]["user_id"]
+    return {
+        "id": row.id,
+        "room_id": row.room_id,
+        "status": _value(row.status),
+        "created_at": row.created_at,
+        "ended_at": row.ended_at,
+        "rounds_played": row.rounds_played,
+        "seat": row.seat,
+        "final_chips": next((p["chips"] for p in players if p["user_id"] == user_id), 0),
+        "winner_id": winner_id,
+        "players": players
+    }
+
+def _value(value):
+    """Enum이면 값으로 변환 (str Enum도 JSON 문자열로 내보내기 위함)"""
+    return value.value if isinstance(value, Enum) else value
+
+def _action_payload(a) -> dict:
+    return {
+        "id": a.id,
+        "player_id": a.player_id,
+        "action_type": _value(a.action_type),
+        "amount": a.amount,
+        "created_at": a.created_at
+    }
+
+def round_payload(round, state_version: int = None) -> dict:
+    """카드/액션이 로드된 Round 또는 라운드 엔진의 LiveRound를 RoundResponse 형식의 dict로 직접 변환
+    
+    pydantic 모델을 거치지 않고 dumps()로 바로 직렬화합니다 (DB 조회 없음).
+    LiveRound는 매치를 참조하지 않으므로 state_version을 함께 전달합니다.
+    """
+    if state_version is None:
+        state_version = round.match.state_version
+    cards = round.cards if hasattr(round, "cards") else round.round_cards
+    actions = [_action_payload(a) for a in round.actions]
+    
+    # ActionLogWriter에 남아 있는(아직 저장되지 않은) 액션은 저장된 액션 뒤에 추가
+    pending = action_log.pending_for_round(round.id)
+    if pending:
+        saved_ids = {a["id"] for a in actions}
+        actions += [
+            {
+                "id": row["id"],
+                "player_id": row["player_id"],
+                "action_type": _value(row["action_type"]),
+                "amount": row["amount"],
+                "created_at": row["created_at"]
+            }
+            for row in pending if row["id"] not in saved_ids
+        ]
+    
+    return {
+        "id": round.id,
+        "match_id": round.match_id,
+        "round_no": round.round_no,
+        "state": _value(round.state),
+        "pot": round.pot,
+        "carry_over_pot": round.carry_over_pot,
+        "current_turn_user_id": round.current_turn_user_id,
+        "min_bet": round.min_bet,
+        "result": _value(round.result),
+        "winner_id": round.winner_id,
+        "is_double_side_bet": round.is_double_side_bet,
+        "double_side_bonus": round.double_side_bonus,
+        "created_at": round.created_at,
+        "ended_at": round.ended_at,
+        "state_version": state_version,
+        "cards": [
+            {
+                "player_id": c.player_id,
+                "front_value": c.front_value,
+                "back_value": c.back_value,
+                "chosen_side": _value(c.chosen_side)
+            }
+            for c in cards
+        ],
+        "actions": actions
+    }
+
+def match_payload(match: Match) -> dict:
+    """플레이어/사용자가 로드된 Match를 MatchResponse 형식의 dict로 직접 변환 (DB 조회 없음)"""
+    return {
+        "id": match.id,
+        "room_id": match.room_id,
+        "status": _value(match.status),
+        "created_at": match.created_at,
+        "ended_at": match.ended_at,
+        "state_version": match.state_version,
+        "players": [
+            {
+                "user_id": p.user_id,
+                "username": p.user.username,
+                "seat": p.seat,
+                "chips": p.chips,
+                "is_bot": p.is_bot
+            }
+            for p in match.match_players
+        ]
+    }
+
+def round_result_payload(round) -> dict:
+    """종료된 라운드의 결과 요약 (카드 공개 값 포함, 액션 제외)"""
+    return {
+        "id": round.id,
+        "round_no": round.round_no,
+        "state": _value(round.state),
+        "result": _value(round.result),
+        "winner_id": round.winner_id,
+        "pot": round.pot,
+        "carry_over_pot": round.carry_over_pot,
+        "double_side_bonus": round.double_side_bonus,
+        "ended_at": round.ended_at,
+        "cards": [
+            {
+                "player_id": c.player_id,
+                "front_value": c.front_value,
+                "back_value": c.back_value,
+                "chosen_side": _value(c.chosen_side)
+            }
+            for c in round.round_cards
+        ]
+    }
+
+def player_stats_payload(stats, username: str, user_id: int) -> dict:
+    """PlayerStats(없으면 None)를 PlayerStatsResponse 형식의 dict로 변환 (통계가 없으면 0)"""
+    values = {column: getattr(stats, column) if stats else 0 for column in STAT_COLUMNS}
+    attempts = values["double_side_attempts"]
+    return {
+        "user_id": user_id,
+        "username": username,
+        **values,
+        "double_side_success_rate": round(values["double_side_wins"] / attempts, 4) if attempts else None,
+        "updated_at": stats.updated_at if stats else None
+    }
+
+def room_payload(room: Room) -> dict:
+    """Room을 RoomResponse 형식의 dict로 변환"""
+    return {
+        "id": room.id,
+        "invite_code": room.invite_code,
+        "status": _value(room.status),
+        "player1_id": room.player1_id,
+        "player2_id": room.player2_id,
+        "created_at": room.created_at
+    }
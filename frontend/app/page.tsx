@@ -127,7 +127,7 @@ export default function Home() {
   const fetchCurrentRound = async (matchIdParam: number, userId: number) => {
     try {
       // 매치의 현재 라운드 가져오기
-      const roundResponse = await fetch(`${API_URL}/api/rounds/match/${matchIdParam}/current`);
+      const roundResponse = await fetch(`${API_URL}/api/rounds/match/${matchIdParam}/current?viewer_id=${userId}`);
       
       if (!roundResponse.ok) {
         console.error('라운드를 찾을 수 없습니다');
@@ -176,7 +176,7 @@ export default function Home() {
     const pollInterval = setInterval(async () => {
       try {
         // 현재 라운드 정보 가져오기
-        const roundResponse = await fetch(`${API_URL}/api/rounds/match/${matchId}/current`);
+        const roundResponse = await fetch(`${API_URL}/api/rounds/match/${matchId}/current?viewer_id=${myUserId}`);
         if (!roundResponse.ok) {
           // 404는 라운드가 아직 생성되지 않았을 수 있으므로 조용히 무시
           if (roundResponse.status === 404) return;
@@ -791,7 +791,7 @@ export default function Home() {
     
     try {
       // 먼저 현재 라운드 확인 (이미 다음 라운드가 시작되었을 수 있음)
-      const currentRoundResponse = await fetch(`${API_URL}/api/rounds/match/${matchId}/current`);
+      const currentRoundResponse = await fetch(`${API_URL}/api/rounds/match/${matchId}/current?viewer_id=${myUserId}`);
       let round;
       let currentRoundNo = 0;
       
@@ -801,7 +801,7 @@ export default function Home() {
         
         // 현재 라운드가 이전 라운드보다 크면 이미 다음 라운드가 시작된 것
         if (roundId) {
-          const prevRoundResponse = await fetch(`${API_URL}/api/rounds/${roundId}`);
+          const prevRoundResponse = await fetch(`${API_URL}/api/rounds/${roundId}?viewer_id=${myUserId}`);
           if (prevRoundResponse.ok) {
             const prevRound = await prevRoundResponse.json();
             if (currentRound.round_no > prevRound.round_no) {
@@ -813,13 +813,13 @@ export default function Home() {
       
       // 다음 라운드가 아직 시작되지 않았으면 시작
       if (!round) {
-        const roundResponse = await fetch(`${API_URL}/api/rounds/${matchId}/start`, {
+        const roundResponse = await fetch(`${API_URL}/api/rounds/${matchId}/start?viewer_id=${myUserId}`, {
           method: 'POST',
         });
         
         if (!roundResponse.ok) {
           // 에러가 발생했지만 중복 키 에러일 수 있음 - 다시 현재 라운드 확인
-          const retryResponse = await fetch(`${API_URL}/api/rounds/match/${matchId}/current`);
+          const retryResponse = await fetch(`${API_URL}/api/rounds/match/${matchId}/current?viewer_id=${myUserId}`);
           if (retryResponse.ok) {
             round = await retryResponse.json();
           } else {